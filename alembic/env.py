@@ -6,7 +6,11 @@ from sqlalchemy.ext.asyncio import async_engine_from_config
 from alembic import context
 from app.db.session import Base
 from app.models.user import User, Role, AuditLog # Import models for Autogenerate !
+from app.models.transaction import Transaction, TransactionStat
+from app.models.metrics import MetricBucket
+from app.models.ledger import ForensicLedger, LedgerBlock, LedgerBlockEntry
 from app.core.config import settings
+from app.db.session import async_url
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -21,8 +25,10 @@ if config.config_file_name is not None:
 # for 'autogenerate' support
 target_metadata = Base.metadata
 
-# DB URL from Config
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# DB URL from Config (online migrations run on the async driver; '%' is escaped for configparser)
+config.set_main_option(
+    "sqlalchemy.url", async_url(settings.DATABASE_URL).render_as_string(hide_password=False).replace("%", "%%")
+)
 
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
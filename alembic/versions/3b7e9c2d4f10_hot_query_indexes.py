@@ -0,0 +1,42 @@
+"""hot query indexes
+
+Composite indexes for the transaction grid, governance queues, dashboard
+alerts, candidate lookup and audit feeds. Tables are created by
+Base.metadata.create_all, which already builds these indexes on a fresh
+database, so every index is created only if missing.
+
+Revision ID: 3b7e9c2d4f10
+Revises:
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3b7e9c2d4f10"
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ("ix_transactions_status_risk", "transactions", ["status", sa.text("risk_score DESC"), sa.text("id DESC")]),
+    ("ix_transactions_risk", "transactions", [sa.text("risk_score DESC"), sa.text("id DESC")]),
+    ("ix_transactions_status_created", "transactions", ["status", "created_at"]),
+    ("ix_transactions_currency_amount", "transactions", ["currency", "amount"]),
+    ("ix_audit_logs_resource_timestamp", "audit_logs", ["resource", "timestamp"]),
+    ("ix_audit_logs_timestamp", "audit_logs", ["timestamp"]),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -0,0 +1,59 @@
+"""ledger blocks
+
+Sealed Merkle blocks over forensic_ledger (app/db/ledger.py): ledger_blocks
+holds each block's root, tree and hash chain link, ledger_block_entries the
+leaf position of every sealed entry. Created only if missing, as app startup
+creates them on databases that were never migrated.
+
+Revision ID: 8d41f6a2c9e3
+Revises: 3b7e9c2d4f10
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d41f6a2c9e3"
+down_revision: Union[str, None] = "3b7e9c2d4f10"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "ledger_blocks",
+        sa.Column("height", sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column("merkle_root", sa.String(length=64), nullable=False),
+        sa.Column("previous_hash", sa.String(length=64), nullable=False),
+        sa.Column("block_hash", sa.String(length=64), nullable=False),
+        sa.Column("entry_count", sa.Integer(), nullable=False),
+        sa.Column("tree", sa.LargeBinary(), nullable=False),
+        sa.Column("first_timestamp", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("last_timestamp", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("sealed_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.PrimaryKeyConstraint("height"),
+        if_not_exists=True,
+    )
+    op.create_table(
+        "ledger_block_entries",
+        sa.Column("block_height", sa.Integer(), nullable=False),
+        sa.Column("leaf_index", sa.Integer(), nullable=False),
+        sa.Column("entry_id", sa.String(), nullable=False),
+        sa.Column("leaf_hash", sa.String(length=64), nullable=False),
+        sa.ForeignKeyConstraint(["block_height"], ["ledger_blocks.height"]),
+        sa.PrimaryKeyConstraint("block_height", "leaf_index"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_ledger_block_entries_entry_id", "ledger_block_entries", ["entry_id"], unique=True, if_not_exists=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ledger_block_entries_entry_id", table_name="ledger_block_entries", if_exists=True)
+    op.drop_table("ledger_block_entries", if_exists=True)
+    op.drop_table("ledger_blocks", if_exists=True)
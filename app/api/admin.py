@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select
+from sqlalchemy import func, select
 from app.api import deps
 from app.models.user import User, Role, AuditLog
 from app.schemas.auth import UserCreate, UserResponse
-from app.db.session import get_db
+from app.db.session import get_async_read_db, get_db
 import uuid
+from typing import Optional
 
 router = APIRouter()
 
@@ -67,38 +69,48 @@ def invite_user(
 from app.models.transaction import Transaction
 
 @router.get("/dashboard/stats")
-def get_dashboard_stats(
+async def get_dashboard_stats(
     # current_user: User = Depends(deps.get_current_user), # RE MOVED FOR DEV
 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get real-time dashboard metrics (Restricted to Admin/Ops).
+    Transaction KPIs come from the transaction_stats summary table, so the
+    cost of this endpoint does not grow with the transactions table.
     """
-    from sqlalchemy import func
     from datetime import datetime, timedelta
+    from app.db.stats import dashboard_counts
+    from app.ml.registry import registry
+    from app.ml.scoring import MATCH_MODEL
 
     # 1. Total Users
-    user_count = db.query(User).count()
+    user_count = await db.scalar(select(func.count()).select_from(User))
 
     # 2. Activity (Last 24h Logins)
     cutoff = datetime.utcnow() - timedelta(hours=24)
-    active_sessions = db.query(AuditLog).filter(
-        AuditLog.event_type == "LOGIN_SUCCESS",
-        AuditLog.timestamp >= cutoff
-    ).count()
+    active_sessions = await db.scalar(
+        select(func.count()).select_from(AuditLog).where(
+            AuditLog.event_type == "LOGIN_SUCCESS",
+            AuditLog.timestamp >= cutoff
+        )
+    )
 
     # 3. High Risk Events (Last 10)
     # Fetch Audit Logs
-    audit_alerts = db.query(AuditLog).filter(
-        (AuditLog.risk_score > 50) | (AuditLog.outcome == "FAILURE")
-    ).order_by(AuditLog.timestamp.desc()).limit(10).all()
+    audit_alerts = (await db.execute(
+        select(AuditLog).where(
+            (AuditLog.risk_score > 50) | (AuditLog.outcome == "FAILURE")
+        ).order_by(AuditLog.timestamp.desc()).limit(10)
+    )).scalars().all()
 
     # Fetch High Risk Transactions
-    txn_alerts = db.query(Transaction).filter(
-        Transaction.risk_score > 80,
-        Transaction.status == "EXCEPTION"
-    ).order_by(Transaction.created_at.desc()).limit(10).all()
+    txn_alerts = (await db.execute(
+        select(Transaction).where(
+            Transaction.risk_score > 80,
+            Transaction.status == "EXCEPTION"
+        ).order_by(Transaction.created_at.desc()).limit(10)
+    )).scalars().all()
 
     # Normalize and Merge
     alerts_list = []
@@ -127,51 +139,37 @@ def get_dashboard_stats(
     # Take top 10
     final_alerts = alerts_list[:10]
 
-    # 6. SLA Breaches (Timestamp < 4h ago and Not Reconciled)
-    sla_cutoff = datetime.now() - timedelta(hours=4)
-    sla_breaches = db.query(Transaction).filter(
-        Transaction.created_at < sla_cutoff,
-        Transaction.status != "AUTO_RECONCILED"
-    ).count()
+    # 4. Backlog, High Risk, SLA Breaches, Queue Aging, Throughput, Risk Mix
+    # (single read of the bounded summary table; shared sync code, run on the async connection)
+    counts = await db.run_sync(dashboard_counts)
 
-    # 7. Ops Backlog & High Risk (Real Counts)
-    ops_backlog = db.query(Transaction).filter(Transaction.status == "EXCEPTION").count()
-    high_risk_count = db.query(Transaction).filter(Transaction.risk_score > 80, Transaction.status == "EXCEPTION").count()
-
-    # 8. Queue Aging (SLA Risk Buckets)
-    now = datetime.now()
-    
-    t_1h = now - timedelta(hours=1)
-    t_4h = now - timedelta(hours=4)
-    
-    count_1h = db.query(Transaction).filter(Transaction.status == "EXCEPTION", Transaction.created_at >= t_1h).count()
-    count_1_4h = db.query(Transaction).filter(Transaction.status == "EXCEPTION", Transaction.created_at < t_1h, Transaction.created_at >= t_4h).count()
-    count_4h_plus = db.query(Transaction).filter(Transaction.status == "EXCEPTION", Transaction.created_at < t_4h).count()
+    # 5. System Health (Observed p50/p99 from request and inference telemetry)
+    from app.core.telemetry import http_latency, inference_latency, quantile_ms
+    from app.core.audit import audit_writer
+    latency = quantile_ms(http_latency, 0.5)
+    latency_p99 = quantile_ms(http_latency, 0.99)
+    inference = quantile_ms(inference_latency, 0.5)
+    queue_lag = audit_writer.metrics()["queue_depth"]
     
-    queue_aging = [
-        {"bucket": "<1h", "count": count_1h, "fill": "#66bb6a"},
-        {"bucket": "1-4h", "count": count_1_4h, "fill": "#ffa726"},
-        {"bucket": ">4h", "count": count_4h_plus, "fill": "#f44336"}
-    ]
-
-    # 9. System Health (Dynamic)
-    import random
-    latency = random.randint(20, 65) # ms
-    inference = random.randint(90, 140) # ms
+    def _health(label, value, limit):
+        if value is None:
+            return {"label": label, "value": "n/a", "status": "good"}
+        return {"label": label, "value": f"{value}ms", "status": "good" if value < limit else "warning"}
     
     system_health = [
-        {"label": "Ingestion Latency", "value": f"{latency}ms", "status": "good" if latency < 100 else "warning"},
-        {"label": "Event Queue Lag", "value": "0", "status": "good"},
-        {"label": "ML Inference", "value": f"{inference}ms", "status": "good" if inference < 150 else "warning"},
+        _health("API Latency (p50)", latency, 100),
+        _health("API Latency (p99)", latency_p99, 1000),
+        {"label": "Event Queue Lag", "value": str(queue_lag), "status": "good" if queue_lag < 1000 else "warning"},
+        _health("ML Inference", inference, 150),
         {"label": "Data Drift", "value": "Stable", "status": "good"},
     ]
 
     return {
         "total_users": user_count,
         "active_sessions_24h": active_sessions,
-        "ops_backlog": ops_backlog,
-        "high_risk_count": high_risk_count,
-        "sla_breaches": sla_breaches,
+        "ops_backlog": counts["ops_backlog"],
+        "high_risk_count": counts["high_risk_count"],
+        "sla_breaches": counts["sla_breaches"],
         "recent_alerts": [
             {
                 "id": a["id"],
@@ -181,13 +179,13 @@ def get_dashboard_stats(
             }
             for a in final_alerts
         ],
-        "throughput": throughput_data,
-        "risk_distribution": risk_dist,
-        "queue_aging": queue_aging,     # NEW
-        "system_health": system_health, # NEW
-        "pending_approvals": ops_backlog, 
-        # 6. Real ML Health (Based on model existence)
-        "ml_health": 100.0 if os.path.exists("app/ml/models/match_probability_model.pkl") else 0.0
+        "throughput": counts["throughput"],
+        "risk_distribution": counts["risk_distribution"],
+        "queue_aging": counts["queue_aging"],
+        "system_health": system_health,
+        "pending_approvals": counts["ops_backlog"], 
+        # 6. Real ML Health (Based on the active registry model)
+        "ml_health": 100.0 if registry.get(MATCH_MODEL) else 0.0
     }
 
 from fastapi import Request
@@ -230,14 +228,16 @@ def get_all_users(
     return users
 
 @router.get("/audit-logs")
-def get_audit_logs(
+async def get_audit_logs(
     skip: int = 0, 
     limit: int = 50,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """Get real audit logs for Governance."""
-    logs = db.query(AuditLog).order_by(AuditLog.timestamp.desc()).offset(skip).limit(limit).all()
-    return logs
+    result = await db.execute(
+        select(AuditLog).order_by(AuditLog.timestamp.desc()).offset(skip).limit(limit)
+    )
+    return result.scalars().all()
 
 from app.models.system import System
 @router.get("/systems")
@@ -253,17 +253,14 @@ def get_exceptions(db: Session = Depends(get_db)):
 @router.get("/ml/status")
 def get_ml_status():
     """Get status of the Elite Bank ML Pipeline."""
-    import os
-    from datetime import datetime
+    from app.ml.registry import registry
     
-    model_path = "app/ml/models/match_probability_model.pkl"
-    exists = os.path.exists(model_path)
-    last_trained = datetime.fromtimestamp(os.path.getmtime(model_path)).isoformat() if exists else None
+    info = registry.describe("match_probability")
     
     return {
-        "active": exists,
-        "version": "v1.0.0-shadow",
-        "last_trained": last_trained,
+        "active": info is not None,
+        "version": info["version"] if info else None,
+        "last_trained": info["metadata"].get("created_at") if info else None,
         "layers": ["XGBoost Classifier", "Isolation Forest", "Risk Scorer"],
         "accuracy": 0.985 # Placeholder, would read from metrics file in real app
     }
@@ -275,8 +272,11 @@ async def emit_ingest_event(
 ):
     """
     Internal endpoint for Ingestion Watcher to broadcast events to UI.
+    The watcher writes transactions from its own process, so the dashboard
+    feed re-reads its KPIs from the DB as well.
     """
     from app.core.background import manager
+    from app.core.dashboard import dashboard_feed
     import uuid
     from datetime import datetime
     
@@ -287,12 +287,13 @@ async def emit_ingest_event(
         event["timestamp"] = datetime.now().isoformat()
         
     await manager.broadcast(event)
+    dashboard_feed.resync()
     return {"status": "broadcasted"}
 
 @router.get("/audit/trace/{txn_id}")
-def get_forensic_trace(
+async def get_forensic_trace(
     txn_id: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Get full immutable forensic lineage for a transaction.
@@ -300,9 +301,12 @@ def get_forensic_trace(
     """
     from app.models.ledger import ForensicLedger
     
-    events = db.query(ForensicLedger).filter(
-        ForensicLedger.txn_id == txn_id
-    ).order_by(ForensicLedger.timestamp.asc()).all()
+    result = await db.execute(
+        select(ForensicLedger).where(
+            ForensicLedger.txn_id == txn_id
+        ).order_by(ForensicLedger.timestamp.asc())
+    )
+    events = result.scalars().all()
     
     if not events:
         # Fallback for demo if ID not found but looking like a valid seed ID
@@ -310,3 +314,30 @@ def get_forensic_trace(
             return [] # Empty list meant "Not Found" in UI logic usually
             
     return events
+
+@router.get("/ledger/proof/{entry_id}")
+def get_ledger_proof(entry_id: str, db: Session = Depends(get_db)):
+    """
+    Merkle inclusion proof for one forensic ledger entry: its leaf hash, the
+    O(log n) sibling path and the sealed block root it leads to.
+    """
+    from app.db.ledger import inclusion_proof
+
+    proof = inclusion_proof(db, entry_id)
+    if proof is None:
+        raise HTTPException(status_code=404, detail="Ledger entry not found in a sealed block")
+    return proof
+
+@router.get("/ledger/verify")
+def verify_ledger(
+    from_height: int = 0,
+    to_height: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Integrity check of sealed ledger blocks [from_height, to_height] (default:
+    all): recomputed Merkle roots vs sealed roots, plus the block hash chain.
+    """
+    from app.db.ledger import verify_blocks
+
+    return verify_blocks(db, from_height, to_height)
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from app.models.user import User
 from app.models.system import System, SystemProfile
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional
 from datetime import datetime
@@ -73,15 +74,16 @@ def list_identities(db: Session = Depends(get_db)):
     return results
 
 @router.post("/identities")
-def create_identity(
+async def create_identity(
     data: IdentityCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     # Check existing
-    if db.query(User).filter(User.email == data.email).first():
+    if (await db.execute(select(User.id).where(User.email == data.email))).first():
         raise HTTPException(status_code=400, detail="Email already registered")
         
-    hashed = get_password_hash(data.password)
+    # argon2 runs on the hashing pool, not on a request thread
+    hashed = await get_password_hash_async(data.password)
     user = User(
         email=data.email,
         full_name=data.full_name,
@@ -89,7 +91,7 @@ def create_identity(
         is_active=True
     )
     db.add(user)
-    db.commit()
+    await db.commit()
     return user
 
 @router.post("/profiles")
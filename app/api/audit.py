@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
-from app.db.session import get_db
+from app.db.session import get_async_read_db
 from app.models.user import AuditLog
 from typing import List, Optional
 from pydantic import BaseModel
@@ -22,11 +22,11 @@ class AuditLogSchema(BaseModel):
         from_attributes = True
 
 @router.get("", response_model=List[AuditLogSchema])
-def get_audit_logs(
+async def get_audit_logs(
     limit: int = 100,
     actor_id: Optional[str] = None,
     resource: Optional[str] = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     query = select(AuditLog).order_by(AuditLog.timestamp.desc()).limit(limit)
     if actor_id:
@@ -34,5 +34,5 @@ def get_audit_logs(
     if resource:
         query = query.where(AuditLog.resource.contains(resource))
         
-    result = db.execute(query)
+    result = await db.execute(query)
     return result.scalars().all()
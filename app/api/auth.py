@@ -1,11 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import select
 from app.api import deps
 from app.core import security, jwt
+from app.core.audit import audit_writer
 from app.models.user import User, AuditLog
+from app.models.system import System, SystemProfile
 from app.schemas.auth import UserLogin, Token
-from app.db.session import get_db
+from app.db.session import get_async_db, get_db
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -13,7 +16,7 @@ router = APIRouter()
 @router.post("/login", response_model=Token)
 async def login(
     login_data: UserLogin,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     OAuth2 compatible token login, get an access token for future requests.
@@ -22,7 +25,12 @@ async def login(
         print(f"DEBUG: Login attempt for {login_data.email}")
         
         # 1. Fetch User
-        result = db.execute(select(User).where(User.email == login_data.email))
+        # Profiles and their systems are loaded up front: no lazy loads on an AsyncSession
+        result = await db.execute(
+            select(User)
+            .where(User.email == login_data.email)
+            .options(selectinload(User.profiles).selectinload(SystemProfile.system))
+        )
         user = result.scalars().first()
         
         print(f"DEBUG: User found: {user}")
@@ -33,17 +41,17 @@ async def login(
             raise HTTPException(status_code=400, detail="Incorrect email or password")
             
         print("DEBUG: Verifying password...")
-        if not security.verify_password(login_data.password, user.hashed_password):
+        # argon2 runs on the hashing pool: a login storm no longer stalls the event loop
+        if not await security.verify_password_async(login_data.password, user.hashed_password):
             print("DEBUG: Password verification failed")
-            # Log Failure
-            fail_log = AuditLog(
+            # Log Failure (batched; security events are never sampled out)
+            audit_writer.write(
+                essential=True,
                 event_type="LOGIN_FAILURE",
                 actor_id=login_data.email,
                 outcome="FAILURE",
                 risk_score=90
             )
-            db.add(fail_log)
-            db.commit()
             raise HTTPException(status_code=400, detail="Incorrect email or password")
 
         # 3. Check Active
@@ -57,15 +65,14 @@ async def login(
         refresh_token = jwt.create_refresh_token(subject=user.email)
 
         # 5. Log Success
-        success_log = AuditLog(
+        audit_writer.write(
+            essential=True,
             event_type="LOGIN_SUCCESS",
             actor_id=user.id,
             outcome="SUCCESS",
             resource="AUTH_GATEWAY",
             risk_score=10 
         )
-        db.add(success_log)
-        db.commit()
 
         # [REAL-TIME] Broadcast Event
         from app.core.events import manager
@@ -100,6 +107,8 @@ async def login(
             "refresh_token": refresh_token,
             "profiles": profiles_data
         }
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         traceback.print_exc()
@@ -107,7 +116,6 @@ async def login(
         raise HTTPException(status_code=500, detail=str(e))
 
 from app.schemas.auth import ProfileSelect
-from app.models.system import System, SystemProfile
 
 @router.post("/select-profile", response_model=Token)
 def select_profile(
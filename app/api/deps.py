@@ -5,10 +5,10 @@ from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from app.core import config, security
 from app.core.jwt import create_access_token
+from app.core.principals import principal_cache
 from app.db.session import get_db
 from app.models.user import User
 from app.schemas.auth import TokenPayload
-from sqlalchemy import select
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{config.settings.API_V1_STR}/auth/login")
 
@@ -27,8 +27,9 @@ def get_current_user(
             detail="Could not validate credentials",
         )
     
-    result = db.execute(select(User).where(User.email == token_data.sub))
-    user = result.scalars().first()
+    # Tokens issued before jti was added are keyed by their signature instead
+    jti = token_data.jti or token.rsplit(".", 1)[-1]
+    user = principal_cache.resolve(db, (token_data.sub, jti), token_data.exp)
     
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
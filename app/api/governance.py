@@ -1,7 +1,8 @@
 from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import select
-from app.db.session import get_db
+from app.db.session import get_async_read_db, get_db
 from app.models.transaction import Transaction
 from typing import List
 from pydantic import BaseModel
@@ -22,11 +23,11 @@ class GovernanceTicketSchema(BaseModel):
         from_attributes = True
 
 @router.get("/tickets", response_model=List[GovernanceTicketSchema])
-def get_governance_tickets(
+async def get_governance_tickets(
     status: str = "PENDING", # Default to pending types
     min_risk: int = 0,
     scope: str = "ALL", # MY_QUEUE vs ALL
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Fetch items requiring governance action with real-time filtering.
@@ -50,7 +51,7 @@ def get_governance_tickets(
     
     query = query.order_by(Transaction.risk_score.desc()).limit(50)
     
-    result = db.execute(query)
+    result = await db.execute(query)
     return result.scalars().all()
 
 class GovernanceAction(BaseModel):
@@ -112,7 +113,7 @@ def take_governance_action(
     return {"status": "success", "new_state": txn.status}
 
 @router.get("/tickets/{ticket_id}/history")
-def get_ticket_history(ticket_id: str, db: Session = Depends(get_db)):
+async def get_ticket_history(ticket_id: str, db: AsyncSession = Depends(get_async_read_db)):
     """
     Fetch audit history for a specific ticket/transaction.
     """
@@ -124,6 +125,9 @@ def get_ticket_history(ticket_id: str, db: Session = Depends(get_db)):
     from app.models.user import AuditLog
     
     # Fetch logs for this resource
-    logs = db.query(AuditLog).filter(AuditLog.resource == clean_id).order_by(AuditLog.timestamp.desc()).all()
+    result = await db.execute(
+        select(AuditLog).where(AuditLog.resource == clean_id).order_by(AuditLog.timestamp.desc())
+    )
+    logs = result.scalars().all()
     
     return logs
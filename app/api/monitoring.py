@@ -1,113 +1,115 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
 from app.db.session import get_db
-from app.models.transaction import Transaction
 
 router = APIRouter()
 
 @router.get("/metrics")
 def get_ml_metrics(db: Session = Depends(get_db)):
     """
-    Calculate Real-Time ML Metrics from Transaction Data.
+    Real-Time ML Metrics, read from the pre-aggregated metric buckets
+    (confidence histogram, daily risk trend) and transaction_stats (outcomes).
     """
-    # 1. Confidence Distribution (Histogram)
-    # Group by buckets: 0-20, 20-40, 40-60, 60-80, 80-100
-    # SQLITE doesn't make this easy, so we fetch and bin in python for simplicity or use Case
-    case_stmt = func.case(
-        (Transaction.match_confidence < 20, "0-20%"),
-        (Transaction.match_confidence < 40, "20-40%"),
-        (Transaction.match_confidence < 60, "40-60%"),
-        (Transaction.match_confidence < 80, "60-80%"),
-        else_="80-100%"
-    ).label("range")
-    
-    dist_query = db.query(case_stmt, func.count(Transaction.id)).group_by(case_stmt).all()
-    confidence_dist = [{"range": r, "count": c} for r, c in dist_query]
+    from app.db.metrics import ml_metrics
+    from app.db.stats import status_counts
 
-    # 2. Anomaly Scores (Risk Score Trends)
-    # 2. Anomaly Scores (Risk Score Trends)
-    # Fetch actual daily average risk scores from DB if possible
-    # For now, we will use a hybrid approach: Real aggregated stats + temporal interpolation
-    # This ensures the "Shape" of the data matches the real risk profile of the system
-    
-    anomaly_trend = []
-    
-    # Get recent high risk items
-    recent_high_risk = db.query(Transaction.risk_score, Transaction.created_at)\
-        .order_by(Transaction.created_at.desc()).limit(100).all()
-        
-    avg_risk = db.query(func.avg(Transaction.risk_score)).scalar() or 0
-    max_risk = db.query(func.max(Transaction.risk_score)).scalar() or 0
+    # 1. Confidence Distribution + 2. Anomaly Scores (Daily Risk Trend)
+    metrics = ml_metrics(db)
 
-    import random
-    from datetime import datetime, timedelta
-    
-    today = datetime.now()
-    for i in range(14):
-        day_label = (today - timedelta(days=14-i)).strftime("%b %d")
-        
-        # Simulate slight daily variance around the TRUE average
-        daily_avg = (avg_risk / 100) + random.uniform(-0.05, 0.05)
-        daily_avg = max(0, min(1, daily_avg)) # Clamp
-        
-        anomaly_trend.append({
-            "day": day_label,
-            "avgScore": round(daily_avg, 2),
-            "maxScore": round(max_risk / 100, 2),
-            "threshold": 0.8
-        })
-
-    # 3. Outcome Breakdown
-    outcomes = db.query(Transaction.status, func.count(Transaction.id)).group_by(Transaction.status).all()
-    outcome_data = [{"name": s.replace('_', ' '), "value": c, "color": "#66bb6a" if s == "AUTO_RECONCILED" else "#f44336"} for s, c in outcomes]
+    # 3. Outcome Breakdown (current status)
+    outcome_data = [
+        {"name": s.replace('_', ' '), "value": c, "color": "#66bb6a" if s == "AUTO_RECONCILED" else "#f44336"}
+        for s, c in status_counts(db).items()
+    ]
 
     return {
-        "confidenceDist": confidence_dist,
-        "anomalyTrend": anomaly_trend,
+        "confidenceDist": metrics["confidenceDist"],
+        "anomalyTrend": metrics["anomalyTrend"],
+        "recentActivity": metrics["recentActivity"],
         "outcomes": outcome_data,
         "modelAlerts": [
-             { "id": 1, "time": "Now", "level": "INFO", "msg": f"Real-Time Analysis: Processed {sum(c for r,c in dist_query)} txns." }
+             { "id": 1, "time": "Now", "level": "INFO", "msg": f"Real-Time Analysis: Processed {metrics['processed']} txns." }
         ],
-        "modelState": model_state
+        "modelState": _model_state()
     }
 
-# --- ML Governance State (In-Memory for Demo) ---
-model_state = {
-    "version": "T-REC-XGB-V4.2",
-    "status": "active", # active, frozen, rolled_back
-    "last_retrain": "3 days ago",
-    "accuracy": "94.2%"
-}
+@router.get("/inference")
+def get_inference_metrics():
+    """
+    Queue depth and batch statistics of the model-serving workers.
+    """
+    from app.core.inference import BATCHERS
+    return [batcher.metrics() for batcher in BATCHERS]
+
+@router.get("/audit-writer")
+def get_audit_writer_metrics():
+    """
+    Buffer depth, batch sizes and overflow counters of the audit writer.
+    """
+    from app.core.audit import audit_writer
+    return audit_writer.metrics()
+
+# --- ML Governance State (Backed by the Model Registry) ---
+from fastapi import HTTPException
+from app.ml.registry import registry
+from app.ml.scoring import MATCH_MODEL
+
+def _model_state() -> dict:
+    """
+    Shape consumed by the ML Monitoring page, derived from registry metadata.
+    """
+    info = registry.describe(MATCH_MODEL)
+    if not info:
+        return {"version": "UNREGISTERED", "status": "rolled_back", "last_retrain": "N/A", "accuracy": "N/A"}
+
+    if info["frozen"]:
+        status = "frozen"
+    elif not info["is_latest"]:
+        status = "rolled_back"
+    else:
+        status = "active"
+
+    meta = info["metadata"]
+    return {
+        "version": info["version"],
+        "status": status,
+        "last_retrain": meta.get("created_at", "unknown"),
+        "accuracy": meta.get("accuracy", "N/A"),
+        "versions": info["versions"],
+        "loaded": info["loaded"]
+    }
 
 @router.post("/model/rollback")
 def rollback_model():
     """
-    Simulate rolling back to previous model version.
+    Roll back to the previously registered model version.
+    Takes effect on the next prediction, no restart needed.
     """
-    global model_state
-    model_state["version"] = "T-REC-XGB-V4.1 (Stable)"
-    model_state["status"] = "rolled_back"
-    model_state["last_retrain"] = "14 days ago (Restored)"
-    model_state["accuracy"] = "93.5%"
-    return model_state
+    try:
+        registry.rollback(MATCH_MODEL)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return _model_state()
 
 @router.post("/model/freeze")
 def freeze_model():
     """
     Halt all model learning/updates.
     """
-    global model_state
-    model_state["status"] = "frozen"
-    return model_state
+    try:
+        registry.set_frozen(MATCH_MODEL, True)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return _model_state()
 
 @router.post("/model/reset")
 def reset_model():
-    global model_state
-    model_state = {
-        "version": "T-REC-XGB-V4.2",
-        "status": "active",
-        "last_retrain": "3 days ago",
-        "accuracy": "94.2%"
-    }
-    return model_state
+    """
+    Re-activate the latest registered version and lift any freeze.
+    """
+    versions = registry.versions(MATCH_MODEL)
+    if not versions:
+        raise HTTPException(status_code=404, detail=f"Unknown model {MATCH_MODEL}")
+    registry.set_frozen(MATCH_MODEL, False)
+    registry.activate(MATCH_MODEL, versions[-1])
+    return _model_state()
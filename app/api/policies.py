@@ -90,4 +90,8 @@ def deploy_policy(
     
     db.commit()
     db.refresh(target)
+    
+    # Next shadow evaluation picks up the new policy
+    from app.core.shadow import shadow_policy_cache
+    shadow_policy_cache.invalidate()
     return {"message": f"Policy {target.version} deployed to {mode}", "policy": target}
@@ -1,14 +1,24 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy import select, desc
-from app.db.session import get_db
-from app.models.transaction import Transaction
+from sqlalchemy import select, update, insert, func, desc, or_, and_
+from app.db.session import get_async_read_db, get_db, ReadSessionLocal
+from app.models.transaction import Transaction, record_stat_deltas, stat_key
 from typing import List, Optional
-from pydantic import BaseModel
+from collections import Counter
+from pydantic import BaseModel, Field
 from datetime import datetime
+import base64
+import csv
+import io
+import json
 
 router = APIRouter()
 
+EXPORT_CHUNK_SIZE = 1000
+
 # Schema for Response (to be safe)
 class TransactionSchema(BaseModel):
     id: str
@@ -24,18 +34,15 @@ class TransactionSchema(BaseModel):
     class Config:
         from_attributes = True
 
-@router.get("", response_model=List[TransactionSchema])
-def get_transactions(
-    status: Optional[str] = Query(None),
-    min_risk: Optional[int] = Query(None),
-    source: Optional[str] = Query(None),
-    min_amount: Optional[float] = Query(None),
-    sla_risk: bool = Query(False),
-    limit: int = 100,
-    db: Session = Depends(get_db)
+def _filtered_query(
+    status: Optional[str],
+    min_risk: Optional[int],
+    source: Optional[str],
+    min_amount: Optional[float],
+    sla_risk: bool
 ):
     """
-    Fetch transactions with real-time filtering.
+    Shared filter logic for the grid and the export stream.
     """
     query = select(Transaction)
     
@@ -55,18 +62,234 @@ def get_transactions(
         from datetime import datetime, timedelta
         cutoff = datetime.now() - timedelta(hours=3)
         query = query.where(Transaction.created_at < cutoff)
+        
+    # Sort by risk (highest first); id breaks ties so the order is total (keyset safe)
+    return query.order_by(desc(Transaction.risk_score), desc(Transaction.id))
+
+def _encode_cursor(txn: Transaction) -> str:
+    raw = json.dumps([txn.risk_score, txn.id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-    # Sort by risk (highest first) by default
-    query = query.order_by(desc(Transaction.risk_score)).limit(limit)
+def _decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        risk_score, txn_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(risk_score), str(txn_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("", response_model=List[TransactionSchema])
+async def get_transactions(
+    response: Response,
+    status: Optional[str] = Query(None),
+    min_risk: Optional[int] = Query(None),
+    source: Optional[str] = Query(None),
+    min_amount: Optional[float] = Query(None),
+    sla_risk: bool = Query(False),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    """
+    Fetch transactions with real-time filtering.
+    Keyset pagination on (risk_score, id): pass the X-Next-Cursor header of one
+    page as `cursor` to get the next. The header is absent on the last page.
+    """
+    query = _filtered_query(status, min_risk, source, min_amount, sla_risk)
+    
+    if cursor:
+        last_risk, last_id = _decode_cursor(cursor)
+        query = query.where(or_(
+            Transaction.risk_score < last_risk,
+            and_(Transaction.risk_score == last_risk, Transaction.id < last_id)
+        ))
     
-    result = db.execute(query)
-    return result.scalars().all()
+    # Fetch one extra row to know whether another page exists
+    rows = (await db.execute(query.limit(limit + 1))).scalars().all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1])
+    return rows
+
+EXPORT_COLUMNS = list(TransactionSchema.model_fields.keys())
+
+@router.get("/export")
+def export_transactions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    status: Optional[str] = Query(None),
+    min_risk: Optional[int] = Query(None),
+    source: Optional[str] = Query(None),
+    min_amount: Optional[float] = Query(None),
+    sla_risk: bool = Query(False),
+):
+    """
+    Stream every matching transaction as NDJSON or CSV.
+    Rows are read through a server-side cursor (yield_per), so memory stays flat
+    regardless of how many rows are exported.
+    """
+    query = _filtered_query(status, min_risk, source, min_amount, sla_risk)
+    
+    def generate():
+        # Own session: the stream outlives the request-scoped dependency
+        db = ReadSessionLocal()
+        try:
+            result = db.execute(query.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+            if format == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(EXPORT_COLUMNS)
+                for chunk in result.scalars().partitions():
+                    for txn in chunk:
+                        writer.writerow([getattr(txn, c) for c in EXPORT_COLUMNS])
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                yield buffer.getvalue()
+            else:
+                for chunk in result.scalars().partitions():
+                    yield "".join(
+                        TransactionSchema.model_validate(txn).model_dump_json() + "\n" for txn in chunk
+                    )
+        finally:
+            db.close()
+    
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"transactions_{datetime.now():%Y%m%d_%H%M%S}.{format}"
+    return StreamingResponse(
+        generate(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.post("/score")
+async def score_transactions(request: Request):
+    """
+    Bulk risk scoring.
+    Body: NDJSON, one feature object per line (same keys as calculate_risk_score,
+    plus an optional "id" that is echoed back).
+    Response: NDJSON of {"id", "risk_score"} in input order.
+    """
+    import pandas as pd
+    from app.ml.scoring import calculate_risk_scores, INPUT_COLS
+
+    body = await request.body()
+    rows, numbers = [], []
+    for number, line in enumerate(body.splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid NDJSON on line {number}: {e}")
+        if not isinstance(row, dict):
+            raise HTTPException(status_code=400, detail=f"Invalid NDJSON on line {number}: expected a JSON object")
+        rows.append(row)
+        numbers.append(number)
+    if not rows:
+        return Response(content="", media_type="application/x-ndjson")
+
+    df = pd.DataFrame(rows)
+    missing = [c for c in INPUT_COLS if c not in df.columns]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing feature columns: {missing}")
+
+    # Non-numeric (or boolean / null) features would fail inside scoring, and in
+    # the shared batcher; reject them here with their line and column
+    features = df[INPUT_COLS].apply(pd.to_numeric, errors="coerce")
+    invalid = features.isna() | df[INPUT_COLS].map(lambda v: isinstance(v, bool))
+    if invalid.to_numpy().any():
+        row, col = next(zip(*invalid.to_numpy().nonzero()))
+        column = INPUT_COLS[col]
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid NDJSON on line {numbers[row]}: {column} must be a number, got {rows[row].get(column)!r}",
+        )
+    df[INPUT_COLS] = features
+    for row, values in zip(rows, features.to_dict("records")):
+        row.update(values) # e.g. "3" -> 3.0 for the batcher
+
+    # Small requests are coalesced with concurrent ones by the inference worker;
+    # large bodies are already a batch. Either way inference stays off the event loop.
+    from app.core.inference import risk_batcher
+    if len(rows) < risk_batcher.max_batch:
+        scores = await risk_batcher.submit_many(rows)
+    else:
+        scores = await run_in_threadpool(calculate_risk_scores, df)
+
+    lines = (json.dumps({"id": r.get("id"), "risk_score": round(float(sc), 2)}) for r, sc in zip(rows, scores))
+    return Response(content="\n".join(lines) + "\n", media_type="application/x-ndjson")
 
 class StatusUpdate(BaseModel):
     status: str
     reason_code: Optional[str] = None
     justification: Optional[str] = None
 
+BULK_STATUS_MAX_IDS = 1000
+
+class BulkStatusUpdate(StatusUpdate):
+    ids: List[str] = Field(..., min_length=1, max_length=BULK_STATUS_MAX_IDS)
+
+@router.patch("/status")
+def bulk_update_transaction_status(
+    update_data: BulkStatusUpdate,
+    db: Session = Depends(get_db)
+):
+    """
+    Approve or Reject many transactions at once (Governance Action).
+    One UPDATE ... WHERE id IN, one executemany for the audit rows, one commit.
+    Shadow comparisons are queued for the background shadow worker.
+    """
+    from app.models.user import AuditLog
+    from app.core.shadow import shadow_queue, shadow_action
+    
+    ids = list(dict.fromkeys(update_data.ids)) # De-duplicate, keep order
+    
+    # 1. Resolve which ids exist (audit only what we actually change)
+    existing = db.execute(
+        select(Transaction.id, Transaction.status, Transaction.risk_score, Transaction.created_at)
+        .where(Transaction.id.in_(ids))
+    ).all()
+    found = {row.id for row in existing}
+    updated = [i for i in ids if i in found]
+    
+    if updated:
+        # 2. Update Status (single statement)
+        db.execute(
+            update(Transaction)
+            .where(Transaction.id.in_(updated))
+            .values(status=update_data.status, updated_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        
+        # 3. Audit Logs (executemany)
+        db.execute(insert(AuditLog), [
+            {
+                "event_type": f"MANUAL_{update_data.status}",
+                "actor_id": "admin@jpm.com", # Hardcoded for now (Auth disabled)
+                "resource": txn_id,
+                "outcome": "SUCCESS",
+                "risk_score": 0
+            }
+            for txn_id in updated
+        ])
+        
+        # 4. Dashboard Summary (Core update bypasses the mapper events)
+        deltas = Counter()
+        for row in existing:
+            deltas[stat_key(row.created_at, row.status, row.risk_score)] -= 1
+            deltas[stat_key(row.created_at, update_data.status, row.risk_score)] += 1
+        record_stat_deltas(db, deltas)
+        db.commit()
+        
+        # 5. Shadow Mode Comparison (batched, off the request path)
+        shadow_queue.enqueue(updated, shadow_action(update_data.status))
+    
+    return {
+        "status": update_data.status,
+        "updated": len(updated),
+        "not_found": [i for i in ids if i not in found]
+    }
+
 @router.patch("/{transaction_id}/status")
 def update_transaction_status(
     transaction_id: str,
@@ -100,17 +323,9 @@ def update_transaction_status(
     db.commit()
     db.refresh(txn)
 
-    # 4. Trigger Shadow Mode Comparison (Async ideally, blocking for now)
-    try:
-        from app.core.shadow import ShadowRunner
-        shadow = ShadowRunner(db)
-        # Map manual status to action space
-        actual_action = "AUTO" if update_data.status == "AUTO_RECONCILED" else "REVIEW" 
-        if update_data.status == "REJECTED": actual_action = "REVIEW" # Reject counts as manual review outcome
-        
-        shadow.run_comparison(txn, actual_action)
-    except Exception as e:
-        print(f"Shadow Runner failed: {e}")
+    # 4. Queue Shadow Mode Comparison (evaluated in batches by the background worker)
+    from app.core.shadow import shadow_queue, shadow_action
+    shadow_queue.enqueue([txn.id], shadow_action(update_data.status))
     
     return txn
 
@@ -127,8 +342,46 @@ class TransactionDetailResponse(BaseModel):
     delta: float = 0.0
     explainability: List[str] = []
 
+# Candidate scoring: 70% amount similarity (-10 pts per unit of diff), 30% counterparty.
+CANDIDATE_MIN_SCORE = 50
+# Largest amount delta that can still clear the threshold with a perfect counterparty
+# match; used as the SQL range so the window never drops a viable candidate.
+CANDIDATE_MAX_DELTA = (100 - (CANDIDATE_MIN_SCORE - 0.3 * 100) / 0.7) / 10
+
+def _candidate_score(txn: Transaction, cand: Transaction) -> float:
+    # Simple Similarity Score
+    amt_diff = abs(cand.amount - txn.amount)
+    amt_score = max(0, 100 - (amt_diff * 10)) # Penalize 10 points per dollar diff
+    
+    # Name fuzzy match (mocked heavily)
+    name_score = 50 # Base
+    if txn.counterparty and cand.counterparty and txn.counterparty in cand.counterparty:
+        name_score = 100
+        
+    return (amt_score * 0.7) + (name_score * 0.3)
+
+async def _find_candidates(db: AsyncSession, txn: Transaction) -> List[Transaction]:
+    """
+    Indexed candidate query: currency equality + amount range (composite index),
+    value-date window, closest amounts first, capped at CANDIDATE_TOP_K rows.
+    """
+    from datetime import timedelta
+    from app.core.config import settings
+    
+    query = select(Transaction).where(
+        Transaction.currency == txn.currency,
+        Transaction.amount.between(txn.amount - CANDIDATE_MAX_DELTA, txn.amount + CANDIDATE_MAX_DELTA),
+        Transaction.source != txn.source, # Simplification for demo
+    )
+    if txn.value_date is not None:
+        window = timedelta(days=settings.CANDIDATE_DATE_WINDOW_DAYS)
+        query = query.where(Transaction.value_date.between(txn.value_date - window, txn.value_date + window))
+        
+    query = query.order_by(func.abs(Transaction.amount - txn.amount)).limit(settings.CANDIDATE_TOP_K)
+    return (await db.execute(query)).scalars().all()
+
 @router.get("/{transaction_id}/details", response_model=TransactionDetailResponse)
-def get_transaction_details(transaction_id: str, db: Session = Depends(get_db)):
+async def get_transaction_details(transaction_id: str, db: AsyncSession = Depends(get_async_read_db)):
     """
     Fetch comprehensive details for a transaction, including:
     - The transaction itself (Side A)
@@ -136,38 +389,19 @@ def get_transaction_details(transaction_id: str, db: Session = Depends(get_db)):
     - Explainability factors for the risk score
     """
     # 1. Fetch Requesting Transaction
-    txn = db.query(Transaction).filter(Transaction.id == transaction_id).first()
+    txn = await db.get(Transaction, transaction_id)
     if not txn:
         raise HTTPException(status_code=404, detail="Transaction not found")
         
     response = TransactionDetailResponse(transaction=txn, candidate=None)
     
     # 2. Find Best Candidate (Real-time logic)
-    # Strategy: Find opposite source, same currency, closest amount
-    opposite_source = "SWIFT" if txn.source == "INTERNAL" else "INTERNAL" # Simplified
-    
-    # Tolerance window: +/- 5% amount, T +/- 1 day (omitted for speed)
-    candidates = db.query(Transaction).filter(
-        Transaction.source != txn.source, # Simplification for demo
-        Transaction.currency == txn.currency
-    ).all()
-    
-    best_candidate = None
-    best_score = 0
-    
-    for cand in candidates:
-        # Simple Similarity Score
-        amt_diff = abs(cand.amount - txn.amount)
-        amt_score = max(0, 100 - (amt_diff * 10)) # Penalize 10 points per dollar diff
-        
-        # Name fuzzy match (mocked heavily)
-        name_score = 50 # Base
-        if txn.counterparty and cand.counterparty and txn.counterparty in cand.counterparty:
-            name_score = 100
-            
-        final_score = (amt_score * 0.7) + (name_score * 0.3)
-        
-        if final_score > best_score and final_score > 50: # Threshold
+    # Strategy: opposite source, same currency, amount/value-date window applied in SQL
+    # (served by ix_transactions_currency_amount), then score only the top-K closest.
+    best_candidate, best_score = None, 0
+    for cand in await _find_candidates(db, txn):
+        final_score = _candidate_score(txn, cand)
+        if final_score > best_score and final_score > CANDIDATE_MIN_SCORE: # Threshold
             best_candidate = cand
             best_score = final_score
             
@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.user import AuditLog
+
+class AuditWriter:
+    """
+    Buffered audit log writer.
+
+    write() appends a row to a bounded in-memory buffer and returns immediately;
+    a worker task bulk-inserts the buffer every `flush_interval_ms`, or as soon
+    as `max_batch` rows are waiting, in one transaction. Remaining rows are
+    flushed on shutdown.
+
+    Overflow: above the high watermark only every `sample_every`-th routine row
+    is kept (essential rows, e.g. security events, are never sampled); when the
+    buffer is full, new rows are dropped. Both are counted in metrics().
+    """
+
+    def __init__(
+        self,
+        max_batch: int = 500,
+        flush_interval_ms: float = 200,
+        max_queue: int = 10000,
+        sample_every: int = 10,
+        high_watermark: float = 0.75,
+    ):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_queue = max_queue
+        self.sample_every = sample_every
+        self.high_watermark = int(max_queue * high_watermark)
+
+        self._lock = threading.Lock()
+        self._buffer: deque = deque()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._sample_counter = 0
+
+        # Metrics
+        self.written = 0
+        self.batches = 0
+        self.sampled_out = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_depth = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def write(self, essential: bool = False, **fields: Any):
+        """
+        Queue one AuditLog row (column=value). Thread-safe. Writes inline when
+        the worker is not running (scripts, tests).
+        """
+        fields.setdefault("timestamp", datetime.utcnow()) # Event time, not flush time
+        if not self.running:
+            self._insert([fields])
+            return
+
+        with self._lock:
+            depth = len(self._buffer)
+            if depth >= self.max_queue:
+                self.dropped += 1
+                return
+            if not essential and depth >= self.high_watermark:
+                self._sample_counter += 1
+                if self._sample_counter % self.sample_every:
+                    self.sampled_out += 1
+                    return
+            self._buffer.append(fields)
+            depth += 1
+            self.max_depth = max(self.max_depth, depth)
+
+        if depth >= self.max_batch:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the worker and write whatever is still buffered.
+        """
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        await self._flush()
+
+    # --- Worker ---
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self._flush()
+
+    async def _flush(self):
+        while True:
+            with self._lock:
+                batch = [self._buffer.popleft() for _ in range(min(self.max_batch, len(self._buffer)))]
+            if not batch:
+                return
+            await run_in_threadpool(self._insert, batch)
+
+    def _insert(self, rows: List[Dict[str, Any]]):
+        # executemany needs a uniform column set; callers may set different optional fields
+        groups: Dict[tuple, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+
+        db = SessionLocal()
+        try:
+            for group in groups.values():
+                db.execute(insert(AuditLog), group)
+            db.commit()
+            self.written += len(rows)
+            self.batches += 1
+        except Exception as e:
+            db.rollback()
+            self.failed += len(rows)
+            print(f"Audit Log Failed: {e}")
+        finally:
+            db.close()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queue_depth": len(self._buffer),
+            "max_depth": self.max_depth,
+            "written": self.written,
+            "batches": self.batches,
+            "avg_batch_size": round(self.written / self.batches, 2) if self.batches else 0.0,
+            "sampled_out": self.sampled_out,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "max_batch": self.max_batch,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "max_queue": self.max_queue,
+        }
+
+audit_writer = AuditWriter(
+    max_batch=settings.AUDIT_MAX_BATCH,
+    flush_interval_ms=settings.AUDIT_FLUSH_INTERVAL_MS,
+    max_queue=settings.AUDIT_MAX_QUEUE,
+)
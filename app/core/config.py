@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 
 class Settings(BaseSettings):
     PROJECT_NAME: str = "Resonant IAM"
@@ -11,10 +11,52 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    AUTH_CACHE_TTL_SECONDS: float = 60.0 # Resolved principals (get_current_user); 0 disables
+    AUTH_CACHE_MAX_ENTRIES: int = 10000
+    PASSWORD_HASH_WORKERS: Optional[int] = None # Concurrent argon2 hashes; defaults to the CPU count
     
     # DATABASE
     # Fallback to SQLite for Playground/Demo Env (Postgres requires ext server)
     DATABASE_URL: str = "sqlite:///./resonant.db"
+    DATABASE_READ_URL: Optional[str] = None # Read-only pool (e.g. a replica); defaults to DATABASE_URL
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_READ_POOL_SIZE: int = 20
+    
+    # SQLITE PROFILE (per-connection pragmas, ignored for other backends)
+    SQLITE_JOURNAL_MODE: str = "WAL" # Readers no longer block the writer (and vice versa)
+    SQLITE_SYNCHRONOUS: str = "NORMAL" # Safe with WAL: fsync at checkpoint, not every commit
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000 # Wait for the write lock instead of "database is locked"
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456 # 256 MB
+    
+    # ARCHIVAL (settled transactions -> compressed cold storage)
+    ARCHIVE_AFTER_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 5000
+    
+    # FORENSIC LEDGER (Merkle blocks)
+    LEDGER_BLOCK_SIZE: int = 4096 # Entries per sealed block
+    LEDGER_SEAL_INTERVAL_SECONDS: float = 60.0
+    LEDGER_TIP_CACHE_SIZE: int = 100000 # Chain tips kept by the batched append API
+    
+    # ML INFERENCE (Dynamic Batching)
+    INFERENCE_MAX_BATCH: int = 64
+    INFERENCE_MAX_LATENCY_MS: float = 5.0
+    
+    # MATCH CANDIDATE LOOKUP (Transaction Details)
+    CANDIDATE_TOP_K: int = 20
+    CANDIDATE_DATE_WINDOW_DAYS: int = 1
+    
+    # AUDIT WRITER (Buffered AuditMiddleware inserts)
+    AUDIT_MAX_BATCH: int = 500
+    AUDIT_FLUSH_INTERVAL_MS: float = 200.0
+    AUDIT_MAX_QUEUE: int = 10000
+    
+    # WEBSOCKET FAN-OUT (/ws/admin)
+    WS_QUEUE_SIZE: int = 100
+    WS_OVERFLOW_POLICY: str = "drop_oldest" # drop_oldest | disconnect
+    WS_COALESCE_WINDOW_MS: float = 500.0 # Heartbeat / drift / forensic bursts
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = ["http://localhost:3000"]
@@ -0,0 +1,191 @@
+import asyncio
+import copy
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+from fastapi import WebSocket
+from fastapi.concurrency import run_in_threadpool
+from app.core.events import manager
+from app.db.metrics import prune_metric_buckets
+from app.db.session import SessionLocal
+from app.db.stats import dashboard_counts, rollup_transaction_stats, summarize
+from app.models.transaction import StatKey, stat_subscribers
+
+COUNTERS = ("ops_backlog", "high_risk_count", "sla_breaches")
+
+class DashboardFeed:
+    """
+    Push-based control-room KPIs over /ws/admin.
+
+    Committed transaction_stats deltas are coalesced for `flush_interval_ms` and
+    broadcast as one compact DASHBOARD_DELTA (only the counters that moved).
+    The feed keeps its own copy of the KPIs, so a new client gets a
+    DASHBOARD_SNAPSHOT without a DB read. The snapshot is re-read from the DB
+    once per hour, when the aging/SLA/throughput windows move, and broadcast;
+    that hourly read also folds aged transaction_stats buckets (rollup) and
+    drops expired MINUTE metric buckets, so the dashboard and metrics read
+    paths never write.
+    Writers in other processes (ingest_watcher) are not seen as deltas: they
+    call resync() through /admin/events/ingest, which re-reads the snapshot
+    on the next flush.
+
+    Clients apply deltas with seq greater than their snapshot's seq.
+    """
+    def __init__(self, flush_interval_ms: float = 250):
+        self.flush_interval = flush_interval_ms / 1000.0
+
+        self._lock = threading.Lock()
+        self._pending: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+
+        self.seq = 0
+        self.snapshot: Dict[str, Any] = {}
+        self._hour: Optional[datetime] = None
+        self._rolled_up: Optional[datetime] = None
+        self._resync = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def record(self, deltas: Dict[StatKey, int]):
+        """
+        Session after_commit subscriber; called from request/worker threads.
+        """
+        with self._lock:
+            self._pending.update(deltas)
+
+    async def start(self):
+        if self.running:
+            return
+        stat_subscribers.append(self.record)
+        await self._refresh(datetime.utcnow())
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self.record in stat_subscribers:
+            stat_subscribers.remove(self.record)
+
+    def resync(self):
+        """
+        Re-read the snapshot from the DB on the next flush (coalesced).
+        """
+        self._resync = True
+
+    async def send_snapshot(self, websocket: WebSocket):
+        if self.snapshot:
+            await manager.send(websocket, self._message("DASHBOARD_SNAPSHOT", self.snapshot))
+
+    # --- Worker ---
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self._flush()
+            except Exception as e:
+                print(f"Error in dashboard feed: {e}")
+
+    async def _flush(self):
+        now = datetime.utcnow()
+        if self._resync or now.replace(minute=0, second=0, microsecond=0) != self._hour:
+            # Windows moved, or another process wrote transactions
+            self._resync = False
+            await self._refresh(now)
+            await manager.broadcast(self._message("DASHBOARD_SNAPSHOT", self.snapshot))
+            return
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        rows = [(b, s, r, n) for (b, s, r), n in pending.items() if n]
+        if not rows:
+            return
+
+        delta = _compact(summarize(rows, now))
+        if not delta:
+            return
+        _apply(self.snapshot, delta)
+        self.seq += 1
+        await manager.broadcast(self._message("DASHBOARD_DELTA", delta))
+
+    async def _refresh(self, now: datetime):
+        """
+        Replaces the snapshot with a DB read. Deltas recorded before the read
+        starts were committed before it, so they are in the read and dropped;
+        deltas recorded from then on stay pending and apply on top of it.
+        """
+        hour = now.replace(minute=0, second=0, microsecond=0)
+
+        def read():
+            db = SessionLocal()
+            try:
+                if self._rolled_up != hour:
+                    try:
+                        rollup_transaction_stats(db, now)
+                        prune_metric_buckets(db, now)
+                        self._rolled_up = hour
+                    except Exception as e:
+                        db.rollback() # Compaction only: the read below is correct without it
+                        print(f"⚠️ Summary compaction failed: {e}")
+                with self._lock:
+                    self._pending.clear()
+                return dashboard_counts(db, now)
+            finally:
+                db.close()
+
+        self.snapshot = await run_in_threadpool(read)
+        self._hour = hour
+        self.seq += 1
+
+    def _message(self, event_type: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": f"{event_type}-{self.seq}",
+            "type": event_type,
+            "seq": self.seq,
+            "data": copy.deepcopy(payload),
+            "timestamp": datetime.now().isoformat(),
+            "severity": "info"
+        }
+
+def _compact(kpis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Drops every counter that did not move; lists become {label: delta} maps.
+    """
+    delta: Dict[str, Any] = {k: kpis[k] for k in COUNTERS if kpis[k]}
+
+    aging = {e["bucket"]: e["count"] for e in kpis["queue_aging"] if e["count"]}
+    risk = {e["name"]: e["value"] for e in kpis["risk_distribution"] if e["value"]}
+    throughput = {
+        e["hour"]: {k: e[k] for k in ("matched", "exceptions") if e[k]}
+        for e in kpis["throughput"] if e["matched"] or e["exceptions"]
+    }
+    if aging:
+        delta["queue_aging"] = aging
+    if risk:
+        delta["risk_distribution"] = risk
+    if throughput:
+        delta["throughput"] = throughput
+    return delta
+
+def _apply(snapshot: Dict[str, Any], delta: Dict[str, Any]):
+    for key in COUNTERS:
+        snapshot[key] += delta.get(key, 0)
+    for entry in snapshot["queue_aging"]:
+        entry["count"] += delta.get("queue_aging", {}).get(entry["bucket"], 0)
+    for entry in snapshot["risk_distribution"]:
+        entry["value"] += delta.get("risk_distribution", {}).get(entry["name"], 0)
+    for entry in snapshot["throughput"]:
+        moved = delta.get("throughput", {}).get(entry["hour"], {})
+        entry["matched"] += moved.get("matched", 0)
+        entry["exceptions"] += moved.get("exceptions", 0)
+
+dashboard_feed = DashboardFeed()
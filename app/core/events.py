@@ -1,27 +1,217 @@
+import asyncio
+import json
 from fastapi import WebSocket
-from typing import List
+from typing import Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.telemetry import telemetry
+
+ws_clients = telemetry.gauge("ws_clients", "Connected /ws/admin clients.")
+ws_messages = telemetry.counter("ws_messages_total", "WebSocket messages queued for delivery.")
+ws_dropped = telemetry.counter("ws_messages_dropped_total", "WebSocket messages dropped on a full client queue.")
+ws_evicted = telemetry.counter("ws_clients_evicted_total", "Clients disconnected by the overflow policy.")
+ws_coalesced = telemetry.counter("ws_events_coalesced_total", "Events merged into a later event of the same kind.", ("type",))
+
+# Event type -> subscription topic (unlisted types use their lower-cased type)
+TOPICS = {
+    "SYSTEM_HEARTBEAT": "system",
+    "ML_DRIFT": "ml",
+    "LOGIN": "security",
+    "FORENSIC_EVENT": "forensic",
+    "DASHBOARD_SNAPSHOT": "dashboard",
+    "DASHBOARD_DELTA": "dashboard",
+}
+
+# High-frequency state updates merged per window: the latest event per key wins
+# and carries `coalesced` = number of events it stands for. Distinct events
+# (e.g. FORENSIC_EVENT, one per ingested file) are never merged.
+COALESCE_KEYS = {
+    "SYSTEM_HEARTBEAT": "system_code",
+    "ML_DRIFT": "model",
+}
+
+def topic_of(message: dict) -> str:
+    event_type = str(message.get("type", ""))
+    return TOPICS.get(event_type, event_type.lower())
+
+class _Client:
+    """
+    One connection with its own bounded outbox and sender task, so a slow
+    browser only ever delays itself.
+    """
+    def __init__(self, websocket: WebSocket, queue_size: int):
+        self.websocket = websocket
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: asyncio.Task = None
+        self.dropped = 0
+        self.topics: Optional[Set[str]] = None # None = everything (clients that never subscribe)
+
+    def wants(self, topic: str) -> bool:
+        return self.topics is None or topic in self.topics
 
 class ConnectionManager:
     """
     Manages WebSocket connections for Admin Real-Time Updates.
+
+    broadcast() serializes each message once and enqueues the text on every
+    client's bounded queue; per-client tasks do the actual sends. When a
+    queue is full the overflow policy applies: "drop_oldest" discards the
+    oldest pending message, "disconnect" closes the lagging client.
+
+    Clients pick topics by sending {"action": "subscribe"|"unsubscribe",
+    "topics": [...]}; each message only goes to clients subscribed to its
+    topic. Event types in COALESCE_KEYS are held for `coalesce_window_ms` and
+    merged, so a burst costs one message per key per window.
     """
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, queue_size: int = 100, overflow: str = "drop_oldest", coalesce_window_ms: float = 500):
+        self.queue_size = queue_size
+        self.overflow = overflow
+        self.coalesce_window = coalesce_window_ms / 1000.0
+        self.clients: Dict[WebSocket, _Client] = {}
+
+        self._window: Dict[Tuple[str, str], Tuple[dict, int]] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.clients)
 
     async def connect(self, websocket: WebSocket):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        client = _Client(websocket, self.queue_size)
+        client.task = asyncio.create_task(self._sender(client))
+        self.clients[websocket] = client
+        ws_clients.inc()
 
     def disconnect(self, websocket: WebSocket):
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
+        client = self.clients.pop(websocket, None)
+        if client is None:
+            return
+        ws_clients.dec()
+        if client.task is not asyncio.current_task():
+            client.task.cancel()
+
+    async def send(self, websocket: WebSocket, message: dict):
+        """
+        Queue a message for one client (keeps ordering with broadcasts).
+        """
+        client = self.clients.get(websocket)
+        if client is not None:
+            self._enqueue(client, _serialize(message))
+
+    async def handle(self, websocket: WebSocket, text: str):
+        """
+        Client -> server control messages (topic subscriptions). Anything else is ignored.
+        """
+        client = self.clients.get(websocket)
+        try:
+            request = json.loads(text)
+        except ValueError:
+            return
+        if client is None or not isinstance(request, dict):
+            return
+
+        action = request.get("action")
+        topics = {str(t) for t in request.get("topics") or []}
+        if action == "subscribe":
+            # The first subscribe narrows an everything-client down to the listed topics
+            if "*" in topics:
+                client.topics = None
+            elif client.topics is None:
+                client.topics = topics
+            else:
+                client.topics |= topics
+        elif action == "unsubscribe":
+            if client.topics is None:
+                client.topics = set(TOPICS.values())
+            client.topics -= topics
+        else:
+            return
+        self._enqueue(client, _serialize({
+            "type": "SUBSCRIBED",
+            "topics": sorted(client.topics) if client.topics is not None else ["*"],
+        }))
 
     async def broadcast(self, message: dict):
-        for connection in self.active_connections:
-            try:
-                await connection.send_json(message)
-            except Exception:
-                # Handle disconnect if send fails
-                self.disconnect(connection)
-
-manager = ConnectionManager()
+        event_type = message.get("type")
+        if event_type in COALESCE_KEYS and self.coalesce_window > 0:
+            self._coalesce(message)
+            return
+        self._fanout(message)
+        await asyncio.sleep(0) # Let the sender tasks pick up before the next broadcast
+
+    def _fanout(self, message: dict):
+        topic = topic_of(message)
+        text = None
+        for client in list(self.clients.values()):
+            if not client.wants(topic):
+                continue
+            if text is None:
+                text = _serialize(message) # Once, and only if someone listens
+            self._enqueue(client, text)
+
+    def _coalesce(self, message: dict):
+        event_type = message["type"]
+        key = (event_type, str(message.get(COALESCE_KEYS[event_type])))
+        previous = self._window.get(key)
+        count = previous[1] + 1 if previous else 1
+        if previous:
+            ws_coalesced.inc(event_type)
+        self._window[key] = (message, count)
+
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.coalesce_window, self._flush_window)
+
+    def _flush_window(self):
+        window, self._window = self._window, {}
+        self._flush_handle = None
+        for message, count in window.values():
+            if count > 1:
+                message = {**message, "coalesced": count}
+            self._fanout(message)
+
+    def _enqueue(self, client: _Client, text: str):
+        ws_messages.inc()
+        try:
+            client.queue.put_nowait(text)
+            return
+        except asyncio.QueueFull:
+            pass
+
+        ws_dropped.inc()
+        client.dropped += 1
+        if self.overflow == "disconnect":
+            ws_evicted.inc()
+            self.disconnect(client.websocket)
+            asyncio.create_task(_close(client.websocket))
+            return
+
+        # drop_oldest: the newest state is worth more than a stale event
+        client.queue.get_nowait()
+        client.queue.put_nowait(text)
+
+    async def _sender(self, client: _Client):
+        try:
+            while True:
+                text = await client.queue.get()
+                await client.websocket.send_text(text)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Handle disconnect if send fails
+            self.disconnect(client.websocket)
+
+def _serialize(message: dict) -> str:
+    # Same encoding as WebSocket.send_json
+    return json.dumps(message, separators=(",", ":"), ensure_ascii=False, default=str)
+
+async def _close(websocket: WebSocket):
+    try:
+        await websocket.close(code=1013) # Try again later
+    except Exception:
+        pass
+
+manager = ConnectionManager(
+    queue_size=settings.WS_QUEUE_SIZE,
+    overflow=settings.WS_OVERFLOW_POLICY,
+    coalesce_window_ms=settings.WS_COALESCE_WINDOW_MS,
+)
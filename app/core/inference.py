@@ -0,0 +1,199 @@
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.telemetry import inference_batch_size, inference_latency
+
+class InferenceBatcher:
+    """
+    Dynamic request batching for model inference.
+
+    Callers submit single items to an asyncio queue. A worker task takes the first
+    item, keeps collecting until `max_batch` items are queued or `max_latency_ms`
+    has passed, then runs one batched prediction in the threadpool and resolves
+    every caller's future with its own result.
+
+    batch_fn: List[item] -> List[result] (same length and order).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        batch_fn: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int = 64,
+        max_latency_ms: float = 5.0,
+        max_queue: int = 10000,
+    ):
+        self.name = name
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_latency = max_latency_ms / 1000.0
+        self.max_queue = max_queue
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._collecting: List[tuple] = []  # Dequeued, not yet executed
+
+        # Metrics
+        self.batches = 0
+        self.items = 0
+        self.max_queue_depth = 0
+        self.last_batch_size = 0
+        self.last_batch_ms = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        # Fail anything still waiting rather than leaving callers hanging
+        waiting, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for _, future in waiting:
+            if not future.done():
+                future.set_exception(RuntimeError(f"{self.name} batcher stopped"))
+        self._task = None
+
+    # --- Submission ---
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Queue one item and wait for its result. Runs inline if the worker is not started.
+        """
+        if not self.running:
+            return (await run_in_threadpool(self.batch_fn, [item]))[0]
+
+        future = self._loop.create_future()
+        await self._queue.put((item, future))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return await future
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        return list(await asyncio.gather(*(self.submit(i) for i in items)))
+
+    def submit_sync(self, item: Any, timeout: float = 30.0) -> Any:
+        """
+        Entry point for sync code running in the threadpool (def endpoints).
+        Falls back to an inline single-item batch outside the server (scripts, tests).
+        Blocking on the worker from the event loop thread would deadlock, so
+        async code must await submit() instead.
+        """
+        if not self.running:
+            return self.batch_fn([item])[0]
+        try:
+            in_loop = asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            in_loop = False
+        if in_loop:
+            raise RuntimeError(f"{self.name} batcher: submit_sync() called on the event loop thread; await submit() instead")
+        return asyncio.run_coroutine_threadsafe(self.submit(item), self._loop).result(timeout)
+
+    # --- Worker ---
+
+    async def _run(self):
+        while True:
+            batch = self._collecting
+            batch.append(await self._queue.get())
+            deadline = self._loop.time() + self.max_latency
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            # Stays in _collecting while it runs: stop() fails whatever it did not resolve
+            await self._execute(batch)
+            self._collecting = []
+
+    async def _execute(self, batch: List[tuple]):
+        """
+        Runs one batch. If batch_fn fails, the batch is split in half and each
+        half retried, so only the items that fail on their own get the error.
+        """
+        items = [item for item, _ in batch]
+        start = time.perf_counter()
+        try:
+            results = list(await run_in_threadpool(self.batch_fn, items))
+            if len(results) != len(batch):
+                raise RuntimeError(f"{self.name} batch_fn returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                await self._execute(batch[:middle])
+                await self._execute(batch[middle:])
+                return
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        finally:
+            elapsed = time.perf_counter() - start
+            self.last_batch_ms = elapsed * 1000
+            inference_latency.observe(elapsed, self.name)
+            inference_batch_size.observe(len(batch), self.name)
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+        self.batches += 1
+        self.items += len(batch)
+        self.last_batch_size = len(batch)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "running": self.running,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "max_queue_depth": self.max_queue_depth,
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "last_batch_ms": round(self.last_batch_ms, 3),
+            "max_batch": self.max_batch,
+            "max_latency_ms": self.max_latency * 1000,
+        }
+
+# --- Batch Functions ---
+
+def _score_batch(rows: List[dict]) -> List[float]:
+    import pandas as pd
+    from app.ml.scoring import calculate_risk_scores
+    return calculate_risk_scores(pd.DataFrame(rows)).tolist()
+
+risk_batcher = InferenceBatcher(
+    "risk_score", _score_batch,
+    max_batch=settings.INFERENCE_MAX_BATCH, max_latency_ms=settings.INFERENCE_MAX_LATENCY_MS
+)
+# Shadow policy evaluation is batched by app.core.shadow.ShadowQueue
+BATCHERS = [risk_batcher]
+
+async def start_batchers():
+    for batcher in BATCHERS:
+        await batcher.start()
+
+async def stop_batchers():
+    for batcher in BATCHERS:
+        await batcher.stop()
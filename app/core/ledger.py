@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import event, exists, insert, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.ledger import GENESIS_HASH, seal_ledger
+from app.db.session import SessionLocal
+from app.models.ledger import ForensicLedger
+
+def chain_hash(data: str, previous_hash: str) -> str:
+    """
+    payload_hash of a ledger entry: SHA-256 of its metadata_json followed by the previous hash.
+    """
+    return hashlib.sha256(f"{data}{previous_hash}".encode()).hexdigest()
+
+class LedgerAppender:
+    """
+    Batched ForensicLedger writes.
+
+    append() takes stage events for any number of transactions, chains each
+    transaction's events in memory and inserts the whole batch with one
+    executemany, in the caller's transaction. The tip hash of every chain is
+    cached (LRU, `max_tips`), so appending to a known transaction reads
+    nothing; tips of transactions not in the cache are read with one query
+    per batch. Cache updates apply on commit and are discarded on rollback.
+
+    Chains are assumed to have one writer process at a time (each worker
+    owns the transactions it ingests): another process appending to the
+    same transaction is not seen by this cache.
+    """
+    def __init__(self, max_tips: int = 100000):
+        self.max_tips = max_tips
+        self._lock = threading.Lock()
+        self._tips: "OrderedDict[str, str]" = OrderedDict()
+
+        # Metrics
+        self.appended = 0
+        self.batches = 0
+        self.tip_hits = 0
+        self.tip_reads = 0
+
+    def append(self, db: Session, events: Iterable[Dict[str, Any]], new_chains: bool = False) -> List[Dict[str, Any]]:
+        """
+        Each event: txn_id, event_type, stage, actor, payload (JSON-able, or
+        an already serialized string) and optionally timestamp. Events of one
+        transaction are chained in the order given. Returns the inserted rows.
+
+        new_chains=True: transactions not in the cache have no entries yet
+        (e.g. at ingestion), so their chains start at GENESIS_HASH unread.
+        """
+        events = list(events)
+        if not events:
+            return []
+
+        # 1. Tips: this session's uncommitted appends, then the cache, then the DB
+        staged: Dict[str, str] = db.info.setdefault("ledger_tips", {})
+        tips: Dict[str, str] = {}
+        unknown = []
+        with self._lock:
+            for txn_id in dict.fromkeys(e["txn_id"] for e in events):
+                tip = staged.get(txn_id) or self._tips.get(txn_id)
+                if tip is None:
+                    unknown.append(txn_id)
+                else:
+                    tips[txn_id] = tip
+        self.tip_hits += len(tips)
+        if unknown and not new_chains:
+            self.tip_reads += len(unknown)
+            tips.update(self._read_tips(db, unknown))
+
+        # 2. Chain in memory
+        now = datetime.utcnow()
+        rows = []
+        for e in events:
+            payload = e.get("payload")
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            previous = tips.get(e["txn_id"], GENESIS_HASH)
+            current = chain_hash(data, previous)
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "txn_id": e["txn_id"],
+                "event_type": e["event_type"],
+                "stage": e["stage"],
+                "actor": e["actor"],
+                "payload_hash": current,
+                "previous_hash": previous,
+                "metadata_json": data,
+                "timestamp": e.get("timestamp") or now,
+            })
+            tips[e["txn_id"]] = current
+
+        # 3. One statement; the new tips become visible to others on commit
+        db.execute(insert(ForensicLedger.__table__), rows)
+        staged.update(tips)
+        self.appended += len(rows)
+        self.batches += 1
+        return rows
+
+    def _read_tips(self, db: Session, txn_ids: List[str]) -> Dict[str, str]:
+        """
+        Last entry of each chain: the one no other entry of the transaction points back to.
+        """
+        ledger = ForensicLedger.__table__
+        later = ledger.alias("later")
+        tips: Dict[str, str] = {}
+        for start in range(0, len(txn_ids), 500):
+            rows = db.execute(
+                select(ledger.c.txn_id, ledger.c.payload_hash)
+                .where(
+                    ledger.c.txn_id.in_(txn_ids[start:start + 500]),
+                    ~exists().where(later.c.txn_id == ledger.c.txn_id, later.c.previous_hash == ledger.c.payload_hash),
+                )
+                .order_by(ledger.c.timestamp)
+            )
+            tips.update({txn_id: payload_hash for txn_id, payload_hash in rows}) # Forked chain: latest tip wins
+        return tips
+
+    def publish(self, tips: Dict[str, str]):
+        with self._lock:
+            for txn_id, tip in tips.items():
+                self._tips[txn_id] = tip
+                self._tips.move_to_end(txn_id)
+            while len(self._tips) > self.max_tips:
+                self._tips.popitem(last=False)
+
+    def clear(self):
+        """
+        Forget all tips (after ledger rows were deleted or rewritten outside append()).
+        """
+        with self._lock:
+            self._tips.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "appended": self.appended,
+            "batches": self.batches,
+            "tips_cached": len(self._tips),
+            "tip_hits": self.tip_hits,
+            "tip_reads": self.tip_reads,
+        }
+
+class LedgerSealer:
+    """
+    Seals new ForensicLedger entries into Merkle blocks every `interval_seconds`
+    (see app/db/ledger.py). Sealing runs in the threadpool; a failed round
+    (e.g. another worker sealed the same entries first) is retried next round.
+    """
+    def __init__(self, interval_seconds: float = 60, block_size: int = 4096):
+        self.interval = interval_seconds
+        self.block_size = block_size
+        self._task: Optional[asyncio.Task] = None
+
+        # Metrics
+        self.blocks_sealed = 0
+        self.last_height: Optional[int] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self):
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await run_in_threadpool(self.seal)
+            except Exception as e:
+                print(f"⚠️ Ledger sealing failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def seal(self) -> List[int]:
+        """
+        One round: seals everything pending.
+        """
+        heights: List[int] = []
+        max_blocks = 64
+        with SessionLocal() as db:
+            while True:
+                sealed = seal_ledger(db, self.block_size, max_blocks)
+                heights += sealed
+                if len(sealed) < max_blocks:
+                    break
+        if heights:
+            self.blocks_sealed += len(heights)
+            self.last_height = heights[-1]
+        return heights
+
+ledger_sealer = LedgerSealer(
+    interval_seconds=settings.LEDGER_SEAL_INTERVAL_SECONDS,
+    block_size=settings.LEDGER_BLOCK_SIZE,
+)
+
+ledger_appender = LedgerAppender(max_tips=settings.LEDGER_TIP_CACHE_SIZE)
+
+@event.listens_for(Session, "after_commit")
+def _publish_ledger_tips(session):
+    tips = session.info.pop("ledger_tips", None)
+    if tips:
+        ledger_appender.publish(tips)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_ledger_tips(session):
+    session.info.pop("ledger_tips", None)
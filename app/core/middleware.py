@@ -1,38 +1,62 @@
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi import Request
 import time
-from app.db.session import SessionLocal
-from app.models.user import AuditLog
+from app.core.audit import audit_writer
+from app.core.telemetry import http_db_queries, http_in_flight, http_latency, http_requests, request_queries
 
 class AuditMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
+        start_time = time.perf_counter()
+        method = request.method
+        queries = request_queries.set([0])
+        http_in_flight.inc(method)
+        status = "500"
         
         # Process Request
-        response = await call_next(request)
-        
-        # Cleanup / Logging (Async)
-        process_time = time.time() - start_time
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+        finally:
+            http_in_flight.dec(method)
+            process_time = time.perf_counter() - start_time
+            
+            route = _route_template(request)
+            http_requests.inc(method, route, status)
+            http_latency.observe(process_time, method, route, status)
+            http_db_queries.observe(request_queries.get()[0], method, route)
+            request_queries.reset(queries)
         
-        # Don't log health checks or static
-        if "/health" in request.url.path or request.method == "OPTIONS":
+        # Don't log health checks, metric scrapes or static
+        if "/health" in request.url.path or request.url.path == "/metrics" or request.method == "OPTIONS":
             return response
             
-        try:
-            # We use a fresh session for logging to avoid async conflicts
-            # In production, use a background task
-            db = SessionLocal()
-            log_entry = AuditLog(
-                event_type="API_REQUEST",
-                actor_id="anonymous", # TODO: Extract from JWT if available
-                resource=request.url.path,
-                outcome=str(response.status_code),
-                risk_score=0
-            )
-            db.add(log_entry)
-            db.commit()
-            db.close()
-        except Exception as e:
-            print(f"Audit Log Failed: {e}")
+        # Buffered: the audit writer bulk-inserts in the background, no commit on the request path
+        audit_writer.write(
+            event_type="API_REQUEST",
+            actor_id="anonymous", # TODO: Extract from JWT if available
+            resource=request.url.path,
+            outcome=status,
+            risk_score=0
+        )
             
         return response
+
+def _route_template(request: Request) -> str:
+    """
+    Path template of the matched route, e.g. /transactions/{transaction_id}/status.
+    Keeps metric label cardinality bounded.
+
+    Taken from the route itself, never from the parameter values. Routers
+    included with a prefix may report their path without it; router prefixes
+    here are literal, so the request path's leading segments supply it.
+    """
+    route = request.scope.get("route")
+    if route is None:
+        return "unmatched"
+    template = getattr(route, "path_format", None) or getattr(route, "path", None)
+    if template is None:
+        return "unmatched"
+    segments = [s for s in template.split("/") if s]
+    path = [s for s in request.url.path.split("/") if s]
+    prefix = path[:max(len(path) - len(segments), 0)]
+    return "/" + "/".join(prefix + segments)
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Set, Tuple
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, selectinload
+from app.core.config import settings
+from app.core.telemetry import telemetry
+from app.models.system import SystemProfile
+from app.models.user import Role, User
+
+principal_lookups = telemetry.counter("auth_principal_lookups_total", "get_current_user principal resolutions.", ("result",))
+
+PrincipalKey = Tuple[str, str] # (token subject, JWT id)
+
+class PrincipalCache:
+    """
+    In-process TTL cache of resolved principals for get_current_user.
+
+    Entries are detached User instances (roles and profiles loaded), keyed by
+    token subject and JWT id, and live for `ttl_seconds` or until the token
+    expires, whichever is sooner. Callers merge them into their own session
+    without a load, so a hit costs no DB round trip.
+
+    Committed writes to users, roles, user roles or system profiles
+    invalidate the affected entries (see the session hooks below).
+    """
+    def __init__(self, ttl_seconds: float = 60, max_entries: int = 10000):
+        self.ttl = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[PrincipalKey, Tuple[float, User]]" = OrderedDict()
+        self._generation = 0 # Bumped on invalidation: loads that raced one are not cached
+
+    def get(self, key: PrincipalKey) -> Optional[User]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return user
+
+    def put(self, key: PrincipalKey, user: User, token_exp: Optional[int] = None, generation: Optional[int] = None):
+        if self.ttl <= 0:
+            return
+        expires = time.monotonic() + self.ttl
+        if token_exp is not None:
+            expires = min(expires, time.monotonic() + (token_exp - time.time()))
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (expires, user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False) # Least recently used
+
+    def invalidate(self, user_ids: Set[str]):
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (_, user) in self._entries.items() if user.id in user_ids]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def resolve(self, db: Session, key: PrincipalKey, token_exp: Optional[int] = None) -> Optional[User]:
+        """
+        The principal for `key`, attached to `db`. Misses load the user in a
+        short-lived session of their own, so the cached instance is never
+        expired by the caller's commit.
+        """
+        from app.db.session import SessionLocal
+
+        user = self.get(key)
+        if user is None:
+            principal_lookups.inc("miss")
+            generation = self._generation
+            with SessionLocal() as session:
+                user = session.execute(
+                    select(User)
+                    .where(User.email == key[0])
+                    .options(selectinload(User.roles), selectinload(User.profiles))
+                ).scalars().first()
+            if user is None:
+                return None
+            self.put(key, user, token_exp, generation)
+        else:
+            principal_lookups.inc("hit")
+        return db.merge(user, load=False)
+
+principal_cache = PrincipalCache(
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_CACHE_MAX_ENTRIES,
+)
+
+# --- Invalidation (applied after commit: a reload before then would see the old rows) ---
+
+@event.listens_for(Session, "after_flush")
+def _collect_principal_changes(session, flush_context):
+    changed = session.info.setdefault("principal_changes", set())
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id) # Includes is_active and roles (user_roles) changes
+        elif isinstance(obj, SystemProfile):
+            changed.add(obj.identity_id)
+        elif isinstance(obj, Role):
+            changed.add("*")
+    if not changed:
+        session.info.pop("principal_changes")
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_principals(session):
+    changed = session.info.pop("principal_changes", None)
+    if not changed:
+        return
+    if "*" in changed:
+        principal_cache.clear()
+    else:
+        principal_cache.invalidate(changed)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_principal_changes(session):
+    session.info.pop("principal_changes", None)
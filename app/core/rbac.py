@@ -1,14 +1,141 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set, Tuple
 from fastapi import Depends, HTTPException, status
+from sqlalchemy import event
+from sqlalchemy.orm import Session
 from app.api import deps
-from app.models.user import User
+from app.core.config import settings
+from app.models.user import Role, User
+
+class PermissionRegistry:
+    """
+    Compiles roles into integer bitmasks once, so access checks are a single AND.
+
+    Role names and permission names each get a bit the first time they are
+    seen ("ALL" is bit 0 of the permission space). A role's compiled masks
+    are cached by role id together with its version, the (name, permissions)
+    it was compiled from, and each user's combined masks by user id, so a
+    warm check reads no role attributes at all.
+
+    Committed role or user edits in this process call invalidate() (see the
+    session hooks below); a role whose version changed also recompiles
+    whenever its user masks are rebuilt. User masks live for `ttl_seconds`
+    (at most `max_users`, oldest evicted first), like the principal cache they are built from, so
+    edits made elsewhere (another worker, a script, raw SQL) apply within
+    the same window.
+    """
+    WILDCARD = "ALL"
+
+    def __init__(self, ttl_seconds: float = 60, max_users: int = 10000):
+        self.ttl = ttl_seconds
+        self.max_users = max_users
+        self._lock = threading.Lock() # Assigning new bits
+        self._users_lock = threading.Lock()
+        self._role_bits: Dict[str, int] = {}
+        self._permission_bits: Dict[str, int] = {self.WILDCARD: 1}
+        self._compiled: Dict[str, Tuple[Tuple[str, str], int, int]] = {} # role id -> (version, role bit, permission mask)
+        self._users: "OrderedDict[str, Tuple[float, int, int]]" = OrderedDict() # user id -> (expires, role mask, permission mask)
+        self._generation = 0 # Bumped on invalidation: masks built from older roles are not cached
+
+    def role_bit(self, name: str) -> int:
+        return self._bit(self._role_bits, name)
+
+    def permission_bit(self, name: str) -> int:
+        return self._bit(self._permission_bits, name)
+
+    def _bit(self, bits: Dict[str, int], name: str) -> int:
+        bit = bits.get(name)
+        if bit is None:
+            with self._lock:
+                bit = bits.setdefault(name, 1 << len(bits))
+        return bit
+
+    def role_mask(self, names: Iterable[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= self.role_bit(name)
+        return mask
+
+    def compile(self, role: Role) -> Tuple[int, int]:
+        """
+        (role bit, permission mask) for one role.
+        """
+        version = (role.name, role.permissions)
+        compiled = self._compiled.get(role.id)
+        if compiled is not None and compiled[0] == version:
+            return compiled[1], compiled[2]
+
+        mask = 0
+        # role.permissions is a JSON string e.g. ["READ", "WRITE"]; malformed lists grant nothing
+        try:
+            for name in json.loads(role.permissions) if role.permissions else ():
+                mask |= self.permission_bit(str(name))
+        except (TypeError, ValueError):
+            mask = 0
+        role_bit = self.role_bit(role.name)
+        if len(self._compiled) >= self.max_users:
+            self._compiled.clear() # Deleted roles never come back for their entries
+        self._compiled[role.id] = (version, role_bit, mask)
+        return role_bit, mask
+
+    def masks(self, user: User) -> Tuple[int, int]:
+        """
+        (role mask, permission mask) across all of the user's roles.
+        """
+        now = time.monotonic()
+        cached = self._users.get(user.id) # Lock-free hit; eviction is by insertion order
+        if cached is not None and cached[0] > now:
+            return cached[1], cached[2]
+
+        generation = self._generation
+        roles = permissions = 0
+        for role in user.roles:
+            role_bit, mask = self.compile(role)
+            roles |= role_bit
+            permissions |= mask
+        if self.ttl > 0:
+            with self._users_lock:
+                if generation == self._generation:
+                    self._users.pop(user.id, None)
+                    self._users[user.id] = (now + self.ttl, roles, permissions)
+                    while len(self._users) > self.max_users:
+                        self._users.popitem(last=False) # Oldest
+        return roles, permissions
+
+    def invalidate(self, role_ids: Optional[Set[str]] = None, user_ids: Optional[Set[str]] = None):
+        """
+        Drops compiled roles (all of them when neither argument is given) and
+        the masks of the affected users. Any role change drops every user's masks.
+        """
+        with self._users_lock:
+            self._generation += 1
+            if role_ids is None and user_ids is None:
+                self._compiled.clear()
+                self._users.clear()
+                return
+            for role_id in role_ids or ():
+                self._compiled.pop(role_id, None)
+            if role_ids:
+                self._users.clear()
+            for user_id in user_ids or ():
+                self._users.pop(user_id, None)
+
+permission_registry = PermissionRegistry(
+    ttl_seconds=settings.AUTH_CACHE_TTL_SECONDS,
+    max_users=settings.AUTH_CACHE_MAX_ENTRIES,
+)
 
 class RoleChecker:
     def __init__(self, allowed_roles: list[str]):
         self.allowed_roles = allowed_roles
+        self.allowed_mask = permission_registry.role_mask(allowed_roles)
 
     def __call__(self, user: User = Depends(deps.get_current_user)):
-        user_roles = [r.name for r in user.roles]
-        if not any(role in self.allowed_roles for role in user_roles):
+        roles, _ = permission_registry.masks(user)
+        if not roles & self.allowed_mask:
              raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Operation not permitted for your role"
@@ -18,30 +145,34 @@ class RoleChecker:
 class PermissionChecker:
     def __init__(self, required_permission: str):
         self.required_permission = required_permission
+        # The "ALL" wildcard grants every permission
+        self.required_mask = permission_registry.permission_bit(required_permission) | permission_registry.permission_bit(PermissionRegistry.WILDCARD)
 
     def __call__(self, user: User = Depends(deps.get_current_user)):
-        # Flatten permissions from all roles
-        # In a real engine, we'd parse the JSON or query a Permission table
-        # Here we simulate simple string matching or "ALL" wildcard
-        
-        all_permissions = set()
-        for role in user.roles:
-            # role.permissions is a JSON string e.g. ["READ", "WRITE"]
-            if role.permissions:
-                import json
-                try:
-                    perms = json.loads(role.permissions)
-                    for p in perms:
-                        all_permissions.add(p)
-                except:
-                   pass
-
-        if "ALL" in all_permissions:
-            return user
-            
-        if self.required_permission not in all_permissions:
+        _, permissions = permission_registry.masks(user)
+        if not permissions & self.required_mask:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN, 
+                status_code=status.HTTP_403_FORBIDDEN,
                 detail=f"Missing permission: {self.required_permission}"
             )
         return user
+
+# --- Invalidation: drop compiled masks once role / user role edits are committed ---
+
+@event.listens_for(Session, "after_flush")
+def _collect_role_changes(session, flush_context):
+    for obj in (*session.dirty, *session.deleted):
+        if isinstance(obj, Role):
+            session.info.setdefault("role_changes", (set(), set()))[0].add(obj.id)
+        elif isinstance(obj, User):
+            session.info.setdefault("role_changes", (set(), set()))[1].add(obj.id) # user_roles edits
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_roles(session):
+    changed = session.info.pop("role_changes", None)
+    if changed:
+        permission_registry.invalidate(*changed)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_role_changes(session):
+    session.info.pop("role_changes", None)
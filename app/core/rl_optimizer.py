@@ -56,6 +56,33 @@ class DecisionOptimizer:
             "source": f"PPO-{self.version}"
         }
 
+    def predict_batch(self, txns: List[Transaction]) -> List[dict]:
+        """
+        Vectorized predict: one model call for the whole batch.
+        """
+        if not txns:
+            return []
+
+        if not SB3_AVAILABLE or not os.path.exists(self.model_path):
+            # Fallback / Mock Behavior (same heuristic as predict)
+            risk = np.array([t.risk_score or 0 for t in txns])
+            action_idx = (risk > 80).astype(int)
+            confidence = 0.85 + (np.random.rand(len(txns)) * 0.1)
+            return [
+                {"action": self.actions[a], "confidence": float(c), "source": f"MockRL-{self.version}"}
+                for a, c in zip(action_idx, confidence)
+            ]
+
+        if not self.model:
+            self.load()
+
+        obs = np.stack([self.state_builder.build(t) for t in txns])
+        action_idx, _ = self.model.predict(obs, deterministic=True)
+        return [
+            {"action": self.actions[int(a)], "confidence": 0.92, "source": f"PPO-{self.version}"}
+            for a in np.atleast_1d(action_idx)
+        ]
+
     def train(self, training_data: List[dict]):
         """
         Train PPO on historical logs.
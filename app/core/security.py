@@ -1,9 +1,30 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
 from passlib.context import CryptContext
+from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
 
+# argon2 runs in C with the GIL released, so a small thread pool hashes in
+# parallel off the event loop. Its size caps concurrent hashes (each holds a
+# core and the argon2 memory cost while it runs); extra logins wait their turn.
+hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1,
+    thread_name_prefix="password-hash",
+)
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """
+    verify_password on the hashing pool, for async endpoints.
+    """
+    return await asyncio.get_running_loop().run_in_executor(hash_executor, verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(hash_executor, get_password_hash, password)
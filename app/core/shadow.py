@@ -1,4 +1,10 @@
+from typing import Dict, List, Optional, Tuple
+import asyncio
+import threading
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from app.db.session import SessionLocal
 from app.core.rl_optimizer import DecisionOptimizer
 from app.models.policy import RLPolicy
 from app.models.transaction import Transaction
@@ -7,6 +13,43 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+class ShadowPolicyCache:
+    """
+    Process-wide SHADOW policy + optimizer.
+    Queried and built once, then reused until invalidate() is called
+    (on policy deploy). Keeps RLPolicy lookups and PPO loading off the request path.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._loaded = False
+        self._optimizer: Optional[DecisionOptimizer] = None
+
+    def get(self, db: Session) -> Optional[DecisionOptimizer]:
+        if self._loaded:
+            return self._optimizer
+
+        generation = self._generation
+        policy = db.query(RLPolicy).filter(RLPolicy.status == "SHADOW").first()
+        optimizer = DecisionOptimizer(policy) if policy else None
+        if optimizer:
+            optimizer.load()
+
+        with self._lock:
+            # Don't publish a policy read before a concurrent invalidate()
+            if generation == self._generation:
+                self._optimizer = optimizer
+                self._loaded = True
+        return optimizer
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._loaded = False
+            self._optimizer = None
+
+shadow_policy_cache = ShadowPolicyCache()
+
 class ShadowRunner:
     """
     Executes RL Policy in SHADOW mode (Observation only).
@@ -14,44 +57,154 @@ class ShadowRunner:
     """
     def __init__(self, db: Session):
         self.db = db
-        self.policy = self._get_shadow_policy()
-        self.optimizer = DecisionOptimizer(self.policy) if self.policy else None
-
-    def _get_shadow_policy(self):
-        return self.db.query(RLPolicy).filter(RLPolicy.status == "SHADOW").first()
+        self.optimizer = shadow_policy_cache.get(db)
 
-    def run_comparison(self, txn: Transaction, actual_action: str):
+    def run_batch(self, items: List[Tuple[Transaction, str]]):
         """
-        txn: The transaction being processed.
-        actual_action: What the system/human actually did ('AUTO', 'REVIEW', 'REJECT')
+        Batched comparison of (transaction, actual_action) pairs: one vectorized
+        policy predict and a single bulk insert + commit for all shadow logs.
         """
-        if not self.optimizer:
+        if not self.optimizer or not items:
             return
 
-        # 1. Get RL Prediction
-        prediction = self.optimizer.predict(txn)
+        predictions = self.optimizer.predict_batch([txn for txn, _ in items])
+        rows = [self._shadow_fields(txn, p, action) for (txn, action), p in zip(items, predictions)]
+        self.db.execute(insert(AuditLog), rows)
+        self.db.commit()
+
+    def _shadow_fields(self, txn: Transaction, prediction: dict, actual_action: str) -> dict:
         rl_action = prediction["action"]
         confidence = prediction.get("confidence", 0.0)
 
         # 2. Compare
         match = (rl_action == actual_action)
-        
+        if not match:
+            logger.info(f"Shadow Deviation on {txn.id}: RL wanted {rl_action}, System did {actual_action}")
+
         # 3. Log Shadow Event (Internal Audit)
         # We store this in AuditLog with a special event type
-        shadow_log = AuditLog(
+        return dict(
             event_type="SHADOW_EVAL",
-            actor_id=f"model:{self.policy.version}",
-            resource=txn.id,
+            actor_id=f"model:{self.optimizer.version}",
             outcome="MATCH" if match else "DEVIATION",
             risk_score=int(confidence * 100),
-            # Store details in resource or a new field if available. 
+            # Store details in resource or a new field if available.
             # For now, packing into string to avoid schema change, or use JSON if we added it.
             # Using 'resource' field format: "{txn_id} | RL:{rl_action} vs ACT:{actual_action}"
             resource=f"{txn.id} | RL:{rl_action} vs ACT:{actual_action}"
         )
-        
-        self.db.add(shadow_log)
-        self.db.commit()
-        
-        if not match:
-            logger.info(f"Shadow Deviation on {txn.id}: RL wanted {rl_action}, System did {actual_action}")
+
+def shadow_action(status: str) -> str:
+    """
+    Map a manual status to the RL action space.
+    """
+    # Reject counts as manual review outcome
+    return "AUTO" if status == "AUTO_RECONCILED" else "REVIEW"
+
+def run_shadow_batch(items: List[Tuple[str, str]]):
+    """
+    Evaluates the shadow policy for already-committed transactions,
+    given as (txn_id, actual_action) pairs, in its own session.
+    """
+    db = SessionLocal()
+    try:
+        runner = ShadowRunner(db)
+        if not runner.optimizer:
+            return
+        ids = {txn_id for txn_id, _ in items}
+        txns = {t.id: t for t in db.query(Transaction).filter(Transaction.id.in_(ids)).all()}
+        runner.run_batch([(txns[txn_id], action) for txn_id, action in items if txn_id in txns])
+    except Exception as e:
+        logger.error(f"Shadow batch failed: {e}")
+    finally:
+        db.close()
+
+class ShadowQueue:
+    """
+    Background shadow-evaluation queue.
+    Governance endpoints enqueue (txn_id, actual_action) and return immediately;
+    a worker task drains up to `max_batch` items (or whatever arrived within
+    `flush_interval_ms`) and evaluates them with run_shadow_batch in the threadpool.
+    Overflow beyond `max_queue` is dropped: shadow evaluation is observational only.
+    """
+    def __init__(self, max_batch: int = 200, flush_interval_ms: float = 250, max_queue: int = 10000):
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_queue = max_queue
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._collecting: List[Tuple[str, str]] = []  # Dequeued, not yet handed to a thread
+
+        self.evaluated = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def enqueue(self, txn_ids: List[str], actual_action: str):
+        """
+        Thread-safe; callable from sync endpoints. Evaluates inline when the
+        worker is not running (scripts, tests).
+        """
+        items = [(txn_id, actual_action) for txn_id in txn_ids]
+        if not self.running:
+            run_shadow_batch(items)
+            return
+        self._loop.call_soon_threadsafe(self._put, items)
+
+    def _put(self, items: List[Tuple[str, str]]):
+        for item in items:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    async def start(self):
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """
+        Stop the worker and evaluate whatever is still queued.
+        """
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        pending, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await run_in_threadpool(run_shadow_batch, pending)
+
+    async def _run(self):
+        while True:
+            batch = self._collecting
+            batch.append(await self._queue.get())
+            deadline = self._loop.time() + self.flush_interval
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - self._loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+
+            self._collecting = []
+            await run_in_threadpool(run_shadow_batch, batch)
+            self.evaluated += len(batch)
+
+shadow_queue = ShadowQueue()
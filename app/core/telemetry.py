@@ -0,0 +1,198 @@
+import bisect
+import threading
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Prometheus default latency buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+Labels = Tuple[str, ...]
+
+class Telemetry:
+    """
+    In-process metrics registry with Prometheus text exposition.
+    Supports counters, gauges (up/down counters) and histograms, each keyed by a label tuple.
+    """
+    def __init__(self):
+        self._lock = threading.Lock() # Only taken when a new thread registers its shard
+        self._shards: List[dict] = []
+        self._meta: Dict[str, tuple] = {} # name -> (type, help, label names, buckets)
+        self._local = threading.local()
+
+    def _values(self) -> dict:
+        """
+        This thread's shard. Each thread only writes its own dict, so the hot
+        path needs no lock; readers sum all shards at scrape time.
+        """
+        values = getattr(self._local, "values", None)
+        if values is None:
+            values = self._local.values = {}
+            with self._lock:
+                self._shards.append(values)
+        return values
+
+    # --- Declaration ---
+
+    def counter(self, name: str, help: str, labels: Sequence[str] = ()) -> "Metric":
+        return self._declare(name, "counter", help, labels, None)
+
+    def gauge(self, name: str, help: str, labels: Sequence[str] = ()) -> "Metric":
+        return self._declare(name, "gauge", help, labels, None)
+
+    def histogram(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> "Metric":
+        return self._declare(name, "histogram", help, labels, tuple(buckets))
+
+    def _declare(self, name, kind, help, labels, buckets) -> "Metric":
+        self._meta[name] = (kind, help, tuple(labels), buckets)
+        return Metric(self, name, buckets)
+
+    # --- Read Path ---
+
+    def collect(self, name: str) -> Dict[Labels, list]:
+        """
+        Sums every thread's shard for one metric: {labels: [value]} or
+        {labels: [bucket counts..., sum, count]} for histograms.
+        """
+        merged: Dict[Labels, list] = {}
+        with self._lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for (metric, labels), values in list(shard.items()):
+                if metric != name:
+                    continue
+                total = merged.get(labels)
+                if total is None:
+                    merged[labels] = list(values)
+                else:
+                    for i, v in enumerate(values):
+                        total[i] += v
+        return merged
+
+    def quantile(self, name: str, q: float, match: Optional[Dict[str, str]] = None) -> Optional[float]:
+        """
+        Estimates the q-quantile of a histogram (linear interpolation inside the
+        bucket, as histogram_quantile does). `match` filters on label values.
+        """
+        kind, _, label_names, buckets = self._meta[name]
+        counts = [0] * len(buckets)
+        total = 0
+        for labels, values in self.collect(name).items():
+            if match and any(labels[label_names.index(k)] != v for k, v in match.items()):
+                continue
+            for i in range(len(buckets)):
+                counts[i] += values[i]
+            total += values[-1]
+        if not total:
+            return None
+
+        rank = q * total
+        cumulative = 0
+        for i, upper in enumerate(buckets):
+            if cumulative + counts[i] >= rank:
+                lower = buckets[i - 1] if i else 0.0
+                return lower + (upper - lower) * ((rank - cumulative) / counts[i] if counts[i] else 0.0)
+            cumulative += counts[i]
+        return buckets[-1] # Above the last bucket: clamp like Prometheus
+
+    def render(self) -> str:
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        lines: List[str] = []
+        for name, (kind, help, label_names, buckets) in self._meta.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, values in sorted(self.collect(name).items()):
+                pairs = [f'{k}="{_escape(v)}"' for k, v in zip(label_names, labels)]
+                if kind != "histogram":
+                    lines.append(f"{name}{_fmt_labels(pairs)} {_fmt(values[0])}")
+                    continue
+                cumulative = 0
+                for upper, count in zip(buckets, values):
+                    cumulative += count
+                    le = 'le="%s"' % _fmt(upper)
+                    lines.append(f"{name}_bucket{_fmt_labels(pairs + [le])} {cumulative}")
+                le = 'le="+Inf"'
+                lines.append(f"{name}_bucket{_fmt_labels(pairs + [le])} {values[-1]}")
+                lines.append(f"{name}_sum{_fmt_labels(pairs)} {_fmt(values[-2])}")
+                lines.append(f"{name}_count{_fmt_labels(pairs)} {values[-1]}")
+        return "\n".join(lines) + "\n"
+
+class Metric:
+    """
+    Handle returned by Telemetry.counter/gauge/histogram. Label values are positional.
+    """
+    __slots__ = ("registry", "name", "buckets")
+
+    def __init__(self, registry: Telemetry, name: str, buckets: Optional[tuple]):
+        self.registry = registry
+        self.name = name
+        self.buckets = buckets
+
+    def inc(self, *labels: str, amount: float = 1):
+        values = self.registry._values()
+        key = (self.name, labels)
+        slot = values.get(key)
+        if slot is None:
+            values[key] = [amount]
+        else:
+            slot[0] += amount
+
+    def dec(self, *labels: str, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def observe(self, value: float, *labels: str):
+        values = self.registry._values()
+        key = (self.name, labels)
+        slot = values.get(key)
+        if slot is None:
+            slot = values[key] = [0] * (len(self.buckets) + 2) # buckets..., sum, count
+        i = bisect.bisect_left(self.buckets, value)
+        if i < len(self.buckets):
+            slot[i] += 1
+        slot[-2] += value
+        slot[-1] += 1
+
+def _fmt(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+def _fmt_labels(pairs: List[str]) -> str:
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+telemetry = Telemetry()
+
+# --- HTTP ---
+http_requests = telemetry.counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+http_latency = telemetry.histogram("http_request_duration_seconds", "HTTP request latency by route and status.", ("method", "route", "status"))
+http_in_flight = telemetry.gauge("http_requests_in_flight", "HTTP requests currently being served.", ("method",))
+http_db_queries = telemetry.histogram("http_request_db_queries", "DB statements executed per HTTP request.", ("method", "route"), buckets=COUNT_BUCKETS)
+
+# --- Database ---
+db_queries = telemetry.counter("db_queries_total", "DB statements executed (all callers).")
+
+# --- ML Inference ---
+inference_latency = telemetry.histogram("inference_batch_duration_seconds", "Model inference time per batch.", ("batcher",))
+inference_batch_size = telemetry.histogram("inference_batch_size", "Items per inference batch.", ("batcher",), buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256))
+
+def quantile_ms(metric: Metric, q: float, **match: str) -> Optional[int]:
+    """
+    q-quantile of a latency histogram in whole milliseconds (None before any observation).
+    """
+    value = metric.registry.quantile(metric.name, q, match or None)
+    return None if value is None else round(value * 1000)
+
+# Per-request DB statement counter; the threadpool copies the context, so sync endpoints share it
+request_queries: ContextVar[Optional[list]] = ContextVar("request_queries", default=None)
+
+def count_query(*_):
+    """
+    SQLAlchemy before_cursor_execute listener.
+    """
+    db_queries.inc()
+    counter = request_queries.get()
+    if counter is not None:
+        counter[0] += 1
@@ -0,0 +1,120 @@
+import json
+import zlib
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, List, Optional
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.stats import ROLLUP_BUCKET, ROLLUP_HOURS, ensure_summary_tables, rollup_transaction_stats
+from app.models.transaction import SETTLED_STATUSES, Transaction, TransactionArchive, record_stat_deltas, stat_key
+
+DATETIME_COLUMNS = ("value_date", "created_at", "updated_at")
+
+def archive_transactions(
+    db: Session,
+    older_than_days: int = settings.ARCHIVE_AFTER_DAYS,
+    batch_size: int = settings.ARCHIVE_BATCH_SIZE,
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """
+    Moves settled transactions created more than `older_than_days` ago from
+    `transactions` into compressed transaction_archive segments (one per
+    month per batch). Each batch is one transaction: DELETE ... RETURNING,
+    archive exactly the deleted rows, subtract them from transaction_stats,
+    commit. Rows that changed status since selection are left in place.
+    """
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=older_than_days)
+    rollup_cutoff = now - timedelta(hours=ROLLUP_HOURS)
+    ensure_summary_tables(db)
+    TransactionArchive.__table__.create(bind=db.connection(), checkfirst=True)
+    # Fold aged hour buckets first, so the archived rows' counts are all in ROLLUP_BUCKET
+    rollup_transaction_stats(db, now)
+
+    totals: Dict[str, Any] = {"rows": 0, "segments": 0, "raw_bytes": 0, "compressed_bytes": 0, "periods": Counter()}
+    settled = (Transaction.status.in_(SETTLED_STATUSES), Transaction.created_at < cutoff)
+    while True:
+        # 1. Next batch (served by ix_transactions_status_created)
+        ids = db.execute(select(Transaction.id).where(*settled).limit(batch_size)).scalars().all()
+        if not ids:
+            break
+        moved = db.execute(
+            delete(Transaction.__table__)
+            .where(Transaction.id.in_(ids), *settled)
+            .returning(*Transaction.__table__.columns)
+        ).mappings().all()
+        if not moved:
+            break
+
+        # 2. Cold storage, one segment per month
+        by_period: Dict[str, List[dict]] = defaultdict(list)
+        for row in moved:
+            by_period[row["created_at"].strftime("%Y-%m")].append(dict(row))
+        for period, rows in by_period.items():
+            raw, compressed = _write_segment(db, period, rows)
+            totals["segments"] += 1
+            totals["raw_bytes"] += raw
+            totals["compressed_bytes"] += compressed
+            totals["periods"][period] += len(rows)
+
+        # 3. Summary counts (old hours already live in the rollup bucket)
+        deltas: Counter = Counter()
+        for row in moved:
+            bucket, status, band = stat_key(row["created_at"], row["status"], row["risk_score"])
+            deltas[(ROLLUP_BUCKET if bucket < rollup_cutoff else bucket, status, band)] -= 1
+        record_stat_deltas(db, deltas)
+
+        db.commit()
+        totals["rows"] += len(moved)
+
+    return totals
+
+def archived_transactions(db: Session, period: str) -> Iterator[Dict[str, Any]]:
+    """
+    Rows archived for one month (YYYY-MM), oldest segment first.
+    """
+    segments = db.execute(
+        select(TransactionArchive.payload)
+        .where(TransactionArchive.period == period)
+        .order_by(TransactionArchive.segment)
+    ).scalars()
+    for payload in segments:
+        for line in zlib.decompress(payload).decode().splitlines():
+            row = json.loads(line)
+            for column in DATETIME_COLUMNS:
+                if row.get(column):
+                    row[column] = datetime.fromisoformat(row[column])
+            yield row
+
+def _write_segment(db: Session, period: str, rows: List[dict]):
+    connection = db.connection()
+    if connection.dialect.name == "postgresql":
+        # Native partition per month, created on first use
+        partition = "transaction_archive_" + period.replace("-", "_")
+        connection.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF transaction_archive FOR VALUES IN ('{period}')"
+        ))
+
+    raw = "\n".join(json.dumps(row, default=_isoformat, separators=(",", ":")) for row in rows).encode()
+    payload = zlib.compress(raw, 9)
+    segment = db.execute(
+        select(func.coalesce(func.max(TransactionArchive.segment) + 1, 0))
+        .where(TransactionArchive.period == period)
+    ).scalar()
+    created = [row["created_at"] for row in rows]
+    db.add(TransactionArchive(
+        period=period,
+        segment=segment,
+        row_count=len(rows),
+        first_created=min(created),
+        last_created=max(created),
+        payload=payload,
+    ))
+    db.flush()
+    return len(raw), len(payload)
+
+def _isoformat(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
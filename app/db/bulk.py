@@ -0,0 +1,218 @@
+import io
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Any, List, Tuple
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.metrics import accumulate, apply_metric_buckets
+from app.models.transaction import Transaction, record_stat_deltas, stat_key
+
+CHUNK_SIZE = 5000
+
+# Filled in on inserted rows for values a batch does not carry (mirrors the Transaction defaults)
+DEFAULTS = {
+    "currency": "USD",
+    "status": "PENDING",
+    "match_confidence": 0.0,
+    "risk_score": 0,
+    "counterparty": None,
+}
+REQUIRED_COLUMNS = ("amount", "source") # No default: inserted rows must carry them
+TIMESTAMP_COLUMNS = ("value_date", "created_at", "updated_at")
+COLUMNS = [c.name for c in Transaction.__table__.columns]
+DIALECTS = ("sqlite", "postgresql")
+
+# An upsert keeps the original ingest time: transaction_stats buckets by created_at
+IMMUTABLE_COLUMNS = ("id", "created_at")
+
+def upsert_transactions(db: Session, batch: Any, chunk_size: int = CHUNK_SIZE) -> int:
+    """
+    Insert-or-update Transaction rows from a pandas DataFrame or a pyarrow
+    Table/RecordBatch whose columns are Transaction column names. Rows with
+    an existing id are updated in place (last occurrence wins).
+
+    A batch may carry only some columns (e.g. id + status): updates write
+    just those columns (and updated_at); inserted rows get the defaults for
+    the rest and must carry amount and source. A missing (null) value is
+    treated like a missing column.
+
+    Runs in the caller's transaction (the caller commits). Core statements
+    bypass the mapper events, so transaction_stats and metric_buckets are
+    maintained here, per chunk. Writes are chunked executemany upserts on
+    SQLite and COPY into a staging table on PostgreSQL (psycopg2; other
+    PostgreSQL drivers use executemany).
+    """
+    from app.db.stats import ensure_summary_tables
+
+    connection = db.connection()
+    dialect = connection.dialect
+    if dialect.name not in DIALECTS:
+        raise ValueError(f"Bulk upsert supports {', '.join(DIALECTS)}, not {dialect.name!r}")
+
+    frame, present = _normalize(batch)
+    if frame.empty:
+        return 0
+    ensure_summary_tables(db)
+
+    update_columns = [c for c in COLUMNS if (c in present or c == "updated_at") and c not in IMMUTABLE_COLUMNS]
+    copy = dialect.name == "postgresql" and dialect.driver == "psycopg2"
+    if dialect.name == "sqlite":
+        # Compiled once; rows go to the DBAPI executemany as plain tuples (no per-value bind processing)
+        compiled = _upsert_statement(connection, update_columns).compile(dialect=dialect, column_keys=COLUMNS)
+        sql, order = str(compiled), [COLUMNS.index(name) for name in compiled.positiontup]
+
+    now = datetime.utcnow()
+    for start in range(0, len(frame), chunk_size):
+        chunk = frame.iloc[start:start + chunk_size]
+
+        # 1. Current state of the ids we are about to overwrite; fills what the batch leaves out
+        gaps = [c for c in COLUMNS if c not in chunk or chunk[c].hasnans]
+        table = Transaction.__table__
+        existing = db.execute(
+            select(*(table.c[c] for c in dict.fromkeys(["id", "created_at", "status", "risk_score", *gaps])))
+            .where(table.c.id.in_(chunk["id"].tolist()))
+        ).all()
+        chunk = _complete(chunk, existing, gaps, now)
+
+        # 2. Write
+        if copy:
+            _copy_upsert(connection, chunk, update_columns)
+        elif dialect.name == "sqlite":
+            rows = _rows(chunk, dates_as_text=True)
+            if order != list(range(len(COLUMNS))):
+                rows = [tuple(row[i] for i in order) for row in rows]
+            connection.exec_driver_sql(sql, rows)
+        else:
+            connection.execute(_upsert_statement(connection, update_columns), [dict(zip(COLUMNS, row)) for row in _rows(chunk)])
+
+        # 3. Summaries: move updated rows between stat keys, count new rows
+        deltas: Counter = Counter()
+        for row in existing:
+            deltas[stat_key(row.created_at, row.status, row.risk_score)] -= 1
+        updated = {row.id: row.created_at for row in existing}
+        is_new = ~chunk["id"].isin(updated.keys())
+        new, changed = chunk[is_new], chunk[~is_new]
+        for (created_at, status, risk_score), n in new.groupby(["created_at", "status", "risk_score"]).size().items():
+            deltas[stat_key(created_at.to_pydatetime(), status, risk_score)] += n
+        for txn_id, status, risk_score in zip(changed["id"], changed["status"], changed["risk_score"]):
+            deltas[stat_key(updated[txn_id], status, risk_score)] += 1
+        record_stat_deltas(db, {k: int(n) for k, n in deltas.items()})
+
+        apply_metric_buckets(connection, accumulate(zip(
+            new["created_at"].dt.to_pydatetime(), new["risk_score"].tolist(),
+            new["match_confidence"].tolist(), new["status"].tolist(),
+        )))
+
+    return len(frame)
+
+def _normalize(batch: Any) -> Tuple[pd.DataFrame, List[str]]:
+    """
+    The batch with ids assigned and duplicates collapsed, plus the columns it carries.
+    """
+    if not isinstance(batch, pd.DataFrame):
+        batch = batch.to_pandas() # pyarrow Table / RecordBatch
+    unknown = set(batch.columns) - set(COLUMNS)
+    if unknown:
+        raise ValueError(f"Unknown transaction columns: {sorted(unknown)}")
+
+    frame = batch.copy()
+    if "id" not in frame:
+        frame["id"] = None
+    missing_ids = frame["id"].isna()
+    if missing_ids.any():
+        frame.loc[missing_ids, "id"] = [f"TXN-{uuid.uuid4().hex[:8].upper()}" for _ in range(missing_ids.sum())]
+    for column in TIMESTAMP_COLUMNS:
+        if column in frame:
+            frame[column] = pd.to_datetime(frame[column])
+
+    frame = frame.drop_duplicates(subset="id", keep="last")
+    present = [c for c in COLUMNS if c in frame]
+    return frame[present], present
+
+def _complete(chunk: pd.DataFrame, existing: List[Any], gaps: List[str], now: datetime) -> pd.DataFrame:
+    """
+    Full rows for the write: values the batch leaves out (the `gaps` columns)
+    come from the stored row, or for new rows from DEFAULTS (timestamps: now).
+    updated_at is now unless the batch sets it.
+    """
+    full = chunk.reindex(columns=COLUMNS).set_index("id", drop=False)
+    if existing and gaps:
+        stored = pd.DataFrame([tuple(row) for row in existing], columns=list(existing[0]._fields)).set_index("id").reindex(full.index)
+        for column in gaps:
+            values = pd.to_datetime(stored[column]) if column in TIMESTAMP_COLUMNS else stored[column]
+            full[column] = full[column].where(full[column].notna(), values)
+
+    is_new = ~full.index.isin([row.id for row in existing])
+    incomplete = full.loc[is_new, list(REQUIRED_COLUMNS)].isna().any(axis=1)
+    if incomplete.any():
+        raise ValueError(
+            f"New transactions need {' and '.join(REQUIRED_COLUMNS)}: {full.index[is_new][incomplete.to_numpy()].tolist()[:10]}"
+        )
+
+    for column, default in DEFAULTS.items():
+        full[column] = full[column].where(full[column].notna(), default)
+    if "updated_at" not in chunk:
+        full["updated_at"] = now
+    for column in TIMESTAMP_COLUMNS:
+        full[column] = pd.to_datetime(full[column]).fillna(now)
+    full["risk_score"] = full["risk_score"].astype(int)
+    full["match_confidence"] = full["match_confidence"].astype(float)
+    return full.reset_index(drop=True)
+
+def _rows(chunk: pd.DataFrame, dates_as_text: bool = False) -> List[tuple]:
+    """
+    Column-wise conversion to DBAPI values: Python scalars, NaN -> None, and
+    timestamps as datetimes or, for SQLite, in the text format SQLAlchemy stores.
+    """
+    columns = []
+    for name in COLUMNS:
+        values = chunk[name]
+        if name in TIMESTAMP_COLUMNS:
+            columns.append(
+                values.dt.strftime("%Y-%m-%d %H:%M:%S.%f").tolist() if dates_as_text
+                else list(values.dt.to_pydatetime())
+            )
+        elif values.hasnans:
+            columns.append(values.astype(object).where(values.notna(), None).tolist())
+        else:
+            columns.append(values.tolist())
+    return list(zip(*columns))
+
+def _upsert_statement(connection, update_columns: List[str]):
+    if connection.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    else:
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    stmt = upsert(Transaction)
+    return stmt.on_conflict_do_update(
+        index_elements=["id"],
+        set_={c: stmt.excluded[c] for c in update_columns},
+    )
+
+def _copy_upsert(connection, chunk: pd.DataFrame, update_columns: List[str]):
+    """
+    COPY the chunk into a session-local staging table, then merge it with one
+    INSERT ... ON CONFLICT. Uses the DBAPI connection of the current transaction.
+    """
+    columns = ", ".join(COLUMNS)
+    updates = ", ".join(f"{c} = EXCLUDED.{c}" for c in update_columns)
+    buffer = io.StringIO()
+    chunk.to_csv(buffer, index=False, header=False, date_format="%Y-%m-%d %H:%M:%S.%f")
+    buffer.seek(0)
+
+    cursor = connection.connection.driver_connection.cursor()
+    try:
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS transactions_ingest "
+            "(LIKE transactions INCLUDING DEFAULTS) ON COMMIT DELETE ROWS"
+        )
+        cursor.copy_expert(f"COPY transactions_ingest ({columns}) FROM STDIN WITH (FORMAT csv)", buffer)
+        cursor.execute(
+            f"INSERT INTO transactions ({columns}) SELECT {columns} FROM transactions_ingest "
+            f"ON CONFLICT (id) DO UPDATE SET {updates}"
+        )
+        cursor.execute("TRUNCATE transactions_ingest")
+    finally:
+        cursor.close()
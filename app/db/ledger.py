@@ -0,0 +1,289 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from sqlalchemy import func, inspect, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.ledger import ForensicLedger, LedgerBlock, LedgerBlockEntry
+
+GENESIS_HASH = "0" * 64
+
+# Domain separation (RFC 6962): a leaf can never be passed off as an inner node
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+LEAF_COLUMNS = (
+    ForensicLedger.id, ForensicLedger.txn_id, ForensicLedger.event_type, ForensicLedger.stage,
+    ForensicLedger.actor, ForensicLedger.payload_hash, ForensicLedger.previous_hash,
+    ForensicLedger.metadata_json, ForensicLedger.timestamp,
+)
+
+_ensure_lock = threading.Lock()
+_ensured = False
+
+# --- Merkle tree ---
+
+def leaf_hash(row: Sequence[Any]) -> str:
+    """
+    SHA-256 of one ledger entry (LEAF_COLUMNS order), canonically encoded.
+    """
+    values = [v.isoformat() if hasattr(v, "isoformat") else v for v in row]
+    encoded = json.dumps(values, separators=(",", ":"), ensure_ascii=False).encode()
+    return hashlib.sha256(LEAF_PREFIX + encoded).hexdigest()
+
+def node_hash(left: str, right: str) -> str:
+    return hashlib.sha256(NODE_PREFIX + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+def merkle_levels(leaves: List[str]) -> List[List[str]]:
+    """
+    All tree levels, leaves first. An odd node is promoted unchanged (no
+    duplication, so two different leaf lists never share a root).
+    """
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        level = levels[-1]
+        levels.append([
+            node_hash(level[i], level[i + 1]) if i + 1 < len(level) else level[i]
+            for i in range(0, len(level), 2)
+        ])
+    return levels
+
+def merkle_root(leaves: List[str]) -> str:
+    return merkle_levels(leaves)[-1][0] if leaves else GENESIS_HASH
+
+def merkle_path(leaves: List[str], index: int) -> List[Dict[str, str]]:
+    """
+    Sibling hashes from leaf `index` up to the root: O(log n) entries.
+    """
+    path = []
+    for level in merkle_levels(leaves)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append({"hash": level[sibling], "side": "left" if sibling < index else "right"})
+        index //= 2
+    return path
+
+def level_sizes(leaf_count: int) -> List[int]:
+    sizes = [leaf_count]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+def pack_tree(levels: List[List[str]]) -> bytes:
+    """
+    Inner levels (everything above the leaves) as one blob of 32-byte digests.
+    """
+    return b"".join(bytes.fromhex(digest) for level in levels[1:] for digest in level)
+
+def tree_path(tree: bytes, leaf_count: int, index: int, sibling_leaf: Optional[str]) -> List[Dict[str, str]]:
+    """
+    merkle_path from a packed tree: the leaf sibling plus one digest per inner level.
+    """
+    path = []
+    offset = 0
+    for depth, size in enumerate(level_sizes(leaf_count)[:-1]):
+        sibling = index ^ 1
+        if sibling < size:
+            if depth == 0:
+                digest = sibling_leaf
+            else:
+                start = (offset + sibling) * 32
+                digest = tree[start:start + 32].hex()
+            path.append({"hash": digest, "side": "left" if sibling < index else "right"})
+        if depth > 0:
+            offset += size
+        index //= 2
+    return path
+
+def verify_path(leaf: str, path: List[Dict[str, str]], root: str) -> bool:
+    digest = leaf
+    for step in path:
+        digest = node_hash(step["hash"], digest) if step["side"] == "left" else node_hash(digest, step["hash"])
+    return digest == root
+
+def block_hash(height: int, previous_hash: str, root: str, entry_count: int) -> str:
+    return hashlib.sha256(f"{height}:{previous_hash}:{root}:{entry_count}".encode()).hexdigest()
+
+# --- Sealing ---
+
+def ensure_ledger_tables(db: Session):
+    """
+    Creates ledger_blocks and ledger_block_entries if missing (alembic revision
+    8d41f6a2c9e3 on migrated databases). Runs once per process, at app startup,
+    before the sealer starts; the read paths below assume the tables exist.
+    """
+    global _ensured
+    if _ensured:
+        return
+    with _ensure_lock:
+        if _ensured:
+            return
+        connection = db.connection()
+        inspector = inspect(connection)
+        for table in (LedgerBlock.__table__, LedgerBlockEntry.__table__):
+            if not inspector.has_table(table.name):
+                table.create(bind=connection)
+        _ensured = True
+
+def seal_ledger(db: Session, block_size: int = settings.LEDGER_BLOCK_SIZE, max_blocks: int = 64) -> List[int]:
+    """
+    Seals unsealed ForensicLedger entries (timestamp order) into blocks of at
+    most `block_size` leaves, up to `max_blocks` blocks, and commits. Returns
+    the new block heights; call again while it returns `max_blocks` of them.
+    A concurrent sealer fails on the block height / entry_id keys and rolls
+    back, so each entry lands in exactly one block.
+    """
+    unsealed = db.execute(
+        select(*LEAF_COLUMNS)
+        .outerjoin(LedgerBlockEntry, LedgerBlockEntry.entry_id == ForensicLedger.id)
+        .where(LedgerBlockEntry.entry_id.is_(None))
+        .order_by(ForensicLedger.timestamp, ForensicLedger.id)
+        .limit(block_size * max_blocks)
+    ).all()
+    if not unsealed:
+        return []
+
+    tip = db.execute(select(LedgerBlock.height, LedgerBlock.block_hash).order_by(LedgerBlock.height.desc()).limit(1)).first()
+    height, previous = (tip[0] + 1, tip[1]) if tip else (0, GENESIS_HASH)
+    heights = []
+    for start in range(0, len(unsealed), block_size):
+        rows = unsealed[start:start + block_size]
+        leaves = [leaf_hash(row) for row in rows]
+        levels = merkle_levels(leaves)
+        root = levels[-1][0]
+        sealed = block_hash(height, previous, root, len(leaves))
+        db.add(LedgerBlock(
+            height=height,
+            merkle_root=root,
+            previous_hash=previous,
+            block_hash=sealed,
+            entry_count=len(leaves),
+            tree=pack_tree(levels),
+            first_timestamp=rows[0].timestamp,
+            last_timestamp=rows[-1].timestamp,
+        ))
+        db.flush()
+        db.execute(LedgerBlockEntry.__table__.insert(), [
+            {"block_height": height, "leaf_index": i, "entry_id": row.id, "leaf_hash": leaf}
+            for i, (row, leaf) in enumerate(zip(rows, leaves))
+        ])
+        heights.append(height)
+        height, previous = height + 1, sealed
+    db.commit()
+    return heights
+
+# --- Proofs and verification ---
+
+def inclusion_proof(db: Session, entry_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Merkle inclusion proof for one ledger entry, or None if it is not sealed
+    yet. Reads O(log n) digests from the sealed tree. The leaf is recomputed from the entry as stored now, so `valid` is False
+    for an entry edited after sealing.
+    """
+    position = db.execute(
+        select(LedgerBlockEntry.block_height, LedgerBlockEntry.leaf_index).where(LedgerBlockEntry.entry_id == entry_id)
+    ).first()
+    if position is None:
+        return None
+    block = db.get(LedgerBlock, position.block_height)
+    sibling_leaf = db.execute(
+        select(LedgerBlockEntry.leaf_hash)
+        .where(LedgerBlockEntry.block_height == block.height, LedgerBlockEntry.leaf_index == position.leaf_index ^ 1)
+    ).scalar()
+    row = db.execute(select(*LEAF_COLUMNS).where(ForensicLedger.id == entry_id)).first()
+    leaf = leaf_hash(row) if row else None
+    path = tree_path(block.tree, block.entry_count, position.leaf_index, sibling_leaf)
+    return {
+        "entry_id": entry_id,
+        "block_height": block.height,
+        "leaf_index": position.leaf_index,
+        "leaf_hash": leaf,
+        "path": path,
+        "merkle_root": block.merkle_root,
+        "block_hash": block.block_hash,
+        "valid": leaf is not None and verify_path(leaf, path, block.merkle_root),
+    }
+
+def verify_blocks(db: Session, from_height: int = 0, to_height: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Checks every block in [from_height, to_height]: the block hash chain,
+    the sealed root and tree against the sealed leaf hashes, and the leaf
+    hashes against the ledger rows as they are now. Failures name the block
+    and, for edited or deleted ledger rows, their leaf indexes.
+    """
+    started = time.perf_counter()
+    if to_height is None:
+        to_height = db.execute(select(func.max(LedgerBlock.height))).scalar()
+    result: Dict[str, Any] = {"from_height": from_height, "to_height": to_height, "blocks": 0, "entries": 0, "failures": []}
+    if to_height is None or to_height < from_height:
+        result.update(valid=True, elapsed_ms=0)
+        return result
+
+    blocks = {b.height: b for b in db.execute(
+        select(LedgerBlock).where(LedgerBlock.height.between(max(from_height - 1, 0), to_height))
+    ).scalars()}
+    if from_height == 0:
+        previous = GENESIS_HASH
+    else:
+        previous = blocks[from_height - 1].block_hash if from_height - 1 in blocks else None
+
+    failures = result["failures"]
+    streamed = _block_leaves(db, from_height, to_height)
+    pending = next(streamed, None)
+    for height in range(from_height, to_height + 1):
+        leaves: List[Tuple[str, Optional[str]]] = []
+        if pending is not None and pending[0] == height:
+            leaves = pending[1]
+            pending = next(streamed, None)
+        block = blocks.get(height)
+        if block is None:
+            failures.append({"block_height": height, "reason": "block missing"})
+            previous = None
+            continue
+        result["blocks"] += 1
+        result["entries"] += len(leaves)
+
+        # 1. Header and chain
+        if previous is not None and block.previous_hash != previous:
+            failures.append({"block_height": height, "reason": "broken block chain"})
+        if block_hash(height, block.previous_hash, block.merkle_root, block.entry_count) != block.block_hash:
+            failures.append({"block_height": height, "reason": "block header altered"})
+        previous = block.block_hash
+
+        # 2. Sealed leaves still produce the sealed root and tree
+        stored = [s for s, _ in leaves]
+        levels = merkle_levels(stored) if stored else [[GENESIS_HASH]]
+        if len(stored) != block.entry_count or levels[-1][0] != block.merkle_root or pack_tree(levels) != block.tree:
+            failures.append({"block_height": height, "reason": "sealed leaves or tree altered"})
+            continue
+
+        # 3. Ledger rows as they are now hash to the sealed leaves (so, to the root)
+        changed = [i for i, (s, c) in enumerate(leaves) if s != c]
+        if changed:
+            failures.append({"block_height": height, "reason": "ledger entries altered or deleted", "leaf_indexes": changed[:100]})
+
+    result.update(valid=not failures, elapsed_ms=round((time.perf_counter() - started) * 1000, 1))
+    return result
+
+def _block_leaves(db: Session, from_height: int, to_height: int) -> Iterator[Tuple[int, List[Tuple[str, Optional[str]]]]]:
+    """
+    (height, [(sealed leaf hash, current leaf hash or None if deleted)]) per block, in order.
+    """
+    rows = db.execute(
+        select(LedgerBlockEntry.block_height, LedgerBlockEntry.leaf_hash, *LEAF_COLUMNS)
+        .outerjoin(ForensicLedger, ForensicLedger.id == LedgerBlockEntry.entry_id)
+        .where(LedgerBlockEntry.block_height.between(from_height, to_height))
+        .order_by(LedgerBlockEntry.block_height, LedgerBlockEntry.leaf_index)
+        .execution_options(yield_per=10000)
+    )
+    height, leaves = None, []
+    for row in rows:
+        if row[0] != height:
+            if leaves:
+                yield height, leaves
+            height, leaves = row[0], []
+        leaves.append((row[1], leaf_hash(row[2:]) if row[2] is not None else None))
+    if leaves:
+        yield height, leaves
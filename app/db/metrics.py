@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+from app.models.metrics import (
+    CONFIDENCE_BINS, DAY, MINUTE, MetricBucket, accumulate, apply_metric_buckets
+)
+from app.models.transaction import Transaction
+
+# MINUTE buckets are kept for this long; DAY buckets are kept indefinitely
+MINUTE_RETENTION_HOURS = 24
+TREND_DAYS = 14
+RECENT_MINUTES = 60
+BACKFILL_CHUNK = 5000
+
+def backfill_metric_buckets(db: Session):
+    """
+    Ingest-time status is approximated by the current one.
+    """
+    rows = db.execute(
+        select(Transaction.created_at, Transaction.risk_score, Transaction.match_confidence, Transaction.status)
+        .execution_options(yield_per=BACKFILL_CHUNK)
+    )
+    cutoff = datetime.utcnow() - timedelta(hours=MINUTE_RETENTION_HOURS)
+    for chunk in rows.partitions():
+        buckets = accumulate(chunk)
+        apply_metric_buckets(db.connection(), {
+            (res, bucket): values for (res, bucket), values in buckets.items()
+            if res == DAY or bucket >= cutoff
+        })
+
+def rebuild_metric_buckets(db: Session):
+    db.execute(delete(MetricBucket))
+    backfill_metric_buckets(db)
+    prune_metric_buckets(db, datetime.utcnow())
+
+def prune_metric_buckets(db: Session, now: datetime):
+    """
+    Downsampling: minute detail past the retention window is dropped, the DAY bucket already holds it.
+    Runs hourly from the dashboard feed.
+    """
+    db.execute(
+        delete(MetricBucket).where(
+            MetricBucket.resolution == MINUTE,
+            MetricBucket.bucket < now - timedelta(hours=MINUTE_RETENTION_HOURS)
+        )
+    )
+    db.commit()
+
+def ml_metrics(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Confidence histogram, daily risk trend and recent per-minute activity,
+    read from DAY and MINUTE buckets: O(buckets), independent of table size.
+    Read-only; expired MINUTE buckets are pruned by the dashboard feed.
+    """
+    now = now or datetime.utcnow()
+
+    days = db.execute(
+        select(MetricBucket).where(MetricBucket.resolution == DAY).order_by(MetricBucket.bucket)
+    ).scalars().all()
+    minute_cutoff = now.replace(second=0, microsecond=0) - timedelta(minutes=RECENT_MINUTES - 1)
+    minutes = db.execute(
+        select(MetricBucket)
+        .where(MetricBucket.resolution == MINUTE, MetricBucket.bucket >= minute_cutoff)
+        .order_by(MetricBucket.bucket)
+    ).scalars().all()
+
+    # 1. Confidence Distribution (all retained days)
+    confidence_dist = [
+        {"range": label, "count": sum(getattr(d, column) for d in days)}
+        for _, column, label in CONFIDENCE_BINS
+    ]
+
+    # 2. Daily Risk Trend (last TREND_DAYS, empty days reported as zero)
+    by_day = {d.bucket: d for d in days}
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    anomaly_trend = []
+    for i in range(TREND_DAYS - 1, -1, -1):
+        day = today - timedelta(days=i)
+        d = by_day.get(day)
+        anomaly_trend.append({
+            "day": day.strftime("%b %d"),
+            "count": d.count if d else 0,
+            "avgScore": round(d.risk_sum / d.count / 100, 2) if d and d.count else 0.0,
+            "maxScore": round(d.risk_max / 100, 2) if d else 0.0,
+            "threshold": 0.8
+        })
+
+    # 3. Recent Activity (per minute)
+    recent = [
+        {
+            "minute": m.bucket.strftime("%H:%M"),
+            "count": m.count,
+            "avgScore": round(m.risk_sum / m.count / 100, 2) if m.count else 0.0,
+            "matched": m.matched,
+            "exceptions": m.exceptions,
+        }
+        for m in minutes
+    ]
+
+    return {
+        "processed": sum(d.count for d in days),
+        "confidenceDist": confidence_dist,
+        "anomalyTrend": anomaly_trend,
+        "recentActivity": recent,
+    }
@@ -1,29 +1,149 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session, DeclarativeBase
+from typing import Any, Dict, List
 from app.core.config import settings
+from app.core.telemetry import count_query
 
-# Create Sync Engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    echo=False,
-    connect_args={"check_same_thread": False} # Needed for SQLite
+# Async driver for each sync dialect (both drivers are in requirements.txt)
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+def async_url(url: str):
+    """
+    Same database as `url`, through its async driver. URLs that already name
+    an async driver are returned unchanged.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend!r} (DATABASE_URL)")
+    if url.get_driver_name() in ("aiosqlite", "asyncpg"):
+        return url
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+def sqlite_pragmas(read_only: bool = False) -> List[str]:
+    """
+    Connection profile for file-backed SQLite (see SQLITE_* settings).
+    """
+    pragmas = [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}", # Negative = KiB, not pages
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    if read_only:
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+def engine_options(url: str, pool_size: int, read_only: bool = False) -> Dict[str, Any]:
+    """
+    create_engine / create_async_engine keyword arguments for `url`.
+    """
+    url = make_url(url)
+    options: Dict[str, Any] = {"echo": False}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False} # Needed for SQLite
+        if url.database in (None, "", ":memory:"):
+            return options # Single shared connection, nothing to size
+    elif read_only:
+        options["execution_options"] = {"postgresql_readonly": True}
+
+    options.update(
+        pool_size=pool_size,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_pre_ping=True,
+    )
+    return options
+
+def configure_engine(engine: Engine, read_only: bool = False):
+    """
+    Per-connection setup (SQLite pragmas) and statement counting. Pass
+    AsyncEngine.sync_engine for async engines.
+    """
+    # Per-request DB statement counts (/metrics)
+    event.listen(engine, "before_cursor_execute", count_query)
+    if engine.dialect.name != "sqlite":
+        return
+
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, _):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+READ_URL = settings.DATABASE_READ_URL or settings.DATABASE_URL
+
+# Create Sync Engines (read/write, and a read-only pool for pure reads)
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL, settings.DB_POOL_SIZE))
+read_engine = create_engine(READ_URL, **engine_options(READ_URL, settings.DB_READ_POOL_SIZE, read_only=True))
+
+# Create Async Engines (hot read endpoints; awaits I/O instead of holding a threadpool slot)
+async_engine = create_async_engine(
+    async_url(settings.DATABASE_URL), **engine_options(settings.DATABASE_URL, settings.DB_POOL_SIZE)
+)
+async_read_engine = create_async_engine(
+    async_url(READ_URL), **engine_options(READ_URL, settings.DB_READ_POOL_SIZE, read_only=True)
 )
 
-# Create Session Factory
+configure_engine(engine)
+configure_engine(read_engine, read_only=True)
+configure_engine(async_engine.sync_engine)
+configure_engine(async_read_engine.sync_engine, read_only=True)
+
+# Create Session Factories
 SessionLocal = sessionmaker(
     bind=engine,
     autocommit=False,
     autoflush=False
 )
 
+ReadSessionLocal = sessionmaker(
+    bind=read_engine,
+    autocommit=False,
+    autoflush=False
+)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False # Attribute access after commit would need an implicit (sync) refresh
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # Base Class
 class Base(DeclarativeBase):
     pass
 
-# Dependency
+# Dependencies
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_async_read_db():
+    """
+    Read-only pool: endpoints that never write (writes fail with "attempt to write a readonly database").
+    """
+    async with AsyncReadSessionLocal() as db:
+        yield db
@@ -0,0 +1,164 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple
+import threading
+from sqlalchemy import delete, func, inspect, select
+from sqlalchemy.orm import Session
+from app.db.metrics import backfill_metric_buckets
+from app.models.metrics import MetricBucket
+from app.models.transaction import (
+    EXCEPTION_STATUS, MATCHED_STATUSES, Transaction, TransactionStat, apply_stat_deltas, stat_key,
+)
+
+# Hour buckets older than this are folded into ROLLUP_BUCKET, which bounds the
+# summary table (and every dashboard read) regardless of transaction volume.
+ROLLUP_HOURS = 24
+ROLLUP_BUCKET = datetime(1970, 1, 1)
+THROUGHPUT_HOURS = 12
+SLA_HOURS = 4
+
+
+_ensure_lock = threading.Lock()
+_ensured = False
+
+def ensure_summary_tables(db: Session):
+    """
+    Creates transaction_stats and metric_buckets if missing and backfills them
+    from `transactions`, inside the caller's transaction. Runs once per process:
+    at app startup, or on the first Transaction flush of a standalone script.
+    """
+    global _ensured
+    if _ensured:
+        return
+    with _ensure_lock:
+        if _ensured:
+            return
+        connection = db.connection()
+        inspector = inspect(connection)
+        for table, backfill in (
+            (TransactionStat.__table__, backfill_transaction_stats),
+            (MetricBucket.__table__, backfill_metric_buckets),
+        ):
+            if not inspector.has_table(table.name):
+                table.create(bind=connection)
+                backfill(db)
+        _ensured = True
+
+def backfill_transaction_stats(db: Session) -> int:
+    counts: Counter = Counter()
+    rows = db.execute(
+        select(Transaction.created_at, Transaction.status, Transaction.risk_score)
+        .execution_options(yield_per=5000)
+    )
+    for created_at, status, risk_score in rows:
+        counts[stat_key(created_at, status, risk_score)] += 1
+
+    apply_stat_deltas(db.connection(), counts)
+    return sum(counts.values())
+
+def rebuild_transaction_stats(db: Session) -> int:
+    """
+    Recomputes the summary from scratch (after writes that bypassed the ORM).
+    """
+    db.execute(delete(TransactionStat))
+    total = backfill_transaction_stats(db)
+    db.commit()
+    return total
+
+def rollup_transaction_stats(db: Session, now: datetime):
+    """
+    Folds hour buckets older than ROLLUP_HOURS into ROLLUP_BUCKET and commits.
+    Run hourly by the dashboard feed and before archival; reads are correct
+    either way, rolling up only keeps the table small.
+    DELETE ... RETURNING moves each row exactly once, even under concurrent writers.
+    """
+    cutoff = now - timedelta(hours=ROLLUP_HOURS)
+    moved = db.execute(
+        delete(TransactionStat)
+        .where(TransactionStat.bucket < cutoff, TransactionStat.bucket != ROLLUP_BUCKET)
+        .returning(TransactionStat.status, TransactionStat.risk_band, TransactionStat.count)
+    ).all()
+
+    deltas: Counter = Counter()
+    for status, band, count in moved:
+        deltas[(ROLLUP_BUCKET, status, band)] += count
+    apply_stat_deltas(db.connection(), deltas)
+    db.commit()
+
+def dashboard_counts(db: Session, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Transaction KPIs for the control room, read from transaction_stats.
+    Aging and SLA buckets are resolved at hour granularity. Read-only.
+    """
+    now = now or datetime.utcnow()
+    rows = db.execute(
+        select(TransactionStat.bucket, TransactionStat.status, TransactionStat.risk_band, TransactionStat.count)
+        .where(TransactionStat.count != 0)
+    ).all()
+    return summarize(rows, now)
+
+def status_counts(db: Session) -> Dict[str, int]:
+    """
+    Current number of transactions per status.
+    """
+    rows = db.execute(
+        select(TransactionStat.status, func.sum(TransactionStat.count))
+        .group_by(TransactionStat.status)
+    ).all()
+    return {status: int(count) for status, count in rows if count}
+
+def summarize(rows: Iterable[Tuple[datetime, str, str, int]], now: datetime) -> Dict[str, Any]:
+    """
+    Folds (bucket, status, risk_band, count) rows into dashboard KPIs.
+    Linear in the counts, so summarizing a set of deltas yields the KPI deltas.
+    """
+    hour = now.replace(minute=0, second=0, microsecond=0)
+    t_1h = hour - timedelta(hours=1)
+    t_sla = hour - timedelta(hours=SLA_HOURS)
+    hours = [hour - timedelta(hours=i) for i in range(THROUGHPUT_HOURS - 1, -1, -1)]
+    throughput = {h: {"matched": 0, "exceptions": 0} for h in hours}
+
+    ops_backlog = high_risk = sla_breaches = 0
+    aging = {"<1h": 0, "1-4h": 0, ">4h": 0}
+    bands = {"LOW": 0, "MEDIUM": 0, "HIGH": 0}
+
+    for bucket, status, band, count in rows:
+        if status == EXCEPTION_STATUS:
+            ops_backlog += count
+            bands[band] += count
+            if band == "HIGH":
+                high_risk += count
+            if bucket >= t_1h:
+                aging["<1h"] += count
+            elif bucket >= t_sla:
+                aging["1-4h"] += count
+            else:
+                aging[">4h"] += count
+
+        if status != "AUTO_RECONCILED" and bucket < t_sla:
+            sla_breaches += count
+
+        if bucket in throughput:
+            if status in MATCHED_STATUSES:
+                throughput[bucket]["matched"] += count
+            elif status == EXCEPTION_STATUS:
+                throughput[bucket]["exceptions"] += count
+
+    return {
+        "ops_backlog": ops_backlog,
+        "high_risk_count": high_risk,
+        "sla_breaches": sla_breaches,
+        "queue_aging": [
+            {"bucket": "<1h", "count": aging["<1h"], "fill": "#66bb6a"},
+            {"bucket": "1-4h", "count": aging["1-4h"], "fill": "#ffa726"},
+            {"bucket": ">4h", "count": aging[">4h"], "fill": "#f44336"}
+        ],
+        "throughput": [
+            {"hour": h.strftime("%H:00"), **throughput[h]} for h in hours
+        ],
+        "risk_distribution": [
+            {"name": "Low Risk", "value": bands["LOW"], "color": "#4caf50"},
+            {"name": "Medium Risk", "value": bands["MEDIUM"], "color": "#ff9800"},
+            {"name": "High Risk", "value": bands["HIGH"], "color": "#f44336"}
+        ],
+    }
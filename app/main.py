@@ -14,14 +14,48 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Keyset pagination (GET /transactions)
 )
 app.add_middleware(AuditMiddleware)
 
 @app.on_event("startup")
 async def startup_event():
     from app.core.background import system_event_generator
+    from app.core.inference import start_batchers
+    from app.core.shadow import shadow_queue
+    from app.core.dashboard import dashboard_feed
+    from app.core.audit import audit_writer
+    from app.core.ledger import ledger_sealer
+    from app.db.ledger import ensure_ledger_tables
+    from app.db.session import SessionLocal
+    from app.db.stats import ensure_summary_tables
     import asyncio
+    with SessionLocal() as db:
+        ensure_summary_tables(db)
+        ensure_ledger_tables(db)
+        db.commit()
     asyncio.create_task(system_event_generator())
+    await start_batchers()
+    await shadow_queue.start()
+    await dashboard_feed.start()
+    await audit_writer.start()
+    await ledger_sealer.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.core.inference import stop_batchers
+    from app.core.shadow import shadow_queue
+    from app.core.dashboard import dashboard_feed
+    from app.core.audit import audit_writer
+    from app.core.ledger import ledger_sealer
+    from app.db.session import async_engine, async_read_engine
+    await ledger_sealer.stop()
+    await dashboard_feed.stop()
+    await shadow_queue.stop()
+    await stop_batchers()
+    await audit_writer.stop() # Last: flushes rows written by the requests above
+    await async_engine.dispose()
+    await async_read_engine.dispose()
 
 # Include Routers
 api_router = APIRouter()
@@ -38,32 +72,47 @@ from fastapi import WebSocket, WebSocketDisconnect
 # ...
 
 api_router.include_router(reports.router, prefix="/admin/reports", tags=["reports"])
+api_router.include_router(policies.router, prefix="/admin/policies", tags=["policies"])
 api_router.include_router(admin_iam.router, prefix="/admin/iam", tags=["iam"])
 
 app.include_router(api_router)
 
 @app.websocket("/ws/admin")
 async def websocket_endpoint(websocket: WebSocket):
+    from app.core.dashboard import dashboard_feed
     await manager.connect(websocket)
+    await dashboard_feed.send_snapshot(websocket) # Initial state for client-side delta apply
     try:
         while True:
-            await websocket.receive_text() # Keep alive / Ignore client messages
+            await manager.handle(websocket, await websocket.receive_text()) # Topic subscriptions
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
 @app.get("/health")
 async def health_check():
 
-    import random
     from datetime import datetime
+    from app.core.telemetry import http_latency, quantile_ms
     
     # Dynamic Batch Calculation (Every 15 mins)
     now = datetime.now()
     minutes_until_next = 15 - (now.minute % 15)
     
+    # Observed API latency (p50 over all routes since startup)
+    p50 = quantile_ms(http_latency, 0.5)
+    
     return {
         "status": "System Healthy", 
-        "latency": f"{random.randint(10, 45)}ms", 
+        "latency": f"{p50}ms" if p50 is not None else "n/a", 
         "version": config.settings.VERSION,
         "next_batch_min": minutes_until_next
     }
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    """
+    Prometheus text exposition of request, DB and inference telemetry.
+    """
+    from fastapi.responses import PlainTextResponse
+    from app.core.telemetry import telemetry
+    return PlainTextResponse(telemetry.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,291 @@
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import joblib
+import numpy as np
+import pandas as pd
+
+ARTIFACT_DIR = 'app/ml/models'
+MANIFEST_FILE = 'registry.json'
+KEEP_VERSIONS = 10 # Artifacts kept per model, besides the active version and its rollback target
+
+@dataclass(frozen=True)
+class LoadedModel:
+    """
+    A warmed-up model instance pinned to one registry version.
+    Callers hold the reference for the duration of a prediction, so a hot-swap
+    never changes the model underneath an in-flight request.
+    """
+    name: str
+    version: str
+    model: Any
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+class ModelRegistry:
+    """
+    Versioned model artifacts with metadata, backed by a JSON manifest.
+
+    Manifest layout (app/ml/models/registry.json):
+    {
+      "models": {
+        "match_probability": {
+          "active": "T-REC-XGB-V4.2",
+          "frozen": false,
+          "versions": {"T-REC-XGB-V4.2": {"artifact": "...pkl", "features": [...], ...}}
+        }
+      }
+    }
+
+    - Lazy: nothing is unpickled until the first get().
+    - Warm-up: every load runs one dummy prediction before it is served.
+    - Hot-swap: the manifest mtime is polled on get(); a new active version is
+      loaded and warmed on the side, then swapped in with a single assignment.
+    - Retention: register() keeps the last `keep_versions` versions plus the
+      active one and its rollback target, and deletes older artifacts.
+    """
+
+    def __init__(self, root: str = ARTIFACT_DIR, poll_interval: float = 1.0, keep_versions: int = KEEP_VERSIONS):
+        self.root = root
+        self.manifest_path = os.path.join(root, MANIFEST_FILE)
+        self.poll_interval = poll_interval
+        self.keep_versions = keep_versions
+
+        self._lock = threading.RLock()
+        self._loaded: Dict[str, LoadedModel] = {}
+        self._manifest: Dict[str, Any] = {"models": {}}
+        self._manifest_mtime: Optional[int] = None
+        self._last_poll = 0.0
+
+    # --- Read Path ---
+
+    def get(self, name: str) -> Optional[LoadedModel]:
+        """
+        Returns the active version of `name`, loading it on first use.
+        Returns None if the model is not registered or fails to load.
+        """
+        self._poll_manifest()
+
+        entry = self._manifest["models"].get(name)
+        if not entry or not entry.get("active"):
+            return None
+
+        current = self._loaded.get(name)
+        if current and current.version == entry["active"]:
+            return current
+
+        with self._lock:
+            # Another thread may have finished the swap while we waited
+            entry = self._manifest["models"].get(name, {})
+            current = self._loaded.get(name)
+            if current and current.version == entry.get("active"):
+                return current
+
+            try:
+                loaded = self._load(name, entry["active"], entry["versions"][entry["active"]])
+            except Exception as e:
+                print(f"⚠️ Model {name}@{entry.get('active')} not loaded: {e}. Keeping previous version.")
+                return current
+
+            self._loaded[name] = loaded  # Atomic swap
+            return loaded
+
+    def active_version(self, name: str) -> Optional[str]:
+        self._poll_manifest()
+        entry = self._manifest["models"].get(name)
+        return entry.get("active") if entry else None
+
+    def describe(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Metadata for the active version of `name`, plus registry state.
+        """
+        self._poll_manifest()
+        entry = self._manifest["models"].get(name)
+        if not entry:
+            return None
+
+        versions = list(entry["versions"].keys())
+        active = entry.get("active")
+        return {
+            "name": name,
+            "version": active,
+            "versions": versions,
+            "frozen": entry.get("frozen", False),
+            "is_latest": bool(versions) and active == versions[-1],
+            "loaded": name in self._loaded and self._loaded[name].version == active,
+            "metadata": entry["versions"].get(active, {}),
+        }
+
+    def versions(self, name: str) -> List[str]:
+        self._poll_manifest()
+        entry = self._manifest["models"].get(name)
+        return list(entry["versions"].keys()) if entry else []
+
+    # --- Write Path ---
+
+    def register(
+        self,
+        name: str,
+        model: Any,
+        version: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        activate: bool = True,
+    ) -> LoadedModel:
+        """
+        Persists a new artifact version and (optionally) makes it active.
+        The in-memory instance is warmed and served directly, no reload needed.
+        Versions beyond the retention window are dropped (see _prune).
+        """
+        metadata = dict(metadata or {})
+        artifact = os.path.join(name, f"{version}.pkl")
+        path = os.path.join(self.root, artifact)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.tmp"
+        joblib.dump(model, tmp_path)
+        os.replace(tmp_path, path)
+
+        metadata.setdefault("created_at", datetime.utcnow().isoformat())
+        metadata["artifact"] = artifact
+        loaded = LoadedModel(name=name, version=version, model=model, metadata=metadata)
+        _warm_up(loaded)
+
+        with self._lock:
+            manifest = self._read_manifest()
+            entry = manifest["models"].setdefault(name, {"active": None, "frozen": False, "versions": {}})
+            entry["versions"][version] = metadata
+            if activate or not entry.get("active"):
+                entry["active"] = version
+            pruned = self._prune(entry)
+            self._write_manifest(manifest)
+
+            if entry["active"] == version:
+                self._loaded[name] = loaded
+
+        # Files go only once the manifest no longer points at them
+        for old in pruned:
+            try:
+                os.remove(os.path.join(self.root, old["artifact"]))
+            except FileNotFoundError:
+                pass
+
+        return loaded
+
+    def activate(self, name: str, version: str) -> Dict[str, Any]:
+        with self._lock:
+            manifest = self._read_manifest()
+            entry = manifest["models"].get(name)
+            if not entry or version not in entry["versions"]:
+                raise KeyError(f"Unknown model version {name}@{version}")
+            entry["active"] = version
+            self._write_manifest(manifest)
+
+        # Load eagerly so the caller finds out now if the artifact is broken
+        self.get(name)
+        return self.describe(name)
+
+    def rollback(self, name: str) -> Dict[str, Any]:
+        """
+        Activates the version registered immediately before the active one.
+        """
+        versions = self.versions(name)
+        active = self.active_version(name)
+        if active not in versions or versions.index(active) == 0:
+            raise ValueError(f"No earlier version of {name} to roll back to")
+        return self.activate(name, versions[versions.index(active) - 1])
+
+    def set_frozen(self, name: str, frozen: bool) -> Dict[str, Any]:
+        """
+        Frozen models keep serving but must not be updated by learners.
+        """
+        with self._lock:
+            manifest = self._read_manifest()
+            entry = manifest["models"].get(name)
+            if not entry:
+                raise KeyError(f"Unknown model {name}")
+            entry["frozen"] = frozen
+            self._write_manifest(manifest)
+        return self.describe(name)
+
+    # --- Internals ---
+
+    def _prune(self, entry: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Drops versions older than the last `keep_versions` from a manifest entry,
+        except the active version and the one rollback() would return to.
+        Returns the metadata of the dropped versions.
+        """
+        versions = list(entry["versions"].keys())
+        keep = set(versions[-self.keep_versions:]) if self.keep_versions > 0 else set()
+        active = entry.get("active")
+        if active in entry["versions"]:
+            keep.add(active)
+            index = versions.index(active)
+            if index > 0:
+                keep.add(versions[index - 1])
+        return [entry["versions"].pop(v) for v in versions if v not in keep]
+
+    def _poll_manifest(self):
+        now = time.monotonic()
+        if self._manifest_mtime is not None and now - self._last_poll < self.poll_interval:
+            return
+        self._last_poll = now
+
+        try:
+            mtime = os.stat(self.manifest_path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._manifest_mtime:
+            return
+
+        with self._lock:
+            self._manifest = self._read_manifest()
+            self._manifest_mtime = mtime
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        try:
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"models": {}}
+
+    def _write_manifest(self, manifest: Dict[str, Any]):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = f"{self.manifest_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.write("\n")
+        os.replace(tmp_path, self.manifest_path)
+
+        self._manifest = manifest
+        self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+
+    def _load(self, name: str, version: str, metadata: Dict[str, Any]) -> LoadedModel:
+        model = joblib.load(os.path.join(self.root, metadata["artifact"]))
+        loaded = LoadedModel(name=name, version=version, model=model, metadata=metadata)
+        _warm_up(loaded)
+        return loaded
+
+def _warm_up(loaded: LoadedModel):
+    """
+    Runs one dummy prediction so lazy initialisation (thread pools, booster
+    caches) happens before the first real request hits the model.
+    """
+    model = loaded.model
+    columns = loaded.metadata.get("features") or list(getattr(model, "feature_names_in_", []))
+    if columns:
+        X = pd.DataFrame(np.zeros((1, len(columns))), columns=columns)
+    else:
+        X = np.zeros((1, int(getattr(model, "n_features_in_", 1))))
+
+    for method in ("predict_proba", "decision_function", "predict"):
+        fn = getattr(model, method, None)
+        if fn is not None:
+            fn(X)
+            return
+
+registry = ModelRegistry()
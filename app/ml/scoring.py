@@ -1,17 +1,20 @@
-import joblib
-import os
 import pandas as pd
 import numpy as np
+from app.ml.registry import registry
 
-# Load models once (Singleton pattern in a real app)
-ARTIFACT_DIR = 'app/ml/models'
-try:
-    xgb_model = joblib.load(os.path.join(ARTIFACT_DIR, 'match_probability_model.pkl'))
-    iso_model = joblib.load(os.path.join(ARTIFACT_DIR, 'anomaly_detector.pkl'))
-except Exception as e:
-    print(f"⚠️ Models not loaded: {e}. Scoring will fallback to rules.")
-    xgb_model = None
-    iso_model = None
+# Models are resolved through the registry on each call: loaded lazily on first
+# use and hot-swapped when the active version changes (e.g. after a rollback).
+MATCH_MODEL = 'match_probability'
+ANOMALY_MODEL = 'anomaly_detector'
+
+# Model inputs (order matters for the registered artifacts)
+INPUT_COLS = [
+    "amount_diff", "date_diff", "reference_similarity", 
+    "historical_match_rate", "system_load"
+]
+
+# Risk weights (Configurable/Versioned)
+W_MATCH, W_ANOMALY, W_SLA, W_AMOUNT = 40, 30, 10, 20
 
 def calculate_risk_score(features: dict) -> float:
     """
@@ -25,57 +28,64 @@ def calculate_risk_score(features: dict) -> float:
       w3 * sla_pressure +
       w4 * amount_weight
     )
-    """
     
+    Single-row convenience wrapper; use calculate_risk_scores for batches.
+    """
+    return float(calculate_risk_scores(pd.DataFrame([features]))[0])
+
+def calculate_risk_scores(df: pd.DataFrame) -> np.ndarray:
+    """
+    Vectorized risk score for a whole frame.
+    One predict_proba and one decision_function call per batch; the weighted
+    formula is evaluated column-wise with NumPy. Returns an array of scores (0-100)
+    aligned with df's rows.
+    """
+    n = len(df)
+    if n == 0:
+        return np.empty(0)
+
     # 1. Get Model Predictions
+    xgb_model = registry.get(MATCH_MODEL)
+    iso_model = registry.get(ANOMALY_MODEL)
     if xgb_model and iso_model:
-        # Prepare vector
-        df = pd.DataFrame([features])
-        input_cols = [
-            "amount_diff", "date_diff", "reference_similarity", 
-            "historical_match_rate", "system_load"
-        ]
-        X = df[input_cols]
+        X = df[INPUT_COLS]
         
         # P(match)
-        match_prob = xgb_model.predict_proba(X)[0][1]
+        match_prob = xgb_model.model.predict_proba(X)[:, 1]
         
         # Anomaly Score (Isolation Forest returns score, lower is more anomalous)
-        # We need to invert/scale it to 0-1 range where 1 is highly anomalous
-        # Typical decision_function output is roughly -0.5 to 0.5
-        raw_anomaly = iso_model.decision_function(X)[0]
-        # Heuristic scaling: IF score < 0 is outlier. 
-        # Map: -0.2 -> 1.0 (High Risk), 0.2 -> 0.0 (Low Risk)
-        anomaly_factor = 1 if raw_anomaly < -0.1 else 0
-        if raw_anomaly > 0: anomaly_factor = 0
-            
+        # Heuristic scaling: decision_function below -0.1 counts as an outlier.
+        raw_anomaly = iso_model.model.decision_function(X)
+        anomaly_factor = (raw_anomaly < -0.1).astype(float)
     else:
         # Fallback
-        match_prob = 0.5
-        anomaly_factor = 0.5
+        match_prob = np.full(n, 0.5)
+        anomaly_factor = np.full(n, 0.5)
 
-    # 2. Apply Weights (Configurable/Versioned)
-    w1, w2, w3, w4 = 40, 30, 10, 20
-    
+    # 2. Business Factors
     # SLA Factor (if SLA remaining < 2 hours, higher risk of breach)
-    sla_pressure = 1 if features.get('sla_remaining', 24) < 2 else 0
+    sla_remaining = _column(df, 'sla_remaining', 24)
+    sla_pressure = (sla_remaining < 2).astype(float)
     
-    # Amount Factor (Higher amount = higher risk, log scale)
-    amt = features.get('amount', 0)
-    amount_weight = 1 if amt > 100000 else (amt / 100000)
+    # Amount Factor (Higher amount = higher risk, capped at 100k)
+    amt = _column(df, 'amount', 0)
+    amount_weight = np.where(amt > 100000, 1.0, amt / 100000)
 
     # 3. Calculate Final Score (0-100)
     # Risk increases as Match Probability decreases
-    prob_risk = (1.0 - match_prob) 
-    
     risk_score = (
-        w1 * prob_risk +
-        w2 * anomaly_factor +
-        w3 * sla_pressure +
-        w4 * amount_weight
+        W_MATCH * (1.0 - match_prob) +
+        W_ANOMALY * anomaly_factor +
+        W_SLA * sla_pressure +
+        W_AMOUNT * amount_weight
     )
     
-    return min(100.0, max(0.0, risk_score))
+    return np.clip(risk_score, 0.0, 100.0)
+
+def _column(df: pd.DataFrame, name: str, default: float) -> np.ndarray:
+    if name not in df.columns:
+        return np.full(len(df), float(default))
+    return df[name].fillna(default).to_numpy(dtype=float)
 
 if __name__ == "__main__":
     # Quick Test
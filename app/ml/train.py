@@ -1,11 +1,12 @@
 import pandas as pd
 import numpy as np
 import os
-import joblib
+from datetime import datetime
 from xgboost import XGBClassifier
 from sklearn.ensemble import IsolationForest
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, precision_score, recall_score
+from app.ml.registry import registry
 
 # Constants
 DATA_PATH = 'data/training/enterprise_audit_log.csv'
@@ -63,8 +64,15 @@ def train_models():
     prec = precision_score(y_test, y_pred)
     print(f"✅ XGBoost Performance: Accuracy={acc:.4f}, Precision={prec:.4f}")
     
-    # Save
-    joblib.dump(xgb, os.path.join(ARTIFACT_DIR, 'match_probability_model.pkl'))
+    # Register (new version becomes active; previous stays available for rollback)
+    version_tag = datetime.utcnow().strftime("%Y%m%d%H%M%S")
+    registry.register("match_probability", xgb, f"T-REC-XGB-{version_tag}", {
+        "framework": "xgboost",
+        "features": features,
+        "accuracy": f"{acc * 100:.1f}%",
+        "precision": round(float(prec), 4),
+        "training_rows": len(X_train)
+    })
 
     # ==========================================
     # LAYER 2: ANOMALY DETECTION
@@ -87,10 +95,14 @@ def train_models():
         scores = iso.decision_function(test_anoms)
         print(f"ℹ️ Anomaly Scores for known outliers (lower is more anomalous): {scores[:5]}")
     
-    # Save
-    joblib.dump(iso, os.path.join(ARTIFACT_DIR, 'anomaly_detector.pkl'))
+    # Register
+    registry.register("anomaly_detector", iso, f"ISO-{version_tag}", {
+        "framework": "sklearn",
+        "features": features,
+        "training_rows": len(X)
+    })
     
-    print(f"\n💾 Models saved to {ARTIFACT_DIR}/")
+    print(f"\n💾 Models registered in {registry.manifest_path}")
     print("Training Pipeline Complete. Ready for Shadow Mode.")
 
 if __name__ == "__main__":
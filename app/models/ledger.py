@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, LargeBinary, Text
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 import uuid
@@ -23,3 +23,32 @@ class ForensicLedger(Base):
     metadata_json: Mapped[str] = mapped_column(Text, nullable=True) 
     
     timestamp: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+class LedgerBlock(Base):
+    """
+    A sealed batch of ForensicLedger entries: the Merkle root over their leaf
+    hashes, chained to the previous block by block_hash (see app/db/ledger.py).
+    """
+    __tablename__ = "ledger_blocks"
+
+    height: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    merkle_root: Mapped[str] = mapped_column(String(64))
+    previous_hash: Mapped[str] = mapped_column(String(64)) # block_hash of height - 1
+    block_hash: Mapped[str] = mapped_column(String(64))
+    entry_count: Mapped[int] = mapped_column(Integer)
+    tree: Mapped[bytes] = mapped_column(LargeBinary) # Inner nodes, level by level, 32 bytes each (proofs read O(log n) of them)
+    first_timestamp: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
+    last_timestamp: Mapped[DateTime] = mapped_column(DateTime(timezone=True), nullable=True)
+    sealed_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+class LedgerBlockEntry(Base):
+    """
+    Leaf position of one ledger entry in its block. An entry is sealed once
+    it has a row here.
+    """
+    __tablename__ = "ledger_block_entries"
+
+    block_height: Mapped[int] = mapped_column(ForeignKey("ledger_blocks.height"), primary_key=True)
+    leaf_index: Mapped[int] = mapped_column(Integer, primary_key=True)
+    entry_id: Mapped[str] = mapped_column(String, unique=True, index=True) # ForensicLedger.id
+    leaf_hash: Mapped[str] = mapped_column(String(64))
@@ -0,0 +1,136 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import String, Integer, DateTime, func, update
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.session import Base
+
+MINUTE = "MINUTE"
+DAY = "DAY"
+
+# (upper bound, column, label) for the match confidence histogram
+CONFIDENCE_BINS = [
+    (20, "conf_0_20", "0-20%"),
+    (40, "conf_20_40", "20-40%"),
+    (60, "conf_40_60", "40-60%"),
+    (80, "conf_60_80", "60-80%"),
+    (None, "conf_80_100", "80-100%"),
+]
+
+SUM_COLUMNS = (
+    "count", "risk_sum", "matched", "exceptions", "review",
+    *[col for _, col, _ in CONFIDENCE_BINS],
+)
+
+class MetricBucket(Base):
+    """
+    Pre-aggregated ingest metrics per time bucket (MINUTE and DAY resolution).
+    Written on transaction insert; MINUTE buckets are pruned after a retention
+    window, DAY buckets are kept, so the store stays O(days) in size.
+    """
+    __tablename__ = "metric_buckets"
+
+    resolution: Mapped[str] = mapped_column(String, primary_key=True) # MINUTE, DAY
+    bucket: Mapped[datetime] = mapped_column(DateTime, primary_key=True)
+
+    count: Mapped[int] = mapped_column(Integer, default=0)
+    risk_sum: Mapped[int] = mapped_column(Integer, default=0)
+    risk_max: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Confidence Histogram
+    conf_0_20: Mapped[int] = mapped_column(Integer, default=0)
+    conf_20_40: Mapped[int] = mapped_column(Integer, default=0)
+    conf_40_60: Mapped[int] = mapped_column(Integer, default=0)
+    conf_60_80: Mapped[int] = mapped_column(Integer, default=0)
+    conf_80_100: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Outcome at ingest
+    matched: Mapped[int] = mapped_column(Integer, default=0)
+    exceptions: Mapped[int] = mapped_column(Integer, default=0)
+    review: Mapped[int] = mapped_column(Integer, default=0)
+
+BucketKey = Tuple[str, datetime]
+
+def confidence_column(match_confidence: Optional[float]) -> str:
+    value = match_confidence or 0.0
+    for upper, column, _ in CONFIDENCE_BINS:
+        if upper is None or value < upper:
+            return column
+
+def accumulate(rows: Iterable[Tuple[Optional[datetime], Optional[int], Optional[float], Optional[str]]]) -> Dict[BucketKey, dict]:
+    """
+    Folds (created_at, risk_score, match_confidence, status) rows into
+    MINUTE and DAY bucket increments.
+    """
+    from app.models.transaction import EXCEPTION_STATUS, MATCHED_STATUSES # app.models.transaction imports this module
+
+    buckets: Dict[BucketKey, dict] = defaultdict(lambda: dict.fromkeys(SUM_COLUMNS + ("risk_max",), 0))
+    targets: Dict[datetime, tuple] = {} # created_at -> its (MINUTE, DAY) buckets; bulk batches share timestamps
+    for created_at, risk_score, match_confidence, status in rows:
+        created = created_at or datetime.utcnow()
+        pair = targets.get(created)
+        if pair is None:
+            naive = created.replace(tzinfo=None)
+            pair = targets[created] = (
+                buckets[(MINUTE, naive.replace(second=0, microsecond=0))],
+                buckets[(DAY, naive.replace(hour=0, minute=0, second=0, microsecond=0))],
+            )
+        risk = risk_score or 0
+        if status in MATCHED_STATUSES:
+            outcome = "matched"
+        elif status == EXCEPTION_STATUS:
+            outcome = "exceptions"
+        else:
+            outcome = "review"
+
+        column = confidence_column(match_confidence)
+        for b in pair:
+            b["count"] += 1
+            b["risk_sum"] += risk
+            b["risk_max"] = max(b["risk_max"], risk)
+            b[column] += 1
+            b[outcome] += 1
+    return buckets
+
+def apply_metric_buckets(connection, buckets: Dict[BucketKey, dict]):
+    """
+    Merges bucket increments into metric_buckets in the caller's transaction.
+    """
+    rows = [{"resolution": r, "bucket": b, **values} for (r, b), values in buckets.items()]
+    if not rows:
+        return
+
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+            greatest = func.max # Scalar max() with two arguments
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+            greatest = func.greatest
+        stmt = upsert(MetricBucket)
+        set_ = {col: getattr(MetricBucket, col) + stmt.excluded[col] for col in SUM_COLUMNS}
+        set_["risk_max"] = greatest(MetricBucket.risk_max, stmt.excluded["risk_max"])
+        connection.execute(
+            stmt.on_conflict_do_update(index_elements=["resolution", "bucket"], set_=set_),
+            rows
+        )
+        return
+
+    # Portable fallback: update, then insert the buckets that did not exist yet
+    for row in rows:
+        existing = connection.execute(
+            MetricBucket.__table__.select().where(
+                MetricBucket.resolution == row["resolution"], MetricBucket.bucket == row["bucket"]
+            )
+        ).mappings().first()
+        if existing is None:
+            connection.execute(MetricBucket.__table__.insert(), row)
+            continue
+        values = {col: existing[col] + row[col] for col in SUM_COLUMNS}
+        values["risk_max"] = max(existing["risk_max"], row["risk_max"])
+        connection.execute(
+            update(MetricBucket)
+            .where(MetricBucket.resolution == row["resolution"], MetricBucket.bucket == row["bucket"])
+            .values(**values)
+        )
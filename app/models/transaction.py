@@ -1,11 +1,25 @@
-from sqlalchemy import String, Float, Integer, Boolean, DateTime
-from sqlalchemy.orm import Mapped, mapped_column
+from collections import Counter
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy import String, Float, Integer, Boolean, DateTime, Index, LargeBinary, event, inspect, select, update
+from sqlalchemy.orm import Mapped, Session, mapped_column, object_session
 from sqlalchemy.sql import func
 import uuid
 from app.db.session import Base
+from app.models.metrics import accumulate, apply_metric_buckets
+
+# Status groups shared by the dashboard summaries, the ML metrics store and archival
+MATCHED_STATUSES = ("AUTO_RECONCILED", "MATCHED", "APPROVED")
+EXCEPTION_STATUS = "EXCEPTION"
+# Final states: nothing on the hot path (queues, backlog, SLA) reads these once they age out
+SETTLED_STATUSES = MATCHED_STATUSES + ("REJECTED",)
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Candidate lookup: equality on currency + amount range scan
+        Index("ix_transactions_currency_amount", "currency", "amount"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: f"TXN-{uuid.uuid4().hex[:8].upper()}")
     source: Mapped[str] = mapped_column(String, index=True) # SWIFT, LEDGER
@@ -22,3 +36,181 @@ class Transaction(Base):
     value_date: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     created_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), server_default=func.now())
     updated_at: Mapped[DateTime] = mapped_column(DateTime(timezone=True), onupdate=func.now(), server_default=func.now())
+
+# Hot query shapes (alembic revision 3b7e9c2d4f10):
+# grid / governance queues: status filter ordered by risk (id keeps the keyset order total)
+Index("ix_transactions_status_risk", Transaction.status, Transaction.risk_score.desc(), Transaction.id.desc())
+# unfiltered grid: ORDER BY risk_score DESC, id DESC LIMIT n
+Index("ix_transactions_risk", Transaction.risk_score.desc(), Transaction.id.desc())
+# dashboard alerts / SLA filters: status + created_at range
+Index("ix_transactions_status_created", Transaction.status, Transaction.created_at)
+
+class TransactionStat(Base):
+    """
+    Materialized dashboard counters: number of transactions per
+    (created_at hour, status, risk band). Kept in step with `transactions`
+    by the mapper events below; Core bulk writes call record_stat_deltas().
+    """
+    __tablename__ = "transaction_stats"
+
+    bucket: Mapped[datetime] = mapped_column(DateTime, primary_key=True) # created_at truncated to the hour
+    status: Mapped[str] = mapped_column(String, primary_key=True)
+    risk_band: Mapped[str] = mapped_column(String, primary_key=True) # LOW, MEDIUM, HIGH
+    count: Mapped[int] = mapped_column(Integer, default=0)
+
+class TransactionArchive(Base):
+    """
+    Cold storage for settled transactions (app/db/archive.py): each row is a
+    zlib-compressed NDJSON segment of `transactions` rows from one created_at
+    month. On PostgreSQL the table is list-partitioned by month; partitions
+    are created by the archival job.
+    """
+    __tablename__ = "transaction_archive"
+    __table_args__ = {"postgresql_partition_by": "LIST (period)"}
+
+    period: Mapped[str] = mapped_column(String, primary_key=True) # YYYY-MM of created_at
+    segment: Mapped[int] = mapped_column(Integer, primary_key=True)
+    row_count: Mapped[int] = mapped_column(Integer)
+    first_created: Mapped[datetime] = mapped_column(DateTime)
+    last_created: Mapped[datetime] = mapped_column(DateTime)
+    archived_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+    payload: Mapped[bytes] = mapped_column(LargeBinary)
+
+# --- Summary Maintenance ---
+
+StatKey = Tuple[datetime, str, str]
+
+def risk_band(risk_score: Optional[int]) -> str:
+    score = risk_score or 0
+    if score > 80:
+        return "HIGH"
+    if score > 50:
+        return "MEDIUM"
+    return "LOW"
+
+def stat_key(created_at: Optional[datetime], status: Optional[str], risk_score: Optional[int]) -> StatKey:
+    # New rows may not have their server-side created_at loaded yet: they were created now
+    created = created_at or datetime.utcnow()
+    bucket = created.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    return (bucket, status or "PENDING", risk_band(risk_score))
+
+def apply_stat_deltas(connection, deltas: Dict[StatKey, int]):
+    """
+    Adds signed counts to transaction_stats in the caller's transaction.
+    """
+    rows = [
+        {"bucket": b, "status": s, "risk_band": r, "count": n}
+        for (b, s, r), n in deltas.items() if n
+    ]
+    if not rows:
+        return
+
+    dialect = connection.dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        stmt = upsert(TransactionStat)
+        connection.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["bucket", "status", "risk_band"],
+                set_={"count": TransactionStat.count + stmt.excluded["count"]},
+            ),
+            rows
+        )
+        return
+
+    # Portable fallback: update, then insert the keys that did not exist yet
+    for row in rows:
+        result = connection.execute(
+            update(TransactionStat)
+            .where(
+                TransactionStat.bucket == row["bucket"],
+                TransactionStat.status == row["status"],
+                TransactionStat.risk_band == row["risk_band"],
+            )
+            .values(count=TransactionStat.count + row["count"])
+        )
+        if result.rowcount == 0:
+            connection.execute(TransactionStat.__table__.insert(), row)
+
+# Called with the net deltas of every committed session (e.g. the dashboard WebSocket feed)
+stat_subscribers: List[Callable[[Dict[StatKey, int]], None]] = []
+
+def record_stat_deltas(session: Session, deltas: Dict[StatKey, int]):
+    """
+    Applies deltas in the session's transaction; subscribers see them only after commit.
+    """
+    apply_stat_deltas(session.connection(), deltas)
+    _stage(session, deltas)
+
+def _stage(session: Optional[Session], deltas: Dict[StatKey, int]):
+    if session is not None and stat_subscribers:
+        session.info.setdefault("stat_deltas", Counter()).update(deltas)
+
+@event.listens_for(Session, "before_flush")
+def _ensure_summaries(session, flush_context, instances):
+    # Summary tables must exist (and be backfilled) before the first Transaction write
+    if any(isinstance(o, Transaction) for o in (*session.new, *session.dirty, *session.deleted)):
+        from app.db.stats import ensure_summary_tables
+        ensure_summary_tables(session)
+
+@event.listens_for(Session, "after_commit")
+def _publish_stat_deltas(session):
+    deltas = session.info.pop("stat_deltas", None)
+    if not deltas:
+        return
+    deltas = {k: n for k, n in deltas.items() if n}
+    for subscriber in stat_subscribers:
+        try:
+            subscriber(deltas)
+        except Exception as e:
+            print(f"⚠️ Stat subscriber failed: {e}")
+
+@event.listens_for(Session, "after_rollback")
+def _discard_stat_deltas(session):
+    session.info.pop("stat_deltas", None)
+
+def _loaded(target, attr: str):
+    # Read without triggering a refresh (server defaults are expired mid-flush)
+    return target.__dict__.get(attr)
+
+@event.listens_for(Transaction, "after_insert")
+def _stats_after_insert(mapper, connection, target):
+    deltas = {stat_key(_loaded(target, "created_at"), _loaded(target, "status"), _loaded(target, "risk_score")): 1}
+    apply_stat_deltas(connection, deltas)
+    _stage(object_session(target), deltas)
+
+    # Ingest metrics (time-series store behind /monitoring/metrics)
+    apply_metric_buckets(connection, accumulate([(
+        _loaded(target, "created_at"), _loaded(target, "risk_score"),
+        _loaded(target, "match_confidence"), _loaded(target, "status"),
+    )]))
+
+@event.listens_for(Transaction, "after_update")
+def _stats_after_update(mapper, connection, target):
+    attrs = inspect(target).attrs
+    status, risk = attrs.status.history, attrs.risk_score.history
+    if not (status.has_changes() or risk.has_changes()):
+        return
+
+    created_at = _loaded(target, "created_at")
+    if created_at is None:
+        created_at = connection.execute(select(Transaction.created_at).where(Transaction.id == target.id)).scalar()
+    old = stat_key(
+        created_at,
+        status.deleted[0] if status.deleted else _loaded(target, "status"),
+        risk.deleted[0] if risk.deleted else _loaded(target, "risk_score"),
+    )
+    new = stat_key(created_at, _loaded(target, "status"), _loaded(target, "risk_score"))
+    if old != new:
+        deltas = {old: -1, new: 1}
+        apply_stat_deltas(connection, deltas)
+        _stage(object_session(target), deltas)
+
+@event.listens_for(Transaction, "after_delete")
+def _stats_after_delete(mapper, connection, target):
+    deltas = {stat_key(_loaded(target, "created_at"), _loaded(target, "status"), _loaded(target, "risk_score")): -1}
+    apply_stat_deltas(connection, deltas)
+    _stage(object_session(target), deltas)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Table
+from sqlalchemy import Column, String, Boolean, DateTime, ForeignKey, Index, Table
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 from sqlalchemy.sql import func
 import uuid
@@ -43,6 +43,12 @@ class Role(Base):
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
+    __table_args__ = (
+        # Ticket history: resource equality, newest first
+        Index("ix_audit_logs_resource_timestamp", "resource", "timestamp"),
+        # Audit feeds and dashboard alerts: ORDER BY timestamp DESC LIMIT n
+        Index("ix_audit_logs_timestamp", "timestamp"),
+    )
 
     id: Mapped[str] = mapped_column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     event_type: Mapped[str] = mapped_column(String, index=True) # LOGIN, MFA_FAIL, etc.
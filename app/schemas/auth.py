@@ -13,6 +13,7 @@ class ProfileSelect(BaseModel):
 class TokenPayload(BaseModel):
     sub: Optional[str] = None
     exp: Optional[int] = None
+    jti: Optional[str] = None
     system: Optional[str] = None # Added System Code
     role: Optional[str] = None # Added Role
 
@@ -0,0 +1,39 @@
+"""
+Archival job: moves settled transactions older than N days into compressed
+cold storage (transaction_archive). Safe to run repeatedly, e.g. nightly from cron.
+
+Usage: python scripts/archive_transactions.py [--days 90] [--batch-size 5000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.archive import archive_transactions
+from app.db.session import SessionLocal
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=settings.ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print(f"🗄️ Archiving settled transactions older than {args.days} days...")
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        totals = archive_transactions(db, older_than_days=args.days, batch_size=args.batch_size)
+    elapsed = time.perf_counter() - started
+
+    for period, count in sorted(totals["periods"].items()):
+        print(f"   {period}: {count} rows")
+    ratio = totals["raw_bytes"] / totals["compressed_bytes"] if totals["compressed_bytes"] else 0
+    print(
+        f"✅ Archived {totals['rows']} rows in {totals['segments']} segments "
+        f"({totals['compressed_bytes']:,} bytes, {ratio:.1f}x compression) in {elapsed:.1f}s"
+    )
+
+if __name__ == "__main__":
+    main()
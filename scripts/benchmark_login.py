@@ -0,0 +1,124 @@
+"""
+Login storm benchmark: POST /auth/login under concurrent logins, with
+password verification inline on the event loop (the original path) vs on
+the bounded hashing pool in app/core/security.py.
+
+Runs the app in-process against a scratch SQLite database. One in five
+logins uses a wrong password, so failed-login audit rows are part of the
+load. A probe requests a cheap endpoint the whole time: its latency shows
+how long other requests on the same worker wait behind the hashes.
+
+Usage: python scripts/benchmark_login.py [--logins 40] [--concurrency 20]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+DB_PATH = os.path.join(tempfile.mkdtemp(), "login.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{DB_PATH}"
+
+import httpx
+from sqlalchemy import insert
+from app.main import app
+from app.core import security
+from app.core.audit import audit_writer
+from app.db.session import Base, SessionLocal, async_engine, engine
+from app.models.user import AuditLog, User
+
+USERS = 50
+PASSWORD = "password123"
+
+def seed():
+    Base.metadata.create_all(bind=engine)
+    hashed = security.get_password_hash(PASSWORD) # One hash for everyone: seeding stays fast
+    with SessionLocal() as db:
+        db.execute(insert(User), [
+            {"id": f"user-{i}", "email": f"user{i}@jpm.com", "hashed_password": hashed, "is_active": True}
+            for i in range(USERS)
+        ])
+        db.commit()
+
+async def inline_verify(plain_password, hashed_password):
+    # The original path: argon2 on the event loop
+    return security.verify_password(plain_password, hashed_password)
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else 0.0
+
+async def storm(logins, concurrency):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        login_latency, probe_latency, statuses = [], [], {}
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+
+        async def login(i):
+            wrong = i % 5 == 0
+            payload = {"email": f"user{i % USERS}@jpm.com", "password": "wrong" if wrong else PASSWORD}
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.post("/auth/login", json=payload)
+                login_latency.append(time.perf_counter() - start)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        async def probe():
+            while not done.is_set():
+                start = time.perf_counter()
+                await client.get("/monitoring/audit-writer")
+                probe_latency.append(time.perf_counter() - start)
+                await asyncio.sleep(0.01)
+
+        prober = asyncio.create_task(probe())
+        start = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(logins)))
+        elapsed = time.perf_counter() - start
+        done.set()
+        await prober
+    return elapsed, login_latency, probe_latency, statuses
+
+async def run(name, logins, concurrency):
+    await audit_writer.start()
+    with contextlib.redirect_stdout(io.StringIO()): # The login route logs every step
+        elapsed, login_latency, probe_latency, statuses = await storm(logins, concurrency)
+    await audit_writer.stop()
+    await async_engine.dispose() # Its connections belong to this event loop
+    print(
+        f"{name:<8} logins/s={logins / elapsed:>6.1f}  "
+        f"login p50={percentile(login_latency, 0.5):>7.0f} ms p99={percentile(login_latency, 0.99):>7.0f} ms  "
+        f"probe p50={percentile(probe_latency, 0.5):>6.0f} ms p99={percentile(probe_latency, 0.99):>6.0f} ms  "
+        f"status={statuses}"
+    )
+    return percentile(probe_latency, 0.99)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    seed()
+    print(f"🚀 Login storm: {args.logins} logins, {args.concurrency} concurrent, {security.hash_executor._max_workers} hashing workers")
+
+    pooled = security.verify_password_async
+    security.verify_password_async = inline_verify
+    before = asyncio.run(run("inline", args.logins, args.concurrency))
+    security.verify_password_async = pooled
+    after = asyncio.run(run("pool", args.logins, args.concurrency))
+
+    with SessionLocal() as db:
+        failures = db.query(AuditLog).filter(AuditLog.event_type == "LOGIN_FAILURE").count()
+    expected = 2 * len([i for i in range(args.logins) if i % 5 == 0])
+    print(f"{'✅' if failures == expected else '❌'} failed-login audit rows: {failures}/{expected}")
+    if after:
+        print(f"✅ probe p99 while logging in: {before:.0f} ms -> {after:.0f} ms ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Micro-benchmark of the per-request RBAC check: the original PermissionChecker
+(json.loads of every role's permissions, then a set lookup) vs the compiled
+bitmasks in app/core/rbac.py.
+
+Calls the checkers directly with an in-memory principal (no HTTP, no DB), and
+checks both give the same decisions first.
+
+Usage: python scripts/benchmark_rbac.py [--roles 3] [--permissions 20] [--iterations 200000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import HTTPException
+from app.core.rbac import PermissionChecker, RoleChecker, permission_registry
+from app.models.system import SystemProfile  # noqa: F401 (registers the User.profiles target)
+from app.models.user import Role, User
+
+def baseline_permission_check(user, required_permission):
+    # PermissionChecker.__call__ before the registry
+    all_permissions = set()
+    for role in user.roles:
+        if role.permissions:
+            try:
+                for p in json.loads(role.permissions):
+                    all_permissions.add(p)
+            except:
+                pass
+    return "ALL" in all_permissions or required_permission in all_permissions
+
+def baseline_role_check(user, allowed_roles):
+    user_roles = [r.name for r in user.roles]
+    return any(role in allowed_roles for role in user_roles)
+
+def allowed(checker, user):
+    try:
+        checker(user)
+        return True
+    except HTTPException:
+        return False
+
+def make_user(n_roles, n_permissions):
+    roles = [
+        Role(
+            id=f"role-{i}",
+            name=f"ROLE_{i}",
+            permissions=json.dumps([f"PERM_{i}_{j}" for j in range(n_permissions)]),
+        )
+        for i in range(n_roles)
+    ]
+    return User(id="bench", email="bench@jpm.com", hashed_password="-", is_active=True, roles=roles)
+
+def timed(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e9 # ns per call
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--roles", type=int, default=3)
+    parser.add_argument("--permissions", type=int, default=20)
+    parser.add_argument("--iterations", type=int, default=200000)
+    args = parser.parse_args()
+
+    user = make_user(args.roles, args.permissions)
+    granted = f"PERM_{args.roles - 1}_{args.permissions - 1}"
+    granted_roles = ["ADMIN", f"ROLE_{args.roles - 1}"]
+    cases = [
+        ("permission (granted)", PermissionChecker(granted), lambda: baseline_permission_check(user, granted)),
+        ("permission (denied)", PermissionChecker("APPROVE"), lambda: baseline_permission_check(user, "APPROVE")),
+        ("role (granted)", RoleChecker(granted_roles), lambda: baseline_role_check(user, granted_roles)),
+        ("role (denied)", RoleChecker(["ADMIN"]), lambda: baseline_role_check(user, ["ADMIN"])),
+    ]
+
+    print(f"🚀 RBAC check: {args.roles} roles x {args.permissions} permissions, {args.iterations} iterations")
+    failures = 0
+    for name, checker, baseline in cases:
+        if allowed(checker, user) != baseline():
+            print(f"❌ {name}: bitset and baseline disagree")
+            failures += 1
+            continue
+        # Decisions only: a denied checker raises, which would dominate the timing
+        if isinstance(checker, PermissionChecker):
+            decide = lambda: bool(permission_registry.masks(user)[1] & checker.required_mask)
+        else:
+            decide = lambda: bool(permission_registry.masks(user)[0] & checker.allowed_mask)
+        before = timed(baseline, args.iterations)
+        after = timed(decide, args.iterations)
+        print(f"✅ {name:<22} baseline={before:>8.0f} ns  bitset={after:>8.0f} ns  ({before / after:.1f}x)")
+
+    # An edited role recompiles on its next check (the commit hook calls invalidate())
+    user.roles[0].permissions = json.dumps(["ALL"])
+    permission_registry.invalidate({user.roles[0].id})
+    if not allowed(PermissionChecker("APPROVE"), user):
+        print("❌ edited role was not recompiled")
+        failures += 1
+    else:
+        print("✅ edited role recompiled (ALL wildcard)")
+    permission_registry.invalidate()
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Concurrent write/read throughput on SQLite: default connection setup vs the
+tuned profile in app/db/session.py (WAL, synchronous=NORMAL, busy_timeout,
+cache/mmap, sized pools, read-only pool).
+
+Each profile runs on its own fresh database file (journal_mode is persisted in
+the file). Writers insert one AuditLog row per transaction, like the
+middleware and governance paths; readers page the latest audit logs.
+
+Usage: python scripts/benchmark_sqlite_profile.py [--seconds 5] [--writers 8] [--readers 8]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+sys.path.append(os.getcwd())
+
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+from app.core.config import settings
+from app.db.session import configure_engine, engine_options
+from app.models.system import SystemProfile  # noqa: F401 (registers the User.profiles target)
+from app.models.user import AuditLog
+
+SEED_ROWS = 20000
+
+def baseline_engines(url):
+    # The original setup: one engine, default pool, no pragmas
+    engine = create_engine(url, connect_args={"check_same_thread": False})
+    return engine, engine
+
+def tuned_engines(url):
+    writer = create_engine(url, **engine_options(url, settings.DB_POOL_SIZE))
+    reader = create_engine(url, **engine_options(url, settings.DB_READ_POOL_SIZE, read_only=True))
+    configure_engine(writer)
+    configure_engine(reader, read_only=True)
+    return writer, reader
+
+def audit_row():
+    return {
+        "id": str(uuid.uuid4()),
+        "event_type": "API_REQUEST",
+        "actor_id": "benchmark",
+        "resource": "/transactions",
+        "outcome": "200",
+        "risk_score": 0,
+        "timestamp": datetime.utcnow(),
+    }
+
+def run(name, make_engines, seconds, writers, readers):
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    url = f"sqlite:///{path}"
+    writer, reader = make_engines(url)
+    AuditLog.__table__.create(bind=writer)
+    with writer.begin() as conn:
+        conn.execute(insert(AuditLog), [audit_row() for _ in range(SEED_ROWS)])
+
+    stats = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+    stop = threading.Event()
+
+    def count(key):
+        with lock:
+            stats[key] += 1
+
+    def write_loop():
+        while not stop.is_set():
+            try:
+                with writer.begin() as conn:
+                    conn.execute(insert(AuditLog), audit_row())
+                count("writes")
+            except OperationalError:
+                count("locked") # "database is locked"
+
+    def read_loop():
+        query = select(AuditLog).order_by(AuditLog.timestamp.desc()).limit(50)
+        while not stop.is_set():
+            try:
+                with reader.connect() as conn:
+                    conn.execute(query).all()
+                count("reads")
+            except OperationalError:
+                count("locked")
+
+    threads = [threading.Thread(target=write_loop) for _ in range(writers)]
+    threads += [threading.Thread(target=read_loop) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+
+    with writer.connect() as conn:
+        journal = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+    writer.dispose()
+    reader.dispose()
+
+    print(
+        f"{name:<9} journal={journal:<8} "
+        f"writes/s={stats['writes'] / seconds:>9.1f}  reads/s={stats['reads'] / seconds:>9.1f}  "
+        f"locked errors={stats['locked']}"
+    )
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--readers", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"🚀 SQLite profile benchmark: {args.writers} writers, {args.readers} readers, {args.seconds}s each")
+    before = run("baseline", baseline_engines, args.seconds, args.writers, args.readers)
+    after = run("tuned", tuned_engines, args.seconds, args.writers, args.readers)
+
+    for key in ("writes", "reads"):
+        if before[key]:
+            print(f"✅ {key}: {after[key] / before[key]:.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,9 @@ from datetime import datetime
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 import pandas as pd
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Config
 DROP_ZONE = 'data/drop_zone'
@@ -101,61 +104,42 @@ class IngestionHandler(FileSystemEventHandler):
         
         # 5.1 PERSIST TO DATABASE (Fix for Empty Dashboard)
         try:
-            from sqlalchemy import create_engine, text
-            from sqlalchemy.orm import sessionmaker
-            # Direct connection for script
-            # Mismatch Fix: App uses resonant.db, not sql_app.db
-            SQLALCHEMY_DATABASE_URL = "sqlite:///./resonant.db"
-            engine = create_engine(SQLALCHEMY_DATABASE_URL)
-            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-            db = SessionLocal()
+            import numpy as np
+            from app.db.bulk import upsert_transactions
+            from app.db.session import SessionLocal
             
             print("💾 PERSISTING BATCH TO DB...")
             
-            # Prepare Batch Insert
-            # We map DF columns to DB columns. 
-            # Schema: id, amount, currency, status, risk_score, timestamp, source_system, reference, counterparty
-            
+            # Map DF columns to Transaction columns, whole file at once
+            # Map Script Status to DB/UI Schema ("MATCH" -> "AUTO_RECONCILED")
+            status = results.replace("MATCH", "AUTO_RECONCILED")
+            matched = (status == "AUTO_RECONCILED").to_numpy()
             current_time = datetime.now()
+            n = len(df)
             
-            # Create list of dicts for bulk insert
-            db_records = []
-            for idx, row in df.iterrows():
-                raw_status = results[idx]
-                # Map Script Status to DB/UI Schema ("MATCH" -> "AUTO_RECONCILED")
-                status = "AUTO_RECONCILED" if raw_status == "MATCH" else raw_status
-                
-                db_records.append({
-                    "id": f"TXN-{row.get('txn_id', str(uuid.uuid4())[:8])}",
-                    "amount": float(row.get('amount', 0)),
-                    "currency": row.get('currency', 'USD'),
-                    "status": status,
-                    "source": row.get('source_system', 'SWIFT'), # Mapped to 'source'
-                    "created_at": current_time,
-                    "updated_at": current_time,              # REQUIRED
-                    "value_date": current_time,
-                    # Dynamic Risk: 60-99 for Exceptions, 0-20 for Matches
-                    "risk_score": random.randint(60, 99) if status != 'AUTO_RECONCILED' else random.randint(0, 10),
-                    # Dynamic Confidence: 95-100 for Matches, 10-80 for Exceptions (Scale 0-100 for UI)
-                    "match_confidence": random.uniform(95.0, 100.0) if status == 'AUTO_RECONCILED' else random.uniform(10.0, 80.0), 
-                    "counterparty": row.get('counterparty_id', 'UNKNOWN')
-                })
-                
-                if len(db_records) >= 1000:
-                    break 
-            
-            for record in db_records:
-                # Fixed Column Names & Added Missing NotNull Fields
-                stmt = text("""
-                    INSERT OR REPLACE INTO transactions 
-                    (id, amount, currency, status, source, created_at, updated_at, value_date, risk_score, match_confidence, counterparty)
-                    VALUES (:id, :amount, :currency, :status, :source, :created_at, :updated_at, :value_date, :risk_score, :match_confidence, :counterparty)
-                """)
-                db.execute(stmt, record)
+            batch = pd.DataFrame({
+                "id": "TXN-" + df["txn_id"].astype(str) if "txn_id" in df else None,
+                "amount": df["amount"].astype(float) if "amount" in df else 0.0,
+                "currency": df["currency"] if "currency" in df else "USD",
+                "status": status,
+                "source": df["source_system"] if "source_system" in df else "SWIFT", # Mapped to 'source'
+                "created_at": current_time,
+                "updated_at": current_time,
+                "value_date": current_time,
+                # Dynamic Risk: 60-99 for Exceptions, 0-10 for Matches
+                "risk_score": np.where(matched, np.random.randint(0, 11, n), np.random.randint(60, 100, n)),
+                # Dynamic Confidence: 95-100 for Matches, 10-80 for Exceptions (Scale 0-100 for UI)
+                "match_confidence": np.where(matched, np.random.uniform(95.0, 100.0, n), np.random.uniform(10.0, 80.0, n)),
+                "counterparty": df["counterparty_id"] if "counterparty_id" in df else "UNKNOWN",
+            })
             
-            db.commit()
-            print(f"✅ SAVED {len(db_records)} RECORDS TO DB")
-            db.close()
+            # Chunked bulk upsert; also keeps the dashboard summary tables in step
+            started = time.perf_counter()
+            with SessionLocal() as db:
+                saved = upsert_transactions(db, batch)
+                db.commit()
+            elapsed = time.perf_counter() - started
+            print(f"✅ SAVED {saved} RECORDS TO DB ({saved / elapsed:,.0f} rows/s)")
             
         except Exception as e:
             print(f"❌ DB PERSIST FAILED: {str(e)}")
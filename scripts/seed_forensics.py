@@ -2,8 +2,6 @@ import sys
 import os
 import random
 import uuid
-import json
-import hashlib
 import numpy as np
 from datetime import datetime, timedelta
 
@@ -13,26 +11,27 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from sqlalchemy.orm import Session
 from app.db.session import SessionLocal, engine, Base
 from app.models.transaction import Transaction
-from app.models.ledger import ForensicLedger
+from app.models.ledger import ForensicLedger, LedgerBlock, LedgerBlockEntry
+from app.core.ledger import ledger_appender
 # Import User model to ensure it's registered in Base.metadata for relationships
-from app.models.user import User 
+from app.models.user import User
+from app.models.system import SystemProfile  # noqa: F401 (registers the User.profiles target)
 
 # Create Tables if not exist
 Base.metadata.create_all(bind=engine)
 
-def calculate_hash(data: str, prev_hash: str = "") -> str:
-    raw = f"{data}{prev_hash}"
-    return hashlib.sha256(raw.encode()).hexdigest()
-
 def seed_forensics():
     db: Session = SessionLocal()
     print("Beginning Forensic Ledger Seeding...")
 
-    # Clear old data (optional)
+    # Clear old data (optional); sealed blocks go with the ledger they seal
     try:
+        db.query(LedgerBlockEntry).delete()
+        db.query(LedgerBlock).delete()
         db.query(ForensicLedger).delete()
         db.query(Transaction).delete()
         db.commit()
+        ledger_appender.clear()
     except Exception as e:
         db.rollback()
         print(f"Warning clearing tables: {e}")
@@ -45,6 +44,7 @@ def seed_forensics():
     checkers = ["S. Smith (Gov)", "L. James (Risk)", "D. Krovac (Admin)", "E. Mtume (Gov)"]
 
     # Generate 50 Transactions with full history
+    events = []
     for i in range(50):
         txn_id = f"TXN-{random.randint(10000, 99999)}"
         cpty = random.choice(counterparties)
@@ -67,102 +67,43 @@ def seed_forensics():
         )
         db.add(txn)
         
-        # Chain State
-        prev_hash = "0" * 64
+        # Stage events; the appender chains the hashes (SHA-256 of payload + previous hash)
         base_time = datetime.now() - timedelta(minutes=random.randint(10, 5000))
-        
-        # 1. INGESTION
-        payload_1 = json.dumps({"raw_msg": f"MT103 {{20:{txn_id}}} {{32A:{amount}USD}}"})
-        curr_hash = calculate_hash(payload_1, prev_hash)
-        
-        l1 = ForensicLedger(
-            txn_id=txn_id,
-            event_type="INGESTION",
-            stage="LAYER_1_INGEST",
-            actor="GATEWAY_SWIFT",
-            payload_hash=curr_hash,
-            previous_hash=prev_hash,
-            metadata_json=payload_1,
-            timestamp=base_time
-        )
-        db.add(l1)
-        prev_hash = curr_hash
-        base_time += timedelta(milliseconds=random.randint(50, 200))
-
-        # 2. NORMALIZATION
-        payload_2 = json.dumps({"schema_v": "2.1", "std_fields": {"amt": amount, "ccy": "USD"}})
-        curr_hash = calculate_hash(payload_2, prev_hash)
-        
-        l2 = ForensicLedger(
-            txn_id=txn_id,
-            event_type="NORMALIZATION",
-            stage="LAYER_2_PREP",
-            actor="SCHEMA_VALIDATOR",
-            payload_hash=curr_hash,
-            previous_hash=prev_hash,
-            metadata_json=payload_2,
-            timestamp=base_time
-        )
-        db.add(l2)
-        prev_hash = curr_hash
-        base_time += timedelta(milliseconds=random.randint(100, 500))
-
-        # 3. ML SCORING
-        payload_3 = json.dumps({
-            "model": "XGBoost_v4.2", 
-            "features": {"amt_diff": 0, "date_diff": 0},
-            "score": 0.98
-        })
-        curr_hash = calculate_hash(payload_3, prev_hash)
-        
-        l3 = ForensicLedger(
-            txn_id=txn_id,
-            event_type="ML_SCORING",
-            stage="LAYER_3_DECISION",
-            actor="MODEL_INFERENCE_ENGINE",
-            payload_hash=curr_hash,
-            previous_hash=prev_hash,
-            metadata_json=payload_3,
-            timestamp=base_time
-        )
-        db.add(l3)
-        prev_hash = curr_hash
-        base_time += timedelta(minutes=random.randint(1, 5))
-
-        # 4. OPS REVIEW (MAKER)
-        payload_4 = json.dumps({"review": "VERIFIED_VALID", "role": "MAKER"})
-        curr_hash = calculate_hash(payload_4, prev_hash)
-        
-        l4 = ForensicLedger(
-            txn_id=txn_id,
-            event_type="OPS_REVIEW",
-            stage="LAYER_4_REVIEW",
-            actor=maker, # Dynamic Maker
-            payload_hash=curr_hash,
-            previous_hash=prev_hash,
-            metadata_json=payload_4,
-            timestamp=base_time
-        )
-        db.add(l4)
-        prev_hash = curr_hash
-        base_time += timedelta(minutes=random.randint(10, 60))
-
-        # 5. FINAL GOVERNANCE (CHECKER)
-        payload_5 = json.dumps({"decision": "APPROVE", "role": "CHECKER"})
-        curr_hash = calculate_hash(payload_5, prev_hash)
-        
-        l5 = ForensicLedger(
-            txn_id=txn_id,
-            event_type="FINAL_DECISION",
-            stage="LAYER_5_GOVERNANCE",
-            actor=checker, # Dynamic Checker
-            payload_hash=curr_hash,
-            previous_hash=prev_hash,
-            metadata_json=payload_5,
-            timestamp=base_time
-        )
-        db.add(l5)
+        stages = [
+            # 1. INGESTION
+            ("INGESTION", "LAYER_1_INGEST", "GATEWAY_SWIFT",
+             {"raw_msg": f"MT103 {{20:{txn_id}}} {{32A:{amount}USD}}"},
+             timedelta(milliseconds=random.randint(50, 200))),
+            # 2. NORMALIZATION
+            ("NORMALIZATION", "LAYER_2_PREP", "SCHEMA_VALIDATOR",
+             {"schema_v": "2.1", "std_fields": {"amt": amount, "ccy": "USD"}},
+             timedelta(milliseconds=random.randint(100, 500))),
+            # 3. ML SCORING
+            ("ML_SCORING", "LAYER_3_DECISION", "MODEL_INFERENCE_ENGINE",
+             {"model": "XGBoost_v4.2", "features": {"amt_diff": 0, "date_diff": 0}, "score": 0.98},
+             timedelta(minutes=random.randint(1, 5))),
+            # 4. OPS REVIEW (MAKER)
+            ("OPS_REVIEW", "LAYER_4_REVIEW", maker, # Dynamic Maker
+             {"review": "VERIFIED_VALID", "role": "MAKER"},
+             timedelta(minutes=random.randint(10, 60))),
+            # 5. FINAL GOVERNANCE (CHECKER)
+            ("FINAL_DECISION", "LAYER_5_GOVERNANCE", checker, # Dynamic Checker
+             {"decision": "APPROVE", "role": "CHECKER"},
+             timedelta(0)),
+        ]
+        for event_type, stage, actor, payload, gap in stages:
+            events.append({
+                "txn_id": txn_id,
+                "event_type": event_type,
+                "stage": stage,
+                "actor": actor,
+                "payload": payload,
+                "timestamp": base_time,
+            })
+            base_time += gap
 
+    # One insert for every chain (the table was just cleared: all chains are new)
+    ledger_appender.append(db, events, new_chains=True)
     db.commit()
     print(f"✅ Seeded 50 Transactions with Forensic Ledger Chains.")
 
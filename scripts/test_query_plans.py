@@ -0,0 +1,130 @@
+"""
+Query-plan regression check for the hot read endpoints.
+
+Calls each endpoint against a scratch SQLite database, captures every SELECT
+it sends, and runs EXPLAIN QUERY PLAN on it with the same parameters. Fails
+if any statement reads `transactions`, `audit_logs` or `forensic_ledger` with
+a full table scan (a plan step "SCAN <table>" without an index).
+
+Usage: python scripts/test_query_plans.py
+       python -m pytest scripts/test_query_plans.py
+"""
+import os
+import sys
+import sqlite3
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CHECKED_TABLES = ("transactions", "audit_logs", "forensic_ledger")
+
+ENDPOINTS = [
+    "/transactions",
+    "/transactions?status=EXCEPTION",
+    "/transactions?status=EXCEPTION&min_risk=50",
+    "/transactions/TXN-PLAN-1/details",
+    "/governance/tickets",
+    "/governance/tickets?status=EXCEPTION&min_risk=80",
+    "/governance/tickets/TXN-PLAN-1/history",
+    "/audit",
+    "/audit?actor_id=admin@jpm.com",
+    "/admin/audit-logs",
+    "/admin/audit/trace/TXN-PLAN-1",
+    "/admin/dashboard/stats",
+]
+
+def seed():
+    from app.db.session import Base, SessionLocal, engine
+    from app.db.stats import ensure_summary_tables
+    from app.models.ledger import ForensicLedger
+    from app.models.transaction import Transaction
+    from app.models.user import AuditLog
+
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        ensure_summary_tables(db)
+        db.add_all([
+            Transaction(id=f"TXN-PLAN-{i}", source="SWIFT" if i % 2 else "LEDGER", amount=100.0 + i,
+                        currency="USD", status="EXCEPTION" if i % 3 else "OPS_REVIEW", risk_score=i % 100)
+            for i in range(1, 200)
+        ])
+        db.add_all([
+            AuditLog(event_type="API_REQUEST", actor_id="admin@jpm.com", resource="TXN-PLAN-1", outcome="200", risk_score=0)
+            for _ in range(50)
+        ])
+        db.add(ForensicLedger(txn_id="TXN-PLAN-1", event_type="INGESTION", stage="Layer 1", actor="INGEST_WATCHER", payload_hash="0" * 64))
+        db.commit()
+
+def capture():
+    from sqlalchemy import event
+    from app.db.session import async_engine, async_read_engine, engine, read_engine
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    for e in (engine, read_engine, async_engine.sync_engine, async_read_engine.sync_engine):
+        event.listen(e, "before_cursor_execute", record)
+    return statements
+
+def full_scans(connection, statement, parameters):
+    plan = connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+    steps = [row[-1] for row in plan]
+    scans = []
+    for step in steps:
+        words = step.split()
+        # "SCAN transactions" is a table scan; "SCAN transactions USING INDEX ..." walks an index
+        if words[:1] == ["SCAN"] and words[1:2] and words[1] in CHECKED_TABLES and "INDEX" not in step:
+            scans.append(step)
+    return scans, steps
+
+def check_query_plans():
+    """
+    Returns the number of failing endpoints/statements. App modules are imported
+    here, after DATABASE_URL points at the scratch database, not at module import.
+    """
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.db.session import engine
+
+    print("Testing query plans of hot endpoints...")
+    seed()
+    statements = capture()
+    client = TestClient(app) # No startup: background workers would add their own queries
+    connection = sqlite3.connect(engine.url.database)
+
+    failures = 0
+    for path in ENDPOINTS:
+        statements.clear()
+        response = client.get(path)
+        if response.status_code != 200:
+            print(f"❌ {path}: HTTP {response.status_code}")
+            failures += 1
+            continue
+        for statement, parameters in statements:
+            if not any(table in statement for table in CHECKED_TABLES):
+                continue
+            scans, steps = full_scans(connection, statement, parameters)
+            if scans:
+                failures += 1
+                print(f"❌ {path}: full scan\n   {' '.join(statement.split())}\n   plan: {steps}")
+            else:
+                print(f"✅ {path}: {'; '.join(steps)}")
+
+    connection.close()
+    if failures:
+        print(f"❌ {failures} statement(s) without an index")
+    else:
+        print("✅ Every hot statement uses an index")
+    return failures
+
+def test_query_plans(tmp_path, monkeypatch):
+    # pytest: scratch database, DATABASE_URL set for the duration of the test only
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'plans.db'}")
+    assert check_query_plans() == 0
+
+if __name__ == "__main__":
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'plans.db')}"
+    if check_query_plans():
+        sys.exit(1)
@@ -1,6 +1,12 @@
+import json
 import logging
+import os
+import threading
+import uuid
 import numpy as np
-from typing import Dict, List, Any
+from datetime import datetime
+from typing import Dict, List, Any, Optional, Tuple
+from src.features import FeatureEngineer
 from src.ml_models import MatchClassifier
 
 logger = logging.getLogger(__name__)
@@ -95,19 +101,209 @@ class DriftMonitor:
 
 class ActiveLearner:
     """
-    Simulates Feedback Loop.
-    Captures 'Ops Reviews' and prepares them for retraining.
+    Feedback Loop with Online Learning.
+    Persists 'Ops Reviews' to a JSONL feedback store and folds labelled pairs into
+    the match classifier incrementally (warm-start tree addition) on a background
+    worker, so the model improves without full retrains over the whole history.
+    Folded batches are marked in the store; feedback not folded yet is reloaded
+    on startup.
     """
-    def __init__(self):
-        self.feedback_buffer = []
+    LABELS = {'MATCH': 1, '1': 1, 'NO_MATCH': 0, '0': 0}
+
+    def __init__(self, classifier: Optional[MatchClassifier] = None,
+                 store_path: str = "data/feedback/active_learning.jsonl",
+                 batch_size: int = 10, flush_interval: float = 30.0,
+                 trees_per_batch: int = 5, max_estimators: int = 200,
+                 max_pending: int = 1000, publish: bool = True):
+        self.classifier = classifier
+        self.store_path = store_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.trees_per_batch = trees_per_batch
+        self.max_estimators = max_estimators
+        self.max_pending = max_pending
+        self.publish = publish
+
+        self.feature_engineer = FeatureEngineer()
+        # Labelled, not yet folded: (feedback id, features, label)
+        self.feedback_buffer: List[Tuple[str, List[float], int]] = []
+        self.batches_folded = 0
+
+        self._lock = threading.Lock()
+        self._store_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._worker: Optional[threading.Thread] = None
+
+        self._reload()
 
     def submit_feedback(self, event_pair: Dict, human_decision: str):
         """
         Human reviews a 'Review Required' item and marks it MATCH or NO_MATCH.
+        event_pair carries precomputed 'features', or the compared pair as 'a'
+        and 'b', or the reviewed 'event' with its 'match_candidate'.
+        Undecided items (e.g. 'PENDING') are not training labels and are ignored.
         """
-        label = 1 if human_decision == 'MATCH' else 0
-        self.feedback_buffer.append((event_pair, label))
-        
-        if len(self.feedback_buffer) >= 10:
-            logger.info("ActiveLearner: Feedback threshold reached. Triggering Model Retraining via MLOps Pipeline...")
-            self.feedback_buffer = [] # Flush
+        label = self.LABELS.get(str(human_decision))
+        if label is None:
+            return
+
+        features = self._features(event_pair)
+        if features is None:
+            logger.warning("ActiveLearner: Feedback without features or a comparable pair, discarded.")
+            return
+
+        features = [float(f) for f in features]
+        feedback_id = uuid.uuid4().hex
+        self._persist({
+            "id": feedback_id,
+            "timestamp": datetime.utcnow().isoformat(),
+            "features": features,
+            "label": label,
+            "decision": str(human_decision)
+        })
+
+        with self._lock:
+            self.feedback_buffer.append((feedback_id, features, label))
+            if len(self.feedback_buffer) > self.max_pending:
+                # Worker is behind: keep the most recent feedback (the rest is reloaded on restart)
+                self.feedback_buffer = self.feedback_buffer[-self.max_pending:]
+            ready = len(self.feedback_buffer) >= self.batch_size
+
+        self._ensure_worker()
+        if ready:
+            self._wakeup.set()
+
+    def flush(self):
+        """
+        Folds all pending feedback synchronously (e.g. at the end of a batch run).
+        """
+        while self._fold_next(force=True):
+            pass
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        if self._worker:
+            self._worker.join(timeout=5)
+        self.flush()
+
+    # --- Internals ---
+
+    def _features(self, event_pair: Dict) -> Optional[List[float]]:
+        if event_pair.get('features') is not None:
+            return event_pair['features']
+        if event_pair.get('a') and event_pair.get('b'):
+            return self.feature_engineer.compute_features(event_pair['a'], event_pair['b'])
+        event = event_pair.get('event') or {}
+        if isinstance(event.get('features'), (list, tuple)):
+            return event['features']
+        if event.get('match_candidate'):
+            return self.feature_engineer.compute_features(event, event['match_candidate'])
+        return None
+
+    def _persist(self, record: Dict):
+        with self._store_lock:
+            os.makedirs(os.path.dirname(self.store_path) or ".", exist_ok=True)
+            with open(self.store_path, 'a') as f:
+                f.write(json.dumps(record) + "\n")
+
+    def _reload(self):
+        """
+        Refills the buffer with stored feedback that no fold marker covers.
+        """
+        if not os.path.exists(self.store_path):
+            return
+        pending: Dict[str, Tuple[str, List[float], int]] = {}
+        folded = set()
+        with open(self.store_path) as f:
+            for lineno, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if "folded" in record:
+                    folded.update(record["folded"])
+                elif "features" in record and "label" in record:
+                    feedback_id = record.get("id") or f"line-{lineno}"
+                    pending[feedback_id] = (feedback_id, record["features"], int(record["label"]))
+        self.feedback_buffer = [row for key, row in pending.items() if key not in folded][-self.max_pending:]
+        if self.feedback_buffer:
+            logger.info(f"ActiveLearner: Reloaded {len(self.feedback_buffer)} unfolded feedback rows.")
+
+    def _ensure_worker(self):
+        if self.classifier is None or (self._worker and self._worker.is_alive()):
+            return
+        self._worker = threading.Thread(target=self._run, name="active-learner", daemon=True)
+        self._worker.start()
+
+    def _run(self):
+        while not self._stopped:
+            triggered = self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            # Full batches on trigger; partial ones once per interval
+            while self._fold_next(force=not triggered):
+                pass
+
+    def _take_batch(self, force: bool) -> Optional[List[Tuple[str, List[float], int]]]:
+        """
+        Removes the next foldable batch from the buffer (caller holds the lock).
+        Tree learners need both classes in a batch: a single-class head (e.g.
+        all MATCH) takes the first row of the other class from further back,
+        and rows that cannot be paired yet stay buffered for a later batch.
+        """
+        pending = self.feedback_buffer
+        if not pending or (len(pending) < self.batch_size and not force):
+            return None
+        size = min(self.batch_size, len(pending))
+        batch = pending[:size]
+        if len({label for _, _, label in batch}) > 1:
+            self.feedback_buffer = pending[size:]
+            return batch
+        other = next((i for i in range(size, len(pending)) if pending[i][2] != batch[0][2]), None)
+        if other is None:
+            return None
+        self.feedback_buffer = pending[size - 1:other] + pending[other + 1:]
+        return batch[:size - 1] + [pending[other]]
+
+    def _fold_next(self, force: bool = False) -> bool:
+        """
+        Folds at most one batch. Returns True if a batch was folded. A batch
+        that cannot be folded (model frozen, failed update) goes back to the
+        head of the buffer.
+        """
+        if self.classifier is None:
+            return False
+        if self._is_frozen():
+            logger.info("ActiveLearner: Model is frozen. Feedback retained, not folded.")
+            return False
+
+        with self._lock:
+            batch = self._take_batch(force)
+        if batch is None:
+            return False
+
+        X = np.array([f for _, f, _ in batch])
+        y = [label for _, _, label in batch]
+        try:
+            self.classifier.partial_fit(X, y, self.trees_per_batch, self.max_estimators)
+        except Exception as e:
+            logger.error(f"ActiveLearner: Incremental update failed, batch retained: {e}")
+            with self._lock:
+                self.feedback_buffer = batch + self.feedback_buffer
+            return False
+
+        self.batches_folded += 1
+        self._persist({"timestamp": datetime.utcnow().isoformat(), "folded": [key for key, _, _ in batch]})
+        if self.publish:
+            version = f"v{datetime.utcnow():%Y%m%d%H%M%S}-fb{self.batches_folded}"
+            self.classifier.register(version, {"base_version": self.classifier.version, "feedback_rows": len(y)})
+        return True
+
+    def _is_frozen(self) -> bool:
+        try:
+            from app.ml.registry import registry
+            info = registry.describe(self.classifier.REGISTRY_NAME)
+        except ImportError:
+            return False
+        return bool(info and info["frozen"])
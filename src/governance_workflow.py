@@ -57,9 +57,12 @@ class ReviewConsole:
         self.workflow = ApprovalWorkflow(audit_logger)
 
     def override_decision(self, event: Dict, original_decision: str, new_decision: str, 
-                          reason_code: str, user_id: str, role: str) -> Dict:
+                          reason_code: str, user_id: str, role: str,
+                          match_candidate: Optional[Dict] = None) -> Dict:
         """
         Human overrides a machine decision.
+        match_candidate: the event it was compared against, so the override
+        becomes a labelled pair for the ActiveLearner.
         """
         logger.info(f"ReviewConsole: User {user_id} ({role}) overriding {original_decision} -> {new_decision}")
         
@@ -82,6 +85,9 @@ class ReviewConsole:
         # 3. Active Learning Feedback
         # If human says it's a MATCH (when ML said Exception), feed positive label
         label = 1 if new_decision in ['AUTO_RECONCILED', 'MANUAL_MATCH'] else 0
-        self.active_learner.submit_feedback({'event': event}, str(label))
+        feedback = {'event': event}
+        if match_candidate is not None:
+            feedback.update(a=event, b=match_candidate)
+        self.active_learner.submit_feedback(feedback, str(label))
         
         return {'status': 'COMPLETED', 'final_decision': new_decision}
@@ -5,6 +5,7 @@ import logging
 import sys
 import os
 import pandas as pd
+from datetime import datetime
 
 # Ensure src is in path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -26,6 +27,76 @@ def load_config(config_path: str):
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
+def train_models(run_id, audit, data_loader, file_a, file_b, classifier, anomaly_detector):
+    """
+    Fits the supervised classifier and anomaly detector on a small slice of
+    the input files and registers both as a new version.
+    """
+    from src.features import FeatureEngineer
+
+    # --- ML Training Phase (Simulated) ---
+    # Only runs when the registry has no trained version yet.
+    # We'll use the first 20 records of the input files as "Known History" for training.
+    audit.log_event(run_id, "ML_TRAINING", "START", "Training Supervised Models")
+    
+    # Load data for training
+    df_train_a = data_loader.load_file(file_a, "SOURCE_A").head(50)
+    df_train_b = data_loader.load_file(file_b, "SOURCE_B").head(50)
+    
+    # Create synthetic positive/negative pairs for training
+    # Positives: Exact matches (assuming row i matches row i for this synthetic data, or just exact amounts)
+    # Negatives: Random pairs
+    train_features = []
+    train_labels = []
+    fe = FeatureEngineer()
+    
+    # Positives (Naive assumption for this demo data that it is aligned, or use exact logic)
+    # Actually, let's just find exact matches to use as positives
+    exact_pairs = []
+    for _, ra in df_train_a.iterrows():
+        # Find matching b by id
+        matches = df_train_b[df_train_b['txn_ref_id'] == ra['txn_ref_id']]
+        for _, rb in matches.iterrows():
+            exact_pairs.append((ra.to_dict(), rb.to_dict()))
+            
+    # Generate Features for Positives
+    for a, b in exact_pairs:
+        train_features.append(fe.compute_features(a, b))
+        train_labels.append(1) # Match
+        
+    # Generate Negatives (Mismatch)
+    # Mix simple mismatches
+    import random
+    for _ in range(len(exact_pairs)):
+        a = df_train_a.sample(1).iloc[0].to_dict()
+        b = df_train_b.sample(1).iloc[0].to_dict()
+        if a['txn_ref_id'] != b['txn_ref_id']:
+            train_features.append(fe.compute_features(a, b))
+            train_labels.append(0) # No Match
+    
+    # Train Classifier
+    if train_features:
+        classifier.train(pd.DataFrame(train_features), train_labels)
+        
+    # Train Anomaly Detector (Unsupervised on valid matches)
+    # We use the 'positives' features for this
+    if train_features:
+         # Convert list of lists to DF
+         # We need features expected by AnomalyDetector (currently just 'log_amount' in previous impl, 
+         # but let's check ml_models.py AnomalyDetector logic.
+         # It expects a DataFrame with 'amount' column to extract features.
+         # So we pass the raw DataFrame of matches.
+         # We can construct a DF from the matching pairs.
+         matched_df = pd.DataFrame([p[0] for p in exact_pairs])
+         anomaly_detector.train(matched_df)
+
+    # Register so subsequent runs skip training
+    version = f"v{datetime.utcnow():%Y%m%d%H%M%S}"
+    classifier.register(version, {"training_rows": len(train_features)})
+    anomaly_detector.register(version, {"training_rows": len(exact_pairs)})
+
+    audit.log_event(run_id, "ML_TRAINING", "COMPLETE", "Models Trained Successfully", {"version": version})
+
 def main():
     parser = argparse.ArgumentParser(description="Enterprise Reconciliation Platform")
     parser.add_argument('--config', default='config/settings.yaml', help='Path to config file')
@@ -56,65 +127,16 @@ def main():
         from src.ml_models import MatchClassifier, AnomalyDetector
         from src.features import FeatureEngineer
         
-        # --- ML Training Phase (Simulated) ---
-        # In a real system, we load a pre-trained model. Here we train on the fly using a "Training Set".
-        # We'll use the first 20 records of the input files as "Known History" for training.
-        audit.log_event(run_id, "ML_TRAINING", "START", "Training Supervised Models")
-        
-        # Load data for training
-        df_train_a = data_loader.load_file(file_a, "SOURCE_A").head(50)
-        df_train_b = data_loader.load_file(file_b, "SOURCE_B").head(50)
-        
-        # Create synthetic positive/negative pairs for training
-        # Positives: Exact matches (assuming row i matches row i for this synthetic data, or just exact amounts)
-        # Negatives: Random pairs
-        train_features = []
-        train_labels = []
-        fe = FeatureEngineer()
-        
-        # Positives (Naive assumption for this demo data that it is aligned, or use exact logic)
-        # Actually, let's just find exact matches to use as positives
-        exact_pairs = []
-        for _, ra in df_train_a.iterrows():
-            # Find matching b by id
-            matches = df_train_b[df_train_b['txn_ref_id'] == ra['txn_ref_id']]
-            for _, rb in matches.iterrows():
-                exact_pairs.append((ra.to_dict(), rb.to_dict()))
-                
-        # Generate Features for Positives
-        for a, b in exact_pairs:
-            train_features.append(fe.compute_features(a, b))
-            train_labels.append(1) # Match
-            
-        # Generate Negatives (Mismatch)
-        # Mix simple mismatches
-        import random
-        for _ in range(len(exact_pairs)):
-            a = df_train_a.sample(1).iloc[0].to_dict()
-            b = df_train_b.sample(1).iloc[0].to_dict()
-            if a['txn_ref_id'] != b['txn_ref_id']:
-                train_features.append(fe.compute_features(a, b))
-                train_labels.append(0) # No Match
-        
-        # Train Classifier
+        # --- ML Model Phase ---
+        # Reuse the active registered versions; only train (and register) when none exist.
         classifier = MatchClassifier()
-        if train_features:
-            classifier.train(pd.DataFrame(train_features), train_labels)
-            
-        # Train Anomaly Detector (Unsupervised on valid matches)
-        # We use the 'positives' features for this
         anomaly_detector = AnomalyDetector()
-        if train_features:
-             # Convert list of lists to DF
-             # We need features expected by AnomalyDetector (currently just 'log_amount' in previous impl, 
-             # but let's check ml_models.py AnomalyDetector logic.
-             # It expects a DataFrame with 'amount' column to extract features.
-             # So we pass the raw DataFrame of matches.
-             # We can construct a DF from the matching pairs.
-             matched_df = pd.DataFrame([p[0] for p in exact_pairs])
-             anomaly_detector.train(matched_df)
-
-        audit.log_event(run_id, "ML_TRAINING", "COMPLETE", "Models Trained Successfully")
+        
+        if classifier.load_registered() and anomaly_detector.load_registered():
+            audit.log_event(run_id, "ML_TRAINING", "SKIPPED", "Loaded registered models",
+                            {"classifier": classifier.version, "anomaly_detector": anomaly_detector.version})
+        else:
+            train_models(run_id, audit, data_loader, file_a, file_b, classifier, anomaly_detector)
 
         # --- Real-Time Execution ---
         
@@ -134,6 +156,9 @@ def main():
 
         audit.log_event(run_id, "ENGINE", "COMPLETE", f"Stream Finished. Total Events: {event_count}")
         
+        # Fold any outstanding review feedback into the classifier before reporting
+        rt_engine.decision_engine.active_learner.stop()
+        
         # 4. Generate Reports (Snapshot of Final State)
         matches_df = pd.DataFrame(rt_engine.matches)
         
@@ -1,3 +1,4 @@
+import copy
 import pandas as pd
 import numpy as np
 from sklearn.ensemble import IsolationForest, RandomForestClassifier
@@ -6,15 +7,45 @@ from typing import List, Dict, Tuple
 
 logger = logging.getLogger(__name__)
 
-class AnomalyDetector:
+class RegisteredModel:
+    """
+    Mixin: persist/restore the fitted estimator through the shared model registry
+    (app/ml/registry.py) so batch runs reuse a trained version instead of refitting.
+    """
+    REGISTRY_NAME = None
+
+    def load_registered(self) -> bool:
+        from app.ml.registry import registry
+
+        loaded = registry.get(self.REGISTRY_NAME)
+        if loaded is None:
+            return False
+
+        self.model = loaded.model
+        self.version = loaded.version
+        self.is_trained = True
+        logger.info(f"Loaded {self.REGISTRY_NAME}@{loaded.version} from registry.")
+        return True
+
+    def register(self, version: str, metadata: Dict = None):
+        from app.ml.registry import registry
+
+        if not self.is_trained:
+            return
+        registry.register(self.REGISTRY_NAME, self.model, version, metadata)
+        self.version = version
+
+class AnomalyDetector(RegisteredModel):
     """
     Level 3: Unsupervised Machine Learning for Anomaly Detection.
     Uses Isolation Forest to detect transactions that deviate from the norm.
     """
+    REGISTRY_NAME = "recon_anomaly_detector"
     
     def __init__(self):
         self.model = IsolationForest(contamination=0.05, random_state=42)
         self.is_trained = False
+        self.version = None
 
     def train(self, df: pd.DataFrame):
         """
@@ -86,14 +117,17 @@ class AnomalyDetector:
         
         return data[['log_amount']]
 
-class MatchClassifier:
+class MatchClassifier(RegisteredModel):
     """
     Level 7: Supervised Learning for Match Confidence.
     Predicts probability (0-1) that two transactions are a 'True Match'.
     """
+    REGISTRY_NAME = "recon_match_classifier"
+
     def __init__(self):
         self.model = RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42)
         self.is_trained = False
+        self.version = None
         
     def train(self, X: pd.DataFrame, y: List[int]):
         """
@@ -108,6 +142,30 @@ class MatchClassifier:
         logger.info(f"Training Supervised Match Classifier on {len(X)} pairs...")
         self.model.fit(X, y)
         self.is_trained = True
+
+    def partial_fit(self, X: np.ndarray, y: List[int], n_new_trees: int = 5, max_estimators: int = 200):
+        """
+        Incremental update via warm-start tree addition.
+        Grows `n_new_trees` trees on the feedback batch only, so cost scales with the
+        batch, not the history. The oldest trees are retired beyond `max_estimators`
+        to keep inference cost bounded.
+        The fitted copy is swapped in with one assignment; concurrent predictions
+        keep using the previous forest until then.
+        """
+        if not self.is_trained:
+            self.train(pd.DataFrame(X), y)
+            return
+
+        model = copy.deepcopy(self.model)
+        model.set_params(warm_start=True, n_estimators=len(model.estimators_) + n_new_trees)
+        model.fit(X, y)
+
+        if len(model.estimators_) > max_estimators:
+            model.estimators_ = model.estimators_[-max_estimators:]
+            model.n_estimators = max_estimators
+
+        logger.info(f"Match Classifier updated with {len(X)} feedback pairs ({len(model.estimators_)} trees).")
+        self.model = model
         
     def predict_probability(self, features: List[float]) -> float:
         """
@@ -27,7 +27,7 @@ class HybridDecisionEngine:
         # Governance
         self.cost_optimizer = CostOptimizer(config)
         self.drift_monitor = DriftMonitor()
-        self.active_learner = ActiveLearner()
+        self.active_learner = ActiveLearner(classifier)
         
         # Resilience
         self.circuit_breaker = CircuitBreaker(failure_threshold=3)
@@ -1,5 +1,6 @@
 import logging
 import yaml
+from datetime import datetime
 from pathlib import Path
 from src.audit import AuditLogger
 from src.governance import ActiveLearner
@@ -25,7 +26,14 @@ def main():
     event = {
         'txn_ref_id': 'TXN_999_RISKY',
         'amount': 5000000.0, # High Value
-        'source_system': 'SOURCE_A'
+        'source_system': 'SOURCE_A',
+        'value_date': datetime(2024, 1, 15)
+    }
+    candidate = {
+        'txn_ref_id': 'TXN_999_RISKY_B',
+        'amount': 5000000.0,
+        'source_system': 'SOURCE_B',
+        'value_date': datetime(2024, 1, 16)
     }
     original_status = 'EXCEPTION'
     
@@ -33,7 +41,7 @@ def main():
     logger.info("\n--- SCENARIO 1: Junior Ops Override ---")
     maker_id = "ops_junior_01"
     result = console.override_decision(event, original_status, 'MANUAL_MATCH', 
-                                       'CLIENT_CONFIRMED', maker_id, 'JUNIOR_OPS')
+                                       'CLIENT_CONFIRMED', maker_id, 'JUNIOR_OPS', candidate)
     
     ticket = result.get('ticket')
     if ticket: